@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Compact representation of the authors of a record."""
+
+from __future__ import absolute_import, print_function
+
+_MISSING = object()
+
+
+class AuthorTable(object):
+    """Authors of a record stored column by column.
+
+    Instead of one dict per author, every author key (``surname``,
+    ``full_name``, ``orcid``, ``email``, ..) is a list with one entry per
+    author, and the affiliations are stored once in ``affiliations`` and
+    referred to by their index in ``affiliation_ids``. Large collaborations
+    share a few dozen affiliations among thousands of authors, so this keeps
+    records small while they go through the pipelines.
+
+    The table behaves like the list of authors it was built from: iterating
+    over it, indexing it or comparing it with a list gives the author dicts,
+    which are built on the fly. Use ``expand_authors`` to get the list back
+    when the record is serialized.
+
+    The table is read-only: the author dicts are new copies on every access,
+    so changing them does not change the table. A pipeline which edits the
+    authors has to replace them, e.g.
+    ``item['authors'] = expand_authors(item['authors'])`` before the edits.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.affiliations = []
+        self.affiliation_ids = []
+        self._affiliation_index = {}
+
+    @classmethod
+    def from_authors(cls, authors):
+        """Return the table of a list of author dicts.
+
+        The list is returned as it is if its authors cannot be put in a
+        table, e.g. if the affiliations hold other things than strings.
+        """
+        table = cls()
+        try:
+            table.extend(authors)
+        except (TypeError, AttributeError):
+            return authors
+        return table
+
+    def append(self, author):
+        """Add an author dict at the end of the table."""
+        affiliation_ids = None
+        if 'affiliations' in author:
+            affiliation_ids = [
+                self._add_affiliation(affiliation)
+                for affiliation in author['affiliations']
+            ]
+
+        size = len(self.affiliation_ids)
+        for key, value in author.items():
+            if key == 'affiliations':
+                continue
+            if key not in self.columns:
+                self.columns[key] = [_MISSING] * size
+            self.columns[key].append(value)
+        for key, column in self.columns.items():
+            if len(column) == size:
+                column.append(_MISSING)
+        self.affiliation_ids.append(affiliation_ids)
+
+    def extend(self, authors):
+        """Add the author dicts of `authors` at the end of the table."""
+        for author in authors:
+            self.append(author)
+
+    def __iadd__(self, authors):
+        self.extend(authors)
+        return self
+
+    def _add_affiliation(self, affiliation):
+        key = tuple(sorted(affiliation.items()))
+        index = self._affiliation_index.get(key)
+        if index is None:
+            index = self._affiliation_index[key] = len(self.affiliations)
+            self.affiliations.append(dict(affiliation))
+        return index
+
+    def __len__(self):
+        return len(self.affiliation_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._author(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('author index out of range')
+        return self._author(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._author(index)
+
+    def _author(self, index):
+        author = {}
+        for key, column in self.columns.items():
+            if column[index] is not _MISSING:
+                author[key] = column[index]
+        affiliation_ids = self.affiliation_ids[index]
+        if affiliation_ids is not None:
+            author['affiliations'] = [
+                dict(self.affiliations[i]) for i in affiliation_ids
+            ]
+        return author
+
+    def to_list(self):
+        """Return the authors as a list of dicts."""
+        return list(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (AuthorTable, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'AuthorTable(%r)' % self.to_list()
+
+    def __getstate__(self):
+        # the missing marker is replaced by the list of the authors without
+        # the key, as it is not the same object once unpickled
+        columns = {}
+        for key, column in self.columns.items():
+            missing = [i for i, value in enumerate(column) if value is _MISSING]
+            values = [None if value is _MISSING else value for value in column]
+            columns[key] = (values, missing)
+        return {
+            'columns': columns,
+            'affiliations': self.affiliations,
+            'affiliation_ids': self.affiliation_ids,
+        }
+
+    def __setstate__(self, state):
+        self.columns = {}
+        for key, (values, missing) in state['columns'].items():
+            for index in missing:
+                values[index] = _MISSING
+            self.columns[key] = values
+        self.affiliations = state['affiliations']
+        self.affiliation_ids = state['affiliation_ids']
+        self._affiliation_index = dict(
+            (tuple(sorted(affiliation.items())), index)
+            for index, affiliation in enumerate(self.affiliations)
+        )
+
+
+def expand_authors(authors):
+    """Return the list of author dicts of an ``AuthorTable``.
+
+    Any other value is returned as it is.
+    """
+    if isinstance(authors, AuthorTable):
+        return authors.to_list()
+    return authors
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Conversion of the harvested records to the INSPIRE data model."""
+
+from __future__ import absolute_import, print_function
+
+import datetime
+import os
+
+from .utils import DATE_CACHE_SIZE, memoize
+
+PUBLICATION_INFO_FIELDS = (
+    ('journal_title', 'journal_title'),
+    ('journal_volume', 'journal_volume'),
+    ('journal_issue', 'journal_issue'),
+    ('artid', 'journal_artid'),
+    ('page_start', 'journal_fpage'),
+    ('page_end', 'journal_lpage'),
+    ('material', 'journal_doctype'),
+    ('pubinfo_freetext', 'pubinfo_freetext'),
+)
+"""Keys of the publication info and the record fields they come from.
+
+The year, from ``journal_year``, is converted to an integer.
+"""
+
+COPYRIGHT_FIELDS = (
+    ('holder', 'copyright_holder'),
+    ('year', 'copyright_year'),
+    ('statement', 'copyright_statement'),
+    ('material', 'copyright_material'),
+)
+"""Keys of the copyright and the record fields they come from."""
+
+JOURNAL_FIELDS = tuple(field for _, field in PUBLICATION_INFO_FIELDS) + ('journal_year',)
+
+
+def record_values(record):
+    """Return the dict to convert for a record.
+
+    A dict is converted as it is. Any other mapping, e.g. a scrapy item, is
+    copied to a new dict, with its ``to_dict`` method if it has one.
+    """
+    if isinstance(record, dict):
+        return record
+    if hasattr(record, 'to_dict'):
+        return record.to_dict()
+    return dict(record)
+
+
+def has_publication_info(item):
+    """If any publication info."""
+    get = item.get
+    for field in JOURNAL_FIELDS:
+        if get(field):
+            return True
+    return False
+
+
+@memoize(DATE_CACHE_SIZE)
+def publication_date(date):
+    """Return the publication date as ``YYYY-MM-DD``.
+
+    A missing month or day is the first one, e.g. ``2018-05`` gives
+    ``2018-05-01``; a time after the date is left out. Dates which are not
+    valid give an empty string, as for records without date.
+    """
+    parts = date.strip().split('T')[0].split('-')
+    parts += ['1'] * (3 - len(parts))
+    try:
+        year, month, day = [int(part) for part in parts]
+        return datetime.date(year, month, day).strftime('%Y-%m-%d')
+    except ValueError:
+        return ''
+
+
+class InspireConverter(object):
+    """Converter of the harvested records to the INSPIRE data model.
+
+    The records are converted to dicts: dicts are changed in place and
+    returned, other mappings, e.g. items, are left as they are and a
+    converted copy is returned. ``source`` is used
+    for the records without ``source`` and ``submission_number``, by default
+    the Scrapyd job, is stored in their acquisition source.
+    """
+
+    def __init__(self, source=None, submission_number=None):
+        self.source = source
+        if submission_number is None:
+            submission_number = os.environ.get('SCRAPY_JOB', '')
+        self.submission_number = submission_number
+
+    def convert(self, item, source=None, now=None):
+        """Return a record converted, harvested at ``now`` (by default the current time)."""
+        if now is None:
+            now = datetime.datetime.now().isoformat()
+        record = record_values(item)
+        pop = record.pop
+
+        if 'related_article_doi' in record:
+            record['dois'] = record.get('dois', []) + pop('related_article_doi')
+
+        source = pop('source', source or self.source)
+        record['acquisition_source'] = {
+            'source': source,
+            # NOTE: Keeps method same as source to conform with INSPIRE
+            # submissions which add `submissions` to this field.
+            'method': source,
+            'date': now,
+            'submission_number': self.submission_number,
+        }
+        if 'record_creation_date' not in record:
+            record['record_creation_date'] = now
+
+        record['titles'] = [{
+            'title': pop('title', ''),
+            'subtitle': pop('subtitle', ''),
+            'source': source,
+        }]
+        record['abstracts'] = [{
+            'value': pop('abstract', ''),
+            'source': source,
+        }]
+
+        date = pop('date_published', '')
+        record['imprints'] = [{
+            'date': publication_date(date) if date else date,
+            'publisher': source,
+        }]
+
+        record['copyright'] = [
+            {key: pop(field, '') for key, field in COPYRIGHT_FIELDS}
+        ]
+
+        if not record.get('publication_info') and has_publication_info(record):
+            publication_info = {
+                key: pop(field, '') for key, field in PUBLICATION_INFO_FIELDS
+            }
+            publication_info['year'] = int(pop('journal_year', 0)) or ''
+            record['publication_info'] = [publication_info]
+        else:
+            for field in JOURNAL_FIELDS:
+                pop(field, None)
+
+        return record
+
+    def convert_many(self, records, source=None):
+        """Convert the records of a batch, all harvested now."""
+        now = datetime.datetime.now().isoformat()
+        convert = self.convert
+        return [convert(record, source, now) for record in records]
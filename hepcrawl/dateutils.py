@@ -19,6 +19,8 @@ from datetime import date as real_date
 from datetime import datetime as real_datetime
 import dateutil.parser as dparser
 
+from .utils import DATE_CACHE_SIZE, memoize
+
 
 DATE_FORMATS_YEAR = ["%Y", "%y"]
 DATE_FORMATS_MONTH = [
@@ -30,6 +32,27 @@ DATE_FORMATS_FULL = [
     "%d %B %Y", "%d %b %y", "%d %B %y", "%Y-%m-%dT%H:%M:%SZ", "%d-%m-%Y",
 ]
 
+# Patterns of the strptime directives in the shape of a date (see
+# `date_shape`), matching at least everything strptime accepts. Used to tell
+# which formats a date may be in without trying all of them.
+_DIRECTIVE_PATTERNS = {
+    'Y': r'\d{4}',
+    'y': r'\d{2}',
+    'm': r'\d{1,2}',
+    'd': r' ?\d{1,2}',
+    'H': r'\d{1,2}',
+    'M': r'\d{1,2}',
+    'S': r'\d{1,2}',
+    'b': r'.+?',
+    'B': r'.+?',
+    # depends on the locale
+    'x': r'.+?',
+    '%': r'%',
+}
+_DIRECTIVE = re.compile(r'%(.)|(\s+)|(.)')
+_DIGIT = re.compile(r'\d', re.UNICODE)
+_LETTER = re.compile(r'[^\W\d_]', re.UNICODE)
+
 # This library does not support strftime's "%s" or "%y" format strings.
 # Allowed if there's an even number of "%"s because they are escaped.
 _illegal_formatting = re.compile(r"((^|[^%])(%%)*%[sy])")
@@ -124,35 +147,80 @@ def strptime(date_string, fmt):
     return real_datetime(*(time.strptime(date_string, fmt)[:6]))
 
 
-def create_valid_date(date, date_format_full="%Y-%m-%d",
-                      date_format_month="%Y-%m", date_format_year="%Y"):
-    """Iterate over possible formats and return a valid date if found."""
-    valid_date = None
-    date = six.text_type(date)
-    for format in DATE_FORMATS_FULL:
+def date_shape(date):
+    """Return the date with its digits replaced by 0 and its letters by a.
+
+    E.g. '1 May 1992' becomes '0 aaa 0000'. The formats a date may be in only
+    depend on its shape.
+    """
+    return _LETTER.sub('a', _DIGIT.sub('0', date))
+
+
+def _format_pattern(date_format):
+    """Return the pattern of the shapes of the dates read with a format."""
+    pattern = ''
+    for directive, space, char in _DIRECTIVE.findall(date_format):
+        if directive:
+            pattern += _DIRECTIVE_PATTERNS[directive]
+        elif space:
+            pattern += r'\s+'
+        else:
+            pattern += re.escape(date_shape(char))
+    return re.compile(pattern + '$', re.IGNORECASE | re.UNICODE)
+
+
+_FORMAT_PATTERNS = [
+    (date_format, _format_pattern(date_format))
+    for date_format in DATE_FORMATS_FULL + DATE_FORMATS_MONTH + DATE_FORMATS_YEAR
+]
+
+
+@memoize(DATE_CACHE_SIZE)
+def candidate_formats(shape):
+    """Return the formats strptime may read dates of the given shape with."""
+    return frozenset(
+        date_format
+        for date_format, pattern in _FORMAT_PATTERNS
+        if pattern.match(shape)
+    )
+
+
+def _format_with(date, formats, candidates, output_format):
+    for format in formats:
+        if format not in candidates:
+            continue
         try:
-            valid_date = strftime(date_format_full, (strptime(date, format)))
-            break
+            return strftime(output_format, (strptime(date, format)))
         except ValueError:
             pass
-    else:
-        for format in DATE_FORMATS_MONTH:
-            try:
-                if date.count('-') > 1:
-                    date = "-".join(date.split('-')[:2])
-                valid_date = strftime(date_format_month, (strptime(date, format)))
-                break
-            except ValueError:
-                pass
-        else:
-            for format in DATE_FORMATS_YEAR:
-                try:
-                    if date.count('-') > 0:
-                        date = date.split('-')[0]
-                    valid_date = strftime(date_format_year, (strptime(date, format)))
-                    break
-                except ValueError:
-                    pass
+
+
+def create_valid_date(date, date_format_full="%Y-%m-%d",
+                      date_format_month="%Y-%m", date_format_year="%Y"):
+    """Return a valid date if the date is in one of the known formats.
+
+    The full dates are tried first, then the months and the years. Only the
+    formats matching the shape of the date are tried.
+    """
+    date = six.text_type(date)
+    valid_date = _format_with(
+        date, DATE_FORMATS_FULL, candidate_formats(date_shape(date)),
+        date_format_full,
+    )
+    if valid_date is None:
+        if date.count('-') > 1:
+            date = "-".join(date.split('-')[:2])
+        valid_date = _format_with(
+            date, DATE_FORMATS_MONTH, candidate_formats(date_shape(date)),
+            date_format_month,
+        )
+    if valid_date is None:
+        if date.count('-') > 0:
+            date = date.split('-')[0]
+        valid_date = _format_with(
+            date, DATE_FORMATS_YEAR, candidate_formats(date_shape(date)),
+            date_format_year,
+        )
     return valid_date
 
 
@@ -178,11 +246,12 @@ def parse_date(raw_date):
     return date_published
 
 
+@memoize(DATE_CACHE_SIZE)
 def format_date(raw_date):
     """Get the ISO formatted year and date.
 
     Calls first the format preserving date creator function, if that fails
-    calls the function that uses dateutils.
+    calls the function that uses dateutils. The results are cached.
     """
     date_published = create_valid_date(raw_date)
     if not date_published:
@@ -193,6 +262,19 @@ def format_date(raw_date):
     return date_published
 
 
+def format_dates(raw_dates):
+    """Return the ISO formatted dates of a list of raw dates.
+
+    Each distinct date is only formatted once.
+    """
+    formatted = {}
+    for raw_date in raw_dates:
+        key = (type(raw_date), raw_date)
+        if key not in formatted:
+            formatted[key] = format_date(raw_date)
+    return [formatted[type(raw_date), raw_date] for raw_date in raw_dates]
+
+
 def format_year(raw_date):
     """Get the year from the ISO formatted date."""
     date_published = format_date(raw_date)
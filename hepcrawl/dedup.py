@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Index of the DOIs seen during a crawl."""
+
+from __future__ import absolute_import, print_function
+
+import hashlib
+import math
+from array import array
+import re
+import struct
+
+import six
+
+DOI_PREFIX = re.compile(r'^(?:doi:\s*|https?://(?:dx\.)?doi\.org/)', re.IGNORECASE)
+
+
+def normalize_doi(doi):
+    """Return the DOI without ``doi:`` or resolver prefix, in lower case."""
+    return DOI_PREFIX.sub('', doi.strip()).lower()
+
+
+def doi_hash(doi):
+    """Return the 64 bits hash of the normalized DOI, as two 32 bits halves."""
+    doi = normalize_doi(doi)
+    if isinstance(doi, six.text_type):
+        doi = doi.encode('utf-8')
+    return struct.unpack('>II', hashlib.sha1(doi).digest()[:8])
+
+
+class BloomFilter(object):
+    """Bloom filter of ``capacity`` hashes with false positive ``error_rate``.
+
+    The hashes are pairs of 32 bits integers, used to compute the bits of
+    each entry by double hashing.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, int(round(self.size / float(capacity) * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, hash_pair):
+        first, second = hash_pair
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, hash_pair):
+        """Add the hash, return whether it was new, i.e. any bit was not set."""
+        new = False
+        for position in self._positions(hash_pair):
+            bit = 1 << (position & 7)
+            if not self.bits[position >> 3] & bit:
+                self.bits[position >> 3] |= bit
+                new = True
+        return new
+
+    def __contains__(self, hash_pair):
+        for position in self._positions(hash_pair):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class HashSet(object):
+    """Set of hashes in an open addressing table.
+
+    The hashes are pairs of 32 bits integers, stored in two arrays of
+    ``size`` slots which double when two thirds are used, so a hash takes
+    12 to 24 bytes instead of about 70 in a ``set``. The pair ``(0, 0)``
+    marks the free slots and is stored as ``(0, 1)``.
+    """
+
+    def __init__(self, size=2 ** 16):
+        self.highs = array('I', [0]) * size
+        self.lows = array('I', [0]) * size
+        self.mask = size - 1
+        self.count = 0
+
+    def _find(self, high, low):
+        """Slot of the hash, or the free slot where it goes, and if it is there."""
+        highs, lows, mask = self.highs, self.lows, self.mask
+        index = low & mask
+        while True:
+            slot_high, slot_low = highs[index], lows[index]
+            if slot_low == low and slot_high == high:
+                return index, True
+            if not (slot_low or slot_high):
+                return index, False
+            index = (index + 1) & mask
+
+    def add(self, hash_pair):
+        """Add the hash, return whether it was new."""
+        high, low = hash_pair
+        if not (high or low):
+            low = 1
+        index, found = self._find(high, low)
+        if found:
+            return False
+        self.highs[index] = high
+        self.lows[index] = low
+        self.count += 1
+        if self.count * 3 > len(self.lows) * 2:
+            self._grow()
+        return True
+
+    def _grow(self):
+        highs, lows = self.highs, self.lows
+        self.__init__(len(lows) * 2)
+        for high, low in six.moves.zip(highs, lows):
+            if high or low:
+                index, _ = self._find(high, low)
+                self.highs[index] = high
+                self.lows[index] = low
+                self.count += 1
+
+    def __contains__(self, hash_pair):
+        high, low = hash_pair
+        if not (high or low):
+            low = 1
+        return self._find(high, low)[1]
+
+    def __len__(self):
+        return self.count
+
+
+class DOIIndex(object):
+    """Set of the DOIs seen in a crawl.
+
+    Only a 64 bits hash of each normalized DOI is kept, in a
+    :class:`HashSet`. For large backfills, ``bloom_capacity`` puts a Bloom
+    filter of that many DOIs in front of it: most new DOIs are told apart
+    by the filter alone, and the DOIs it takes for seen ones are looked up
+    in the table, so no new DOI is taken for a duplicate.
+    """
+
+    def __init__(self, bloom_capacity=0, bloom_error_rate=0.001):
+        self.bloom = None
+        if bloom_capacity:
+            self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self.hashes = HashSet()
+
+    def __contains__(self, doi):
+        hash_pair = doi_hash(doi)
+        if self.bloom is not None and hash_pair not in self.bloom:
+            return False
+        return hash_pair in self.hashes
+
+    def add(self, doi):
+        """Add the DOI, return whether it was new."""
+        hash_pair = doi_hash(doi)
+        if self.bloom is not None and self.bloom.add(hash_pair):
+            # not in the filter, so not in the table either
+            self.hashes.add(hash_pair)
+            return True
+        return self.hashes.add(hash_pair)
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+class HeldRecords(object):
+    """Records held back by DOI, one kept for each DOI by ``policy``.
+
+    * ``latest``: the record of the latest package, i.e. the last one added;
+    * ``richest``: the record with the most ``local_files``, the first one
+      added if they have as many.
+
+    A record is held in place of the one sharing any of its DOIs.
+    """
+
+    policies = ('latest', 'richest')
+
+    def __init__(self, policy='latest'):
+        if policy not in self.policies:
+            raise ValueError('Unknown deduplication policy: %s' % policy)
+        self.policy = policy
+        self.records = []
+        self.slots = {}
+        self.duplicates = 0
+
+    def _keeps(self, held, record):
+        if self.policy == 'richest':
+            return len(held.get('local_files') or []) >= len(record.get('local_files') or [])
+        return False
+
+    def add(self, record):
+        """Hold the record, return whether it had a DOI already held."""
+        hashes = [doi_hash(doi['value']) for doi in record.get('dois') or [] if doi.get('value')]
+        slot = next((self.slots[hash_pair] for hash_pair in hashes if hash_pair in self.slots), None)
+        duplicate = slot is not None
+        if duplicate:
+            self.duplicates += 1
+            if not self._keeps(self.records[slot], record):
+                self.records[slot] = record
+        else:
+            slot = len(self.records)
+            self.records.append(record)
+        for hash_pair in hashes:
+            self.slots[hash_pair] = slot
+        return duplicate
+
+    def pop_all(self):
+        """Return the records kept and forget them."""
+        records = self.records
+        self.records = []
+        self.slots = {}
+        return records
+
+    def __len__(self):
+        return len(self.records)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""MessagePack export and import of the records.
+
+Records are packed one after the other as MessagePack maps, strings as
+UTF-8 text. Enable the feed exporter with ``-s FEED_FORMAT=msgpack``.
+"""
+
+from __future__ import absolute_import, print_function
+
+import zlib
+
+import msgpack
+from scrapy.exporters import BaseItemExporter
+
+from .authors import expand_authors
+
+GZIP_MAGIC = b'\x1f\x8b'
+READ_SIZE = 2 ** 16
+
+
+def _default(value):
+    value = expand_authors(value)
+    if isinstance(value, list):
+        return value
+    raise TypeError('cannot serialize %r' % (value,))
+
+
+def pack_record(record):
+    """Return the dict ``record`` packed with MessagePack."""
+    return msgpack.packb(record, default=_default)
+
+
+def unpack_record(data):
+    """Return the record packed in ``data`` by ``pack_record``."""
+    return msgpack.unpackb(data, raw=False)
+
+
+def iter_msgpack(source):
+    """Iterate over the records of a MessagePack file path or file object.
+
+    Gzipped files are decompressed. A truncated last record, as left by an
+    interrupted write, is ignored.
+    """
+    if not hasattr(source, 'read'):
+        with open(source, 'rb') as source_file:
+            for record in iter_msgpack(source_file):
+                yield record
+        return
+
+    decompress = None
+    if source.read(2) == GZIP_MAGIC:
+        decompress = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    source.seek(0)
+
+    unpacker = msgpack.Unpacker(raw=False)
+    while True:
+        data = source.read(READ_SIZE)
+        if not data:
+            return
+        if decompress is not None:
+            # a truncated gzip stream gives what could be decompressed
+            data = decompress(data)
+        unpacker.feed(data)
+        for record in unpacker:
+            yield record
+
+
+class MsgpackItemExporter(BaseItemExporter):
+    """Feed exporter writing the items with MessagePack."""
+
+    def __init__(self, file, **kwargs):
+        self._configure(kwargs, dont_fail=True)
+        self.file = file
+
+    def export_item(self, item):
+        self.file.write(pack_record(dict(self._get_serialized_fields(item))))
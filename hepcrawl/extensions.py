@@ -11,6 +11,8 @@
 
 from scrapy import signals
 
+from .utils import MEMOIZED_FUNCTIONS
+
 
 class ErrorHandler(object):
 
@@ -29,3 +31,45 @@ class ErrorHandler(object):
             'exception': failure,
             'sender': response,
         })
+
+
+class MemoizeStats(object):
+    """Put the hits and misses of the memoized functions in the crawler stats.
+
+    The caches live as long as the process, so only what the spider added
+    is counted.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start_info = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """Hook in the signals for opening and closing the spider."""
+        obj = cls(crawler.stats)
+        crawler.signals.connect(obj.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(obj.spider_closed, signal=signals.spider_closed)
+        return obj
+
+    def spider_opened(self, spider):
+        """Remember where the counters start."""
+        self.start_info = dict(
+            (function.__name__, function.cache_info())
+            for function in MEMOIZED_FUNCTIONS
+        )
+
+    def spider_closed(self, spider, reason):
+        """Set ``memoize/<function>/{hits,misses,hit_rate,size}``."""
+        for function in MEMOIZED_FUNCTIONS:
+            name = function.__name__.lstrip('_')
+            info = function.cache_info()
+            start = self.start_info.get(function.__name__)
+            hits = info.hits - (start.hits if start else 0)
+            misses = info.misses - (start.misses if start else 0)
+            prefix = 'memoize/%s/' % name
+            self.stats.set_value(prefix + 'hits', hits, spider=spider)
+            self.stats.set_value(prefix + 'misses', misses, spider=spider)
+            self.stats.set_value(prefix + 'size', info.currsize, spider=spider)
+            if hits + misses:
+                self.stats.set_value(prefix + 'hit_rate', float(hits) / (hits + misses), spider=spider)
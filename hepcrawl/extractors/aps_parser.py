@@ -1,11 +1,10 @@
-import json
 import logging
 
 import link_header
 
 from hepcrawl.items import HEPRecord
 from hepcrawl.loaders import HEPLoader
-from hepcrawl.utils import get_nested, get_license, build_dict
+from hepcrawl.utils import get_nested, get_license, build_dict, iter_json_array
 from scrapy import Request
 
 logger = logging.getLogger(__name__)
@@ -27,12 +26,17 @@ class APSParser(object):
         'nobel': 'other',
     }
 
+    def __init__(self, min_authors=0):
+        self.min_authors = min_authors
+
     def parse(self, response):
-        """Parse a APS JSON file into a HEP record."""
-        aps_response = json.loads(response.body_as_unicode())
+        """Parse a APS JSON file into a HEP record.
 
-        for article in aps_response['data']:
-            record = HEPLoader(item=HEPRecord(), response=response)
+        Articles are decoded one by one from the `data` array of the page.
+        """
+        for article in iter_json_array(response.body, 'data', response.encoding):
+            record = HEPLoader(item=HEPRecord(), response=response,
+                               min_authors=self.min_authors)
 
             dois = get_nested(article, 'identifiers', 'doi')
             record.add_value('dois', dois)
@@ -56,7 +60,8 @@ class APSParser(object):
             record.add_value('abstract', get_nested(article, 'abstract', 'value'))
             record.add_value('title', get_nested(article, 'title', 'value'))
 
-            authors, collaborations = self._get_authors_and_collab(article, dois)
+            authors, collaborations = self._get_authors_and_collab(
+                article, dois, record.new_authors())
             record.add_value('authors', authors)
             record.add_value('collaborations', collaborations)
 
@@ -101,15 +106,16 @@ class APSParser(object):
                 next_url = next[0].href
                 yield Request(next_url)
 
-    def _get_authors_and_collab(self, article, dois):
-        authors = []
+    def _get_authors_and_collab(self, article, dois, authors=None):
+        if authors is None:
+            authors = []
         collaboration = []
+        affiliations = build_dict(article.get('affiliations', []), 'id')
 
         for author in article['authors']:
             if author['type'] == 'Person':
                 author_affiliations = []
-                if 'affiliations' in article and 'affiliationIds' in author:
-                    affiliations = build_dict(article['affiliations'], 'id')
+                if 'affiliationIds' in author:
                     for aff_id in set(author['affiliationIds']):
                         if aff_id in affiliations:
                             author_affiliations.append({'value': affiliations[aff_id]['name']})
@@ -4,43 +4,46 @@ import re
 from ..items import HEPRecord
 from ..loaders import HEPLoader
 from ..utils import get_license
+from ..xpaths import XPATHS, extract_without_namespaces
 
 logger = logging.getLogger(__name__)
 
 
 class HindawiParser(object):
 
+    def __init__(self, min_authors=0):
+        self.min_authors = min_authors
+
     def parse_node(self, response, node):
         """Iterate all the record nodes in the XML and build the HEPRecord."""
+        record = HEPLoader(item=HEPRecord(), selector=node, response=response,
+                           min_authors=self.min_authors)
 
-        node.remove_namespaces()
-        record = HEPLoader(item=HEPRecord(), selector=node, response=response)
-
-        dois = node.xpath(
-            "./datafield[@tag='024'][subfield[@code='2'][contains(text(), 'DOI')]]/subfield[@code='a']/text()").extract()
+        dois = XPATHS.select(node, 'marc.doi').extract()
         record.add_value('dois', dois)
 
-        record.add_value('authors', self.get_authors(node, dois))
-        record.add_xpath('abstract', "./datafield[@tag='520']/subfield[@code='a']")
-        record.add_xpath('title', "./datafield[@tag='245']/subfield[@code='a']/text()")
-        record.add_xpath('date_published', "./datafield[@tag='260']/subfield[@code='c']/text()")
+        record.add_value('authors', self.get_authors(node, dois, record.new_authors()))
+        record.add_value('abstract', extract_without_namespaces(
+            XPATHS.select(node, 'marc.abstract')))
+        record.add_xpath('title', XPATHS['marc.title'])
+        record.add_xpath('date_published', XPATHS['marc.date_published'])
 
-        page_nr = node.xpath("./datafield[@tag='300']/subfield[@code='a']/text()")
+        page_nr = XPATHS.select(node, 'marc.page_nr')
         if page_nr:
             try:
                 page_nr = map(int, page_nr.extract())
                 record.add_value('page_nr', page_nr)
             except ValueError as e:
                 logger.error('Failed to parse last_page or first_page for artcile %s: %s' % (dois, e))
-        record.add_xpath('journal_title', "./datafield[@tag='773']/subfield[@code='p']/text()")
-        record.add_xpath('journal_volume', "./datafield[@tag='773']/subfield[@code='a']/text()")
+        record.add_xpath('journal_title', XPATHS['marc.journal_title'])
+        record.add_xpath('journal_volume', XPATHS['marc.journal_volume'])
         record.add_value('arxiv_eprints', self.get_arxivs(node, dois))
 
-        journal_year = node.xpath("./datafield[@tag='773']/subfield[@code='y']/text()").extract()
+        journal_year = XPATHS.select(node, 'marc.journal_year').extract()
         if journal_year:
             record.add_value('journal_year', int(journal_year[0]))
 
-        record.add_xpath('journal_issue', "./datafield[@tag='773']/subfield[@code='n']/text()")
+        record.add_xpath('journal_issue', XPATHS['marc.journal_issue'])
 
         fpage, lpage = self.get_journal_pages(node)
         record.add_value('journal_fpage', fpage)
@@ -51,42 +54,43 @@ class HindawiParser(object):
         record.add_value('copyright_year', cr_year)
 
         license = get_license(
-            license_url=node.xpath("./datafield[@tag='540']/subfield[@code='u']/text()").extract_first(),
-            license_text=node.xpath("./datafield[@tag='540']/subfield[@code='a']/text()").extract_first(),
+            license_url=XPATHS.select(node, 'marc.license_url').extract_first(),
+            license_text=XPATHS.select(node, 'marc.license_text').extract_first(),
         )
         record.add_value('license', license)
 
         record.add_value('collections', ['Advances in High Energy Physics'])
-        record.add_xpath('source', "./datafield[@tag='260']/subfield[@code='b']/text()")
+        record.add_xpath('source', XPATHS['marc.source'])
 
         return record.load_item()
 
     @staticmethod
     def get_affiliations(author):
         """Get the affiliations of an author."""
-        affiliations_raw = author.xpath("./subfield[@code='u']/text()").extract()
+        affiliations_raw = XPATHS.select(author, 'marc.author_affiliations').extract()
 
         return [{"value": aff} for aff in affiliations_raw]
 
-    def get_authors(self, node, dois):
-        """Gets the authors."""
-        authors_first = node.xpath("./datafield[@tag='100']")
-        authors_others = node.xpath("./datafield[@tag='700']")
+    def get_authors(self, node, dois, authors=None):
+        """Gets the authors, appended to `authors` if given."""
+        authors_first = XPATHS.select(node, 'marc.first_authors')
+        authors_others = XPATHS.select(node, 'marc.other_authors')
         authors_raw = authors_first + authors_others
-        authors = []
+        if authors is None:
+            authors = []
         for author in authors_raw:
-            orcid = author.xpath("./subfield[@code='j']/text()").extract_first()
+            orcid = XPATHS.select(author, 'marc.author_orcid').extract_first()
             if orcid:
                 if orcid.startswith("ORCID-"):
                     orcid = orcid[6:]
                 authors.append({
-                    'raw_name': author.xpath("./subfield[@code='a']/text()").extract_first(),
+                    'raw_name': XPATHS.select(author, 'marc.author_name').extract_first(),
                     'affiliations': self.get_affiliations(author),
                     'orcid': orcid,
                 })
             else:
                 authors.append({
-                    'raw_name': author.xpath("./subfield[@code='a']/text()").extract_first(),
+                    'raw_name': XPATHS.select(author, 'marc.author_name').extract_first(),
                     'affiliations': self.get_affiliations(author),
                 })
 
@@ -97,11 +101,11 @@ class HindawiParser(object):
 
     def get_arxivs(self, node, dois):
         """Gets the authors."""
-        arxivs_raw = node.xpath("./datafield[@tag='037'][subfield[@code='9'][contains(text(), 'arXiv')]]")
+        arxivs_raw = XPATHS.select(node, 'marc.arxiv_fields')
         arxivs = []
         arxiv_pattern = re.compile(r'(arxiv:|v[0-9]$)', flags=re.I)
         for arxiv in arxivs_raw:
-            arxiv_value = arxiv.xpath("./subfield[@code='a']/text()").extract_first()
+            arxiv_value = XPATHS.select(arxiv, 'marc.arxiv_value').extract_first()
             value = arxiv_pattern.sub("", arxiv_value)
             if value:
                 arxivs.append({'value': value})
@@ -114,7 +118,7 @@ class HindawiParser(object):
     @staticmethod
     def get_copyright(node):
         """Get copyright year and statement."""
-        copyright_raw = node.xpath("./datafield[@tag='542']/subfield[@code='f']/text()").extract_first()
+        copyright_raw = XPATHS.select(node, 'marc.copyright').extract_first()
         cr_year = "".join(i for i in copyright_raw if i.isdigit())
 
         return copyright_raw, cr_year
@@ -122,7 +126,7 @@ class HindawiParser(object):
     @staticmethod
     def get_journal_pages(node):
         """Get copyright fpage and lpage."""
-        journal_pages = node.xpath("./datafield[@tag='773']/subfield[@code='c']/text()").extract_first()
+        journal_pages = XPATHS.select(node, 'marc.journal_pages').extract_first()
         if '-' in journal_pages:
             return journal_pages.split('-', 1)
         else:
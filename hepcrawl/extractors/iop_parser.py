@@ -5,12 +5,14 @@ from hepcrawl.extractors.jats import Jats
 from hepcrawl.items import HEPRecord
 from hepcrawl.loaders import HEPLoader
 from hepcrawl.exceptions import UnknownLicense
-from hepcrawl.utils import LICENSE_PATTERN
+from hepcrawl.utils import get_license_by_url
+from hepcrawl.xpaths import XPATHS, extract_without_namespaces
 
 logger = logging.getLogger(__name__)
 
 
 class IOPParser(Jats):
+    publisher = 'iop'
     article_type_mapping = {
         'research-article': 'article',
         'corrected-article': 'article',
@@ -22,13 +24,13 @@ class IOPParser(Jats):
 
     def parse_node(self, response, node):
         """Parse a IOP XML file into a HEP record."""
-        node.remove_namespaces()
-        record = HEPLoader(item=HEPRecord(), selector=node, response=response)
+        record = HEPLoader(item=HEPRecord(), selector=node, response=response,
+                           min_authors=self.min_authors)
 
-        dois = node.xpath("//article-id[@pub-id-type='doi']/text()").extract()
+        dois = XPATHS.select(node, 'jats.doi').extract()
         record.add_value('dois', dois)
 
-        raw_article_type = node.xpath('//@article-type').extract()
+        raw_article_type = XPATHS.select(node, 'iop.article_type').extract()
         article_type = map(lambda x: self.article_type_mapping.get(
             x, 'other'), raw_article_type)
         record.add_value('journal_doctype', article_type)
@@ -40,7 +42,7 @@ class IOPParser(Jats):
         if article_type in ['correction', 'addendum']:
             logger.info('Adding related_article_doi.')
             record.add_xpath('related_article_doi',
-                             "//related-article[@ext-link-type='doi']/@href")
+                             XPATHS['jats.related_article_doi'])
 
         arxiv_eprints = self.get_arxiv_eprints(node)
         if not arxiv_eprints:
@@ -48,7 +50,7 @@ class IOPParser(Jats):
         else:
             record.add_value('arxiv_eprints', arxiv_eprints)
 
-        page_nr = node.xpath("//counts/page-count/@count")
+        page_nr = XPATHS.select(node, 'jats.page_count')
         if page_nr:
             try:
                 page_nr = map(int, page_nr.extract())
@@ -57,7 +59,8 @@ class IOPParser(Jats):
                 logger.error(
                     'Failed to parse last_page or first_page for article %s: %s' % (dois, e))
 
-        all_nodes = node.xpath('//abstract/p/child::node()').getall()
+        all_nodes = extract_without_namespaces(
+            XPATHS.select(node, 'iop.abstract_nodes'))
 
         string_node_joined = ''.join(all_nodes)
         cdata_pattern = "<\?CDATA(.*)\?>"
@@ -66,31 +69,17 @@ class IOPParser(Jats):
             string_node_joined = re.sub(cdata_pattern, match.group(
                 1).replace('\\', '\\\\'), string_node_joined)
         record.add_value('abstract', ''.join(string_node_joined))
-        record.add_xpath('title', '//title-group/article-title/text()')
-        record.add_xpath('subtitle', '//subtitle/text()')
 
-        authors = self._get_authors(node)
+        authors = self._load_front_matter(record, node)
         if not authors:
             logger.error('No authors found for article %s.' % dois)
-        record.add_value('authors', authors)
-        record.add_xpath('collaborations', "//contrib/collab/text()")
 
         record.add_value('date_published', self._get_published_date(node))
 
-        record.add_xpath(
-            'journal_title', '//abbrev-journal-title/text()|//journal-title/text()')
-        record.add_xpath('journal_issue', '//issue/text()')
-        record.add_xpath('journal_volume', '//volume/text()')
-        record.add_xpath('journal_artid', '//elocation-id/text()')
-
         published_date = self._get_published_date(node)
         record.add_value('journal_year', int(published_date[:4]))
         record.add_value('date_published', published_date)
 
-        record.add_xpath('copyright_holder', '//copyright-holder/text()')
-        record.add_xpath('copyright_year', '//copyright-year/text()')
-        record.add_xpath('copyright_statement', '//copyright-statement/text()')
-
         license = self._get_license(node)
         record.add_value('license', license)
 
@@ -113,8 +102,7 @@ class IOPParser(Jats):
 
     def get_arxiv_eprints(self, node):
         arxiv_eprints = []
-        arxivs_raw = node.xpath(
-            "//custom-meta-group/custom-meta/meta-value/text()")
+        arxivs_raw = XPATHS.select(node, 'iop.arxiv_eprints')
         pattern = re.compile(r'(arxiv:|v[0-9]$)', flags=re.I)
         for arxiv in arxivs_raw:
             arxiv_value = arxiv.extract()
@@ -125,26 +113,13 @@ class IOPParser(Jats):
     def get_license_type_and_version_from_url(self, url):
         if "creativecommons.org/licenses/by/" not in url:
             raise UnknownLicense(url)
-        license_type = "CC-BY"
-        match = LICENSE_PATTERN.search(url)
-        return self.construct_license(license_type=license_type, version= match.group(0), url=url)
+        return get_license_by_url(url)[0]
 
     def _get_license(self, node):
-        raw_licenses = node.xpath("//permissions/license/@href").extract()
+        raw_licenses = XPATHS.select(node, 'iop.license_urls').extract()
         licenses = []
         for raw_license in raw_licenses:
             type_and_version = self.get_license_type_and_version_from_url(url=raw_license)
             if type_and_version:
                 licenses.append(type_and_version)
         return licenses
-
-
-    def construct_license(self, license_type, version, url=None):
-        license = {}
-        if url:
-            license['url'] = url
-        else:
-            logger.warning("License URL is not found in XML.")
-        if license_type and version:
-            license['license'] = "-".join([license_type, version])
-        return license
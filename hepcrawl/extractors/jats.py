@@ -14,12 +14,75 @@ from __future__ import absolute_import, print_function
 import datetime
 import xml.etree.ElementTree as ET
 import re
-from ..utils import get_first
+from ..utils import AFFILIATION_CACHE_SIZE, get_first, memoize
+from ..xpaths import XPATHS
+from .xslt import XSLTExtractor
+
+
+@memoize(AFFILIATION_CACHE_SIZE)
+def _clean_aff_markup(markup):
+    """Return the text of the serialized ``<aff>`` without its label."""
+    root = ET.fromstring(markup.encode('UTF-8'))
+    for el in root:
+        if el.tag == 'label':
+            root.remove(el)
+    return ''.join(root.itertext())
+
+
+@memoize(AFFILIATION_CACHE_SIZE)
+def _affiliation_value(markup):
+    """Return the affiliation in the serialized ``<aff>``."""
+    cleaned_affiliation = _clean_aff_markup(markup)
+    # checking is the aff. value captured by xpath is just new line
+    if cleaned_affiliation.split():
+        return cleaned_affiliation
+    # if aff. value captured by xpath is just new line, we have to take all data in aff tags.
+    # because xpath cannot capture data if there is new line and just after different tags.
+    # it will take just new line, but not further text
+    string = markup.encode('ascii', 'ignore')
+    without_spaces = ' '.join(string.split())
+    return re.search('</label>(.*)</aff>', without_spaces).group(1).strip()
 
 
 class Jats(object):
     """Special extractions for JATS formats."""
 
+    # Prefix of the publisher specific expressions in the XPath registry.
+    publisher = None
+
+    def __init__(self, use_xslt=False, min_authors=0):
+        self.min_authors = min_authors
+        self.xslt = None
+        if use_xslt:
+            self.xslt = XSLTExtractor('jats', publisher=self.publisher)
+
+    def _load_front_matter(self, record, node):
+        """Add the fields copied as they are from the XML, return the authors.
+
+        The fields are read by the ``jats`` stylesheet when the parser was
+        created with ``use_xslt``.
+        """
+        if self.xslt is not None:
+            return self.xslt.load(record, node).get('authors', [])
+
+        record.add_xpath('title', XPATHS[self.publisher + '.title'])
+        record.add_xpath('subtitle', XPATHS['jats.subtitle'])
+
+        authors = self._get_authors(node, record.new_authors())
+        record.add_value('authors', authors)
+        record.add_xpath('collaborations', XPATHS['jats.collaborations'])
+
+        record.add_xpath('journal_title', XPATHS['jats.journal_title'])
+        record.add_xpath('journal_issue', XPATHS['jats.journal_issue'])
+        record.add_xpath('journal_volume', XPATHS['jats.journal_volume'])
+        record.add_xpath('journal_artid', XPATHS['jats.journal_artid'])
+
+        record.add_xpath('copyright_holder', XPATHS['jats.copyright_holder'])
+        record.add_xpath('copyright_year', XPATHS['jats.copyright_year'])
+        record.add_xpath('copyright_statement', XPATHS['jats.copyright_statement'])
+
+        return authors
+
     def _get_published_date(self, node):
         """Return a ISO string of published date (e.g. 2001-01-01)."""
         def format_date(day, month, year):
@@ -28,38 +91,29 @@ class Jats(object):
             year = int(get_first(year, 1))
             return datetime.date(day=day, month=month, year=year).isoformat()
 
-        if node.xpath(".//date[@date-type='published']"):
+        if XPATHS.select(node, 'jats.date', type='published'):
             return format_date(
-                day=node.xpath(
-                    ".//date[@date-type='published']/day/text()").extract(),
-                month=node.xpath(
-                    ".//date[@date-type='published']/month/text()").extract(),
-                year=node.xpath(
-                    ".//date[@date-type='published']/year/text()").extract(),
+                day=XPATHS.select(node, 'jats.date_day', type='published').extract(),
+                month=XPATHS.select(node, 'jats.date_month', type='published').extract(),
+                year=XPATHS.select(node, 'jats.date_year', type='published').extract(),
             )
-        elif node.xpath(".//pub-date[@pub-type='epub']"):
+        elif XPATHS.select(node, 'jats.pub_date_by_type', type='epub'):
             return format_date(
-                day=node.xpath(
-                    ".//pub-date[@pub-type='epub']/day/text()").extract(),
-                month=node.xpath(
-                    ".//pub-date[@pub-type='epub']/month/text()").extract(),
-                year=node.xpath(
-                    ".//pub-date[@pub-type='epub']/year/text()").extract(),
+                day=XPATHS.select(node, 'jats.pub_date_by_type_day', type='epub').extract(),
+                month=XPATHS.select(node, 'jats.pub_date_by_type_month', type='epub').extract(),
+                year=XPATHS.select(node, 'jats.pub_date_by_type_year', type='epub').extract(),
             )
-        elif node.xpath(".//pub-date[@pub-type='ppub']"):
+        elif XPATHS.select(node, 'jats.pub_date_by_type', type='ppub'):
             return format_date(
-                day=node.xpath(
-                    ".//pub-date[@pub-type='ppub']/day/text()").extract(),
-                month=node.xpath(
-                    ".//pub-date[@pub-type='ppub']/month/text()").extract(),
-                year=node.xpath(
-                    ".//pub-date[@pub-type='ppub']/year/text()").extract(),
+                day=XPATHS.select(node, 'jats.pub_date_by_type_day', type='ppub').extract(),
+                month=XPATHS.select(node, 'jats.pub_date_by_type_month', type='ppub').extract(),
+                year=XPATHS.select(node, 'jats.pub_date_by_type_year', type='ppub').extract(),
             )
-        elif node.xpath(".//pub-date"):
+        elif XPATHS.select(node, 'jats.pub_date'):
             return format_date(
-                day=node.xpath(".//pub-date/day/text()").extract(),
-                month=node.xpath(".//pub-date/month/text()").extract(),
-                year=node.xpath(".//pub-date/year/text()").extract(),
+                day=XPATHS.select(node, 'jats.pub_date_day').extract(),
+                month=XPATHS.select(node, 'jats.pub_date_month').extract(),
+                year=XPATHS.select(node, 'jats.pub_date_year').extract(),
             )
         else:
             # In the worst case we return today
@@ -69,54 +123,40 @@ class Jats(object):
         """Return tuple of keywords, PACS from node."""
         free_keywords = []
         classification_numbers = []
-        for group in node.xpath('.//kwd-group'):
-            if "pacs" in group.xpath('@kwd-group-type').extract():
-                for keyword in group.xpath('kwd/text()').extract():
+        for group in XPATHS.select(node, 'jats.keyword_groups'):
+            if "pacs" in XPATHS.select(group, 'jats.keyword_group_type').extract():
+                for keyword in XPATHS.select(group, 'jats.keyword_texts').extract():
                     classification_numbers.append(keyword)
             else:
-                for keyword in group.xpath('kwd').extract():
+                for keyword in XPATHS.select(group, 'jats.keywords').extract():
                     free_keywords.append(keyword)
         return free_keywords, classification_numbers
 
     def _clean_aff(self, aff):
-        root = ET.fromstring(aff.extract().encode('UTF-8'))
-        for el in root:
-            if el.tag == 'label':
-                root.remove(el)
-        return ''.join(root.itertext())
-
-    def _get_authors(self, node):
-        authors = []
-        for contrib in node.xpath(".//contrib[@contrib-type='author']"):
-            surname = contrib.xpath("name/surname/text()").extract()
-            given_names = contrib.xpath("name/given-names/text()").extract()
-            email = contrib.xpath("email/text()").extract()
-
-            affiliations = contrib.xpath('aff')
-            reffered_ids = contrib.xpath("xref[@ref-type='aff']/@rid").extract()
+        return _clean_aff_markup(aff.extract())
+
+    def _get_authors(self, node, authors=None):
+        if authors is None:
+            authors = []
+        for contrib in XPATHS.select(node, 'jats.authors'):
+            surname = XPATHS.select(contrib, 'jats.author_surname').extract()
+            given_names = XPATHS.select(contrib, 'jats.author_given_names').extract()
+            email = XPATHS.select(contrib, 'jats.author_email').extract()
+
+            affiliations = XPATHS.select(contrib, 'jats.author_affiliations')
+            reffered_ids = XPATHS.select(contrib, 'jats.author_affiliation_ids').extract()
 
             if reffered_ids:
                 for reffered_id in reffered_ids:
                     if reffered_id:
-                        affiliations += node.xpath(
-                            ".//aff[@id='{0}']".format(reffered_id))
-
-            affiliations_values = []
-
-            for aff in affiliations:
-                # checking is the aff. value captured by xpath is just new line
-                if self._clean_aff(aff).split():
-                    cleaned_affiliation = self._clean_aff(aff)
-                    affiliations_values.append({'value': cleaned_affiliation})
-                else:
-                    # if aff. value captured by xpath is just new line, we have to take all data in aff tags.
-                    # because xpath cannot capture data if there is new line and just after different tags.
-                    # it will take just new line, but not further text
-                    string = aff.get().encode('ascii', 'ignore')
-                    without_spaces = ' '.join(string.split())
-                    between_tags = re.search(
-                        '</label>(.*)</aff>', without_spaces).group(1).strip()
-                    affiliations_values.append({'value': between_tags})
+                        affiliations += XPATHS.select(
+                            node, 'jats.affiliation_by_id', id=reffered_id)
+
+            # the authors share the strings of the affiliations they have in common
+            affiliations_values = [
+                {'value': _affiliation_value(aff.extract())}
+                for aff in affiliations
+            ]
 
             author = {
                 'surname': get_first(surname, ""),
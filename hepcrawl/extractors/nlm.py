@@ -11,6 +11,8 @@
 
 from __future__ import absolute_import, print_function
 
+from ..xpaths import XPATHS
+
 
 class NLM(object):
     """Special extractions for NLM formats."""
@@ -19,11 +21,11 @@ class NLM(object):
     def get_authors(node):
         """Get the authors."""
         authors = []
-        for author in node.xpath("./AuthorList//Author"):
-            surname = author.xpath("./LastName/text()").extract_first()
-            firstname = author.xpath("./FirstName/text()").extract_first()
-            middlename = author.xpath("./MiddleName/text()").extract_first()
-            affiliations = author.xpath(".//Affiliation/text()").extract()
+        for author in XPATHS.select(node, 'nlm.authors'):
+            surname = XPATHS.select(author, 'nlm.author_last_name').extract_first()
+            firstname = XPATHS.select(author, 'nlm.author_first_name').extract_first()
+            middlename = XPATHS.select(author, 'nlm.author_middle_name').extract_first()
+            affiliations = XPATHS.select(author, 'nlm.author_affiliations').extract()
 
             if not surname:
                 surname = ""
@@ -57,20 +59,18 @@ class NLM(object):
     @staticmethod
     def get_dois(node):
         """Get DOI."""
-        dois = node.xpath(
-            ".//ArticleIdList/ArticleId[@IdType='doi']/text()").extract()
+        dois = XPATHS.select(node, 'nlm.doi').extract()
         if not dois:
-            dois = node.xpath(
-                ".//ELocationID[@EIdType='doi']/text()").extract()
+            dois = XPATHS.select(node, 'nlm.elocation_doi').extract()
 
         return dois
 
     @staticmethod
     def get_date_published(node):
         """Publication date."""
-        year = node.xpath(".//Journal/PubDate/Year/text()").extract_first()
-        month = node.xpath(".//Journal/PubDate/Month/text()").extract_first()
-        day = node.xpath(".//Journal/PubDate/Day/text()").extract_first()
+        year = XPATHS.select(node, 'nlm.pub_year').extract_first()
+        month = XPATHS.select(node, 'nlm.pub_month').extract_first()
+        day = XPATHS.select(node, 'nlm.pub_day').extract_first()
 
         date_published = ""
         if year:
@@ -94,7 +94,7 @@ class NLM(object):
                 "revised",
                 "ecollection"
         """
-        pubstatus = node.xpath(".//Journal/PubDate/@PubStatus").extract_first()
+        pubstatus = XPATHS.select(node, 'nlm.pub_status').extract_first()
 
         return pubstatus
 
@@ -131,15 +131,15 @@ class NLM(object):
                 "Video-Audio Media",
                 "Webcasts"
         """
-        pubtype = node.xpath(".//PublicationType/text()").extract_first()
+        pubtype = XPATHS.select(node, 'nlm.publication_type').extract_first()
         return pubtype
 
     @staticmethod
     def get_page_numbers(node):
         """Get page numbers and number of pages."""
 
-        fpage = node.xpath(".//FirstPage/text()").extract_first()
-        lpage = node.xpath(".//LastPage/text()").extract_first()
+        fpage = XPATHS.select(node, 'nlm.first_page').extract_first()
+        lpage = XPATHS.select(node, 'nlm.last_page').extract_first()
         if fpage and lpage:
             page_nr = str(int(lpage) - int(fpage) + 1)
         else:
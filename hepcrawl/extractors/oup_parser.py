@@ -4,11 +4,13 @@ from hepcrawl.extractors.jats import Jats
 from hepcrawl.items import HEPRecord
 from hepcrawl.loaders import HEPLoader
 from hepcrawl.utils import get_license
+from hepcrawl.xpaths import XPATHS, extract_without_namespaces
 
 logger = logging.getLogger(__name__)
 
 
 class OUPParser(Jats):
+    publisher = 'oup'
     article_type_mapping = {
         'research-article': 'article',
         'corrected-article': 'article',
@@ -20,13 +22,13 @@ class OUPParser(Jats):
 
     def parse_node(self, response, node):
         """Parse a OUP XML file into a HEP record."""
-        node.remove_namespaces()
-        record = HEPLoader(item=HEPRecord(), selector=node, response=response)
+        record = HEPLoader(item=HEPRecord(), selector=node, response=response,
+                           min_authors=self.min_authors)
 
-        dois = node.xpath("//article-id[@pub-id-type='doi']/text()").extract()
+        dois = XPATHS.select(node, 'jats.doi').extract()
         record.add_value('dois', dois)
 
-        raw_article_type = node.xpath('./@article-type').extract()
+        raw_article_type = XPATHS.select(node, 'oup.article_type').extract()
         article_type = map(lambda x: self.article_type_mapping.get(x, 'other'), raw_article_type)
         record.add_value('journal_doctype', article_type)
 
@@ -36,7 +38,7 @@ class OUPParser(Jats):
 
         if article_type in ['correction', 'addendum']:
             logger.info('Adding related_article_doi.')
-            record.add_xpath('related_article_doi', "//related-article[@ext-link-type='doi']/@href")
+            record.add_xpath('related_article_doi', XPATHS['jats.related_article_doi'])
 
         arxiv_eprints = self.get_arxiv_eprints(node)
         if not arxiv_eprints:
@@ -44,7 +46,7 @@ class OUPParser(Jats):
         else:
             record.add_value('arxiv_eprints', arxiv_eprints)
 
-        page_nr = node.xpath("//counts/page-count/@count")
+        page_nr = XPATHS.select(node, 'jats.page_count')
         if page_nr:
             try:
                 page_nr = map(int, page_nr.extract())
@@ -52,35 +54,22 @@ class OUPParser(Jats):
             except ValueError as e:
                 logger.error('Failed to parse last_page or first_page for article %s: %s' % (dois, e))
 
-        record.add_xpath('abstract', '//abstract[1]')
-        record.add_xpath('title', '//article-title/text()')
-        record.add_xpath('subtitle', '//subtitle/text()')
+        record.add_value('abstract', extract_without_namespaces(
+            XPATHS.select(node, 'oup.abstract')))
 
-        authors = self._get_authors(node)
+        authors = self._load_front_matter(record, node)
         if not authors:
             logger.error('No authors found for article %s.' % dois)
-        record.add_value('authors', authors)
-        record.add_xpath('collaborations', "//contrib/collab/text()")
 
         record.add_value('date_published', self._get_published_date(node))
 
-        journal_title = '//abbrev-journal-title/text()|//journal-title/text()'
-        record.add_xpath('journal_title', journal_title)
-        record.add_xpath('journal_issue', '//issue/text()')
-        record.add_xpath('journal_volume', '//volume/text()')
-        record.add_xpath('journal_artid', '//elocation-id/text()')
-
         published_date = self._get_published_date(node)
         volume = self.get_volume_year(node)
         record.add_value('journal_year', int(volume))
         record.add_value('date_published', published_date)
 
-        record.add_xpath('copyright_holder', '//copyright-holder/text()')
-        record.add_xpath('copyright_year', '//copyright-year/text()')
-        record.add_xpath('copyright_statement', '//copyright-statement/text()')
-
         license = get_license(
-            license_url=node.xpath('//license/license-p/ext-link/text()').extract_first()
+            license_url=XPATHS.select(node, 'oup.license_url').extract_first()
         )
         record.add_value('license', license)
 
@@ -101,7 +90,7 @@ class OUPParser(Jats):
     def get_arxiv_eprints(self, node):
         arxiv_eprints = []
 
-        arxivs_raw = node.xpath("//article-id[@pub-id-type='arxiv']/text()")
+        arxivs_raw = XPATHS.select(node, 'oup.arxiv_eprints')
         for arxiv in arxivs_raw:
             ar = arxiv.extract().replace('arXiv:', '')
             if ar:
@@ -110,6 +99,6 @@ class OUPParser(Jats):
         return arxiv_eprints
 
     def get_volume_year(self, node):
-        raw_volume = node.xpath('//volume/text()')
+        raw_volume = XPATHS.select(node, 'jats.journal_volume')
         volume_year = raw_volume.extract()[0]
         return volume_year
@@ -5,6 +5,8 @@ import re
 from ..items import HEPRecord
 from ..loaders import HEPLoader
 from ..utils import get_license
+from ..xpaths import XPATHS, extract_without_namespaces
+from .xslt import XSLTExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -49,17 +51,22 @@ class S3ElsevierParser(object):
         'ssu': 'other'
     }
 
+    def __init__(self, use_xslt=False, min_authors=0):
+        self.min_authors = min_authors
+        self.xslt = None
+        if use_xslt:
+            self.xslt = XSLTExtractor('elsevier')
+
     def parse_node(self, meta, node):
         """Parse a OUP XML file into a HEP record."""
-        node.remove_namespaces()
-        record = HEPLoader(item=HEPRecord(), selector=node)
+        record = HEPLoader(item=HEPRecord(), selector=node, min_authors=self.min_authors)
 
-        article_type = node.xpath('./@docsubtype').extract()
+        article_type = XPATHS.select(node, 'elsevier.article_type').extract()
         article_type = map(lambda x: self.article_type_mapping.get(
             x, 'other'), article_type)
         record.add_value('journal_doctype', article_type)
 
-        dois = node.xpath('./item-info/doi/text()').extract()
+        dois = XPATHS.select(node, 'elsevier.doi').extract()
         try:
             doi = dois[0]
             record.add_value('dois', dois)
@@ -68,22 +75,14 @@ class S3ElsevierParser(object):
                 logger.info(
                     'Adding related_article_doi for article %s.' % dois)
                 record.add_xpath('related_article_doi',
-                                 "//related-article[@ext-link-type='doi']/@href")
-
-            record.add_xpath(
-                'abstract', './*[self::head | self::simple-head]/abstract[1]/abstract-sec')
-            record.add_xpath(
-                'title', './*[self::head | self::simple-head]/title/text()')
-            record.add_xpath(
-                'subtitle', './*[self::head | self::simple-head]/subtitle/text()')
+                                 XPATHS['elsevier.related_article_doi'])
 
-            record.add_value('authors', self.get_authors(node, dois))
-            record.add_xpath(
-                'collaborations', "./*[self::head | self::simple-head]/author-group/collaboration/text/text()")
+            record.add_value('abstract', extract_without_namespaces(
+                XPATHS.select(node, 'elsevier.abstract')))
+            self._load_front_matter(record, node, dois)
 
             record.add_value('journal_title', meta['articles'][doi]['journal'])
             record.add_value('journal_volume', meta['volume'])
-            record.add_xpath('journal_artid', '//item-info/aid/text()')
 
             first_page = meta['articles'][doi].get('first-page')
             last_page = meta['articles'][doi].get('last-page')
@@ -104,18 +103,13 @@ class S3ElsevierParser(object):
             record.add_value('date_published',
                              published_date.strftime("%Y-%m-%d"))
 
-            record.add_xpath('copyright_holder',
-                             './item-info/copyright/text()')
-            record.add_xpath('copyright_year', './item-info/copyright/@year')
-            record.add_xpath('copyright_statement',
-                             './item-info/copyright/text()')
-
             license = get_license(
                 license_url='http://creativecommons.org/licenses/by/3.0/'
             )
             record.add_value('license', license)
 
-            record.add_value('collections', [meta['articles'][doi]['journal']])
+            # the collection is the journal title as normalized by the loader
+            record.add_value('collections', [record.get_output_value('journal_title')])
 
             # local file paths
             local_files = []
@@ -128,18 +122,42 @@ class S3ElsevierParser(object):
         except IndexError:
             logger.error("Article has no DOI")
 
-    def get_authors(self, node, dois):
-        """Get the authors."""
-        authors = []
+    def _load_front_matter(self, record, node, dois):
+        """Add the fields copied as they are from the XML.
+
+        The fields are read by the ``elsevier`` stylesheet when the parser
+        was created with ``use_xslt``.
+        """
+        if self.xslt is not None:
+            if not self.xslt.load(record, node).get('authors'):
+                logger.error('No authors found for article %s.' % dois)
+            return
+
+        record.add_xpath('title', XPATHS['elsevier.title'])
+        record.add_xpath('subtitle', XPATHS['elsevier.subtitle'])
+
+        record.add_value('authors', self.get_authors(node, dois, record.new_authors()))
+        record.add_xpath('collaborations', XPATHS['elsevier.collaborations'])
+
+        record.add_xpath('journal_artid', XPATHS['elsevier.journal_artid'])
+
+        record.add_xpath('copyright_holder', XPATHS['elsevier.copyright'])
+        record.add_xpath('copyright_year', XPATHS['elsevier.copyright_year'])
+        record.add_xpath('copyright_statement', XPATHS['elsevier.copyright'])
+
+    def get_authors(self, node, dois, authors=None):
+        """Get the authors, appended to `authors` if given."""
+        if authors is None:
+            authors = []
 
-        for author_group in node.xpath("//author-group"):
-            for author in author_group.xpath("./author"):
-                surname = author.xpath("./surname/text()")
-                given_names = author.xpath("./given-name/text()")
+        for author_group in XPATHS.select(node, 'elsevier.author_groups'):
+            for author in XPATHS.select(author_group, 'elsevier.authors'):
+                surname = XPATHS.select(author, 'elsevier.author_surname')
+                given_names = XPATHS.select(author, 'elsevier.author_given_name')
                 affiliations = self._get_affiliations(
                     author_group, author, dois)
                 orcid = self._get_orcid(author)
-                emails = author.xpath("./e-address/text()")
+                emails = XPATHS.select(author, 'elsevier.author_email')
 
                 auth_dict = {}
 
@@ -165,7 +183,7 @@ class S3ElsevierParser(object):
     @staticmethod
     def _get_orcid(author):
         """Return an authors ORCID number."""
-        orcid_raw = author.xpath("./@orcid").extract_first()
+        orcid_raw = XPATHS.select(author, 'elsevier.author_orcid').extract_first()
         if orcid_raw:
             return "ORCID:{0}".format(orcid_raw)
 
@@ -177,14 +195,13 @@ class S3ElsevierParser(object):
         """
         affiliations_by_id = []
         for aff_id in ref_ids:
-            ce_affiliation = author_group.xpath(
-                "//affiliation[@id='" + aff_id + "']")
-            if ce_affiliation.xpath(".//affiliation"):
-                aff = ce_affiliation.xpath(
-                    ".//*[self::organization or self::city or self::country or self::address-line]/text()")
+            ce_affiliation = XPATHS.select(
+                author_group, 'elsevier.affiliation_by_id', id=aff_id)
+            if XPATHS.select(ce_affiliation, 'elsevier.nested_affiliations'):
+                aff = XPATHS.select(ce_affiliation, 'elsevier.affiliation_parts')
                 affiliations_by_id.append(", ".join(aff.extract()))
             elif ce_affiliation:
-                aff = ce_affiliation.xpath("./textfn/text()").extract_first()
+                aff = XPATHS.select(ce_affiliation, 'elsevier.affiliation_text').extract_first()
                 aff = re.sub(r'^(\d+ ?)', "", aff)
                 affiliations_by_id.append(aff)
 
@@ -197,10 +214,9 @@ class S3ElsevierParser(object):
         function _find_affiliations_by_id().
         """
 
-        ref_ids = author.xpath(".//@refid").extract()
-        group_affs = author_group.xpath(
-            ".//affiliation[not(@*)]/textfn/text()")
-        all_group_affs = author_group.xpath(".//affiliation/textfn/text()")
+        ref_ids = XPATHS.select(author, 'elsevier.author_refids').extract()
+        group_affs = XPATHS.select(author_group, 'elsevier.group_affiliations')
+        all_group_affs = XPATHS.select(author_group, 'elsevier.all_group_affiliations')
 
         # Don't take correspondence (cor1) or deceased (fn1):
         ref_ids = filter(lambda x: 'aff' in x, ref_ids)
@@ -212,7 +228,7 @@ class S3ElsevierParser(object):
         # if we have no affiliations yet, we got a bad xml, without affiliation cross references.
         # in these cases it seems all group affiliation should be attached to all authors.
         if not affiliations:
-            author_ids = author.xpath('./@author-id').extract()
+            author_ids = XPATHS.select(author, 'elsevier.author_id').extract()
             logger.error('Not found referenced affiliations (%s), adding all in the group for author '
                          'with id: %s for article %s' % (ref_ids, author_ids, dois))
             affiliations += all_group_affs.extract()
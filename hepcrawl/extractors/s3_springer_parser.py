@@ -5,6 +5,8 @@ import re
 from ..items import HEPRecord
 from ..loaders import HEPLoader
 from ..utils import get_first
+from ..xpaths import XPATHS, extract_without_namespaces
+from .xslt import XSLTExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -33,16 +35,22 @@ class S3SpringerParser(object):
         "Unknown": "other"
     }
 
+    def __init__(self, use_xslt=False, min_authors=0):
+        self.min_authors = min_authors
+        self.xslt = None
+        if use_xslt:
+            self.xslt = XSLTExtractor('springer')
+
     def parse_node(self, response, node):
         """Parse a Springer XML file into a HEP record."""
-        node.remove_namespaces()
-        record = HEPLoader(item=HEPRecord(), selector=node, response=response)
+        record = HEPLoader(item=HEPRecord(), selector=node, response=response,
+                           min_authors=self.min_authors)
 
-        article_type = node.xpath('//Article/ArticleInfo/@ArticleType').extract()
+        article_type = XPATHS.select(node, 'springer.article_type').extract()
         article_type = map(lambda x: self.article_type_mapping.get(x, 'other'), article_type)
         record.add_value('journal_doctype', article_type)
 
-        dois = node.xpath("//ArticleDOI/text()").extract()
+        dois = XPATHS.select(node, 'springer.doi').extract()
         record.add_value('dois', dois)
 
         arxiv_eprints = self._get_arxiv_eprints(node)
@@ -52,8 +60,8 @@ class S3SpringerParser(object):
             record.add_value('arxiv_eprints', arxiv_eprints)
 
         # extract first and last page, then calculate the number of pages
-        first_pages = node.xpath('//ArticleFirstPage/text()').extract()
-        last_pages = node.xpath('//ArticleLastPage/text()').extract()
+        first_pages = XPATHS.select(node, 'springer.first_page').extract()
+        last_pages = XPATHS.select(node, 'springer.last_page').extract()
         if first_pages and last_pages:
             try:
                 page_nrs = map(lambda (first, last): int(last) - int(first) + 1, zip(first_pages, last_pages))
@@ -61,35 +69,25 @@ class S3SpringerParser(object):
             except ValueError as e:
                 logger.error('Failed to parse last_page or first_page for article %s: %s' % (dois, e))
 
-        record.add_xpath('abstract', '//Article/ArticleHeader/Abstract/Para')
+        record.add_value('abstract', extract_without_namespaces(
+            XPATHS.select(node, 'springer.abstract')))
 
-        title = node.xpath('//ArticleTitle')
-        title = re.sub('<math>.*?</math>', '', title.extract()[0])
+        title = extract_without_namespaces(XPATHS.select(node, 'springer.title'))
+        title = re.sub('<math>.*?</math>', '', title[0])
         record.add_value('title', title)
 
-        record.add_value('authors', self._get_authors(node, dois))
-        record.add_xpath('collaborations', '//InstitutionalAuthor/InstitutionalAuthorName/text()')
-
-        journal = node.xpath('//JournalTitle/text()').extract()[0].lstrip('The ')
-        record.add_value('journal_title', journal)
-        record.add_xpath('journal_issue', '//IssueIDStart/text()')
-        record.add_xpath('journal_volume', '//VolumeIDStart/text()')
-        record.add_xpath('journal_artid', '//Article/@ID')
+        self._load_front_matter(record, node, dois)
 
-        record.add_xpath('journal_fpage', '//ArticleFirstPage/text()')
-        record.add_xpath('journal_lpage', '//ArticleLastPage/text()')
+        record.add_value('journal_title', XPATHS.select(node, 'springer.journal_title').extract()[0])
 
         published_date = self._get_published_date(node)
         record.add_value('journal_year', published_date.year)
         record.add_value('date_published', published_date.isoformat())
 
-        record.add_xpath('copyright_holder', '//ArticleCopyright/CopyrightHolderName/text()')
-        record.add_xpath('copyright_year', '//ArticleCopyright/CopyrightYear/text()')
-        record.add_xpath('copyright_statement', '//ArticleCopyright/copyright-statement/text()')
-
         record.add_value('license', self._get_license(node, dois))
 
-        record.add_value('collections', [journal])
+        # the collection is the journal title as normalized by the loader
+        record.add_value('collections', [record.get_output_value('journal_title')])
 
         # local file paths
         local_files = []
@@ -102,15 +100,40 @@ class S3SpringerParser(object):
 
         return dict(record.load_item())
 
+    def _load_front_matter(self, record, node, dois):
+        """Add the fields copied as they are from the XML.
+
+        The fields are read by the ``springer`` stylesheet when the parser
+        was created with ``use_xslt``.
+        """
+        if self.xslt is not None:
+            if not self.xslt.load(record, node).get('authors'):
+                logger.error('No authors found for article %s.' % dois)
+            return
+
+        record.add_value('authors', self._get_authors(node, dois, record.new_authors()))
+        record.add_xpath('collaborations', XPATHS['springer.collaborations'])
+
+        record.add_xpath('journal_issue', XPATHS['springer.journal_issue'])
+        record.add_xpath('journal_volume', XPATHS['springer.journal_volume'])
+        record.add_xpath('journal_artid', XPATHS['springer.journal_artid'])
+
+        record.add_xpath('journal_fpage', XPATHS['springer.first_page'])
+        record.add_xpath('journal_lpage', XPATHS['springer.last_page'])
+
+        record.add_xpath('copyright_holder', XPATHS['springer.copyright_holder'])
+        record.add_xpath('copyright_year', XPATHS['springer.copyright_year'])
+        record.add_xpath('copyright_statement', XPATHS['springer.copyright_statement'])
+
     def _get_published_date(self, node):
-        year = node.xpath('//ArticleInfo/*/OnlineDate/Year/text()').extract()[0]
-        month = node.xpath('//ArticleInfo/*/OnlineDate/Month/text()').extract()[0]
-        day = node.xpath('//ArticleInfo/*/OnlineDate/Day/text()').extract()[0]
+        year = XPATHS.select(node, 'springer.online_year').extract()[0]
+        month = XPATHS.select(node, 'springer.online_month').extract()[0]
+        day = XPATHS.select(node, 'springer.online_day').extract()[0]
         return datetime.date(day=int(day), month=int(month), year=int(year))
 
     def _get_license(self, node, dois):
-        license_type = node.xpath('//License/@SubType').extract()
-        version = node.xpath('//License/@Version').extract()
+        license_type = XPATHS.select(node, 'springer.license_type').extract()
+        version = XPATHS.select(node, 'springer.license_version').extract()
         text = "https://creativecommons.org/licenses/"
 
         if license_type:
@@ -125,13 +148,13 @@ class S3SpringerParser(object):
         return {"license": "CC-BY-3.0", "url": "https://creativecommons.org/licenses/by/3.0"}
 
     def _clean_aff(self, node):
-        org_div = node.xpath('./OrgDivision/text()').extract_first()
-        org_name = node.xpath('./OrgName/text()').extract_first()
-        street = node.xpath('./OrgAddress/Street/text()').extract_first()
-        city = node.xpath('./OrgAddress/City/text()').extract_first()
-        state = node.xpath('./OrgAddress/State/text()').extract_first()
-        postcode = node.xpath('./OrgAddress/Postcode/text()').extract_first()
-        country = node.xpath('./OrgAddress/Country/text()').extract_first()
+        org_div = XPATHS.select(node, 'springer.org_division').extract_first()
+        org_name = XPATHS.select(node, 'springer.org_name').extract_first()
+        street = XPATHS.select(node, 'springer.org_street').extract_first()
+        city = XPATHS.select(node, 'springer.org_city').extract_first()
+        state = XPATHS.select(node, 'springer.org_state').extract_first()
+        postcode = XPATHS.select(node, 'springer.org_postcode').extract_first()
+        country = XPATHS.select(node, 'springer.org_country').extract_first()
 
         result = []
         if org_div:
@@ -153,13 +176,13 @@ class S3SpringerParser(object):
 
     def _get_affiliations(self, node, contrib):
         affiliations = []
-        referred_id = contrib.xpath("@AffiliationIDS").extract()
+        referred_id = XPATHS.select(contrib, 'springer.affiliation_ids').extract()
 
         if not referred_id:
             return affiliations
 
         for ref in referred_id[0].split():
-            cleaned_aff = self._clean_aff(node.xpath("//Affiliation[@ID='{0}']".format(ref)))
+            cleaned_aff = self._clean_aff(XPATHS.select(node, 'springer.affiliation_by_id', id=ref))
             if cleaned_aff not in affiliations:
                 affiliations.append(cleaned_aff)
 
@@ -169,12 +192,13 @@ class S3SpringerParser(object):
 
         return mapped_affiliations
 
-    def _get_authors(self, node, dois):
-        authors = []
-        for contrib in node.xpath("//Author"):
-            surname = contrib.xpath("./AuthorName/FamilyName/text()").extract()
-            given_names = contrib.xpath("./AuthorName/GivenName/text()").extract()
-            email = contrib.xpath("./Contact/Email/text()").extract()
+    def _get_authors(self, node, dois, authors=None):
+        if authors is None:
+            authors = []
+        for contrib in XPATHS.select(node, 'springer.authors'):
+            surname = XPATHS.select(contrib, 'springer.author_family_name').extract()
+            given_names = XPATHS.select(contrib, 'springer.author_given_name').extract()
+            email = XPATHS.select(contrib, 'springer.author_email').extract()
 
             affiliations = self._get_affiliations(node, contrib)
 
@@ -198,7 +222,7 @@ class S3SpringerParser(object):
     def _get_arxiv_eprints(self, node):
         arxiv_eprints = []
 
-        for arxiv in node.xpath("//ArticleExternalID[@Type='arXiv']/text()"):
+        for arxiv in XPATHS.select(node, 'springer.arxiv_eprints'):
             arxiv_eprints.append({'value': arxiv.extract()})
 
         return arxiv_eprints
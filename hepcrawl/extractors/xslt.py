@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Extraction of HEPRecord fields with compiled XSLT stylesheets.
+
+The stylesheets in ``hepcrawl/stylesheets`` are run by libxslt and turn the
+front matter of an article into a small intermediate document::
+
+    <record>
+        <field name="title">A title</field>
+        <field name="authors">
+            <surname>Doe</surname>
+            <affiliations type="list">
+                <item><value>CERN</value></item>
+            </affiliations>
+        </field>
+    </record>
+
+Every ``field`` is one value of the HEPRecord field `name`. A field, or any
+element below it, holding elements is a dictionary, unless it has
+``type="list"``, and ``null="true"`` stands for ``None``. A ``value`` with
+``type="markup"`` holds the markup of the original document.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+
+import six
+from lxml import etree
+
+STYLESHEETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'stylesheets',
+)
+
+
+def _markup_to_text(element):
+    """Return the markup held by `element`, ASCII only and on one line."""
+    markup = escape(element.text or '') + ''.join(
+        etree.tostring(child, encoding='unicode') for child in element
+    )
+    return ' '.join(markup.encode('ascii', 'ignore').split())
+
+
+def _to_python(element):
+    """Convert an element of the intermediate document."""
+    if element.get('null') == 'true':
+        return None
+    if element.get('type') == 'markup':
+        return _markup_to_text(element)
+    if element.get('type') == 'list':
+        return [_to_python(child) for child in element]
+    if len(element):
+        return dict((child.tag, _to_python(child)) for child in element)
+    return six.text_type(element.text or '')
+
+
+class XSLTExtractor(object):
+    """Extract fields with the stylesheet `name` from ``hepcrawl/stylesheets``.
+
+    Keyword arguments are passed to the stylesheet as string parameters.
+    """
+
+    def __init__(self, name, **params):
+        self.name = name
+        self.params = dict(
+            (key, etree.XSLT.strparam(value)) for key, value in params.items()
+        )
+        self.transform = etree.XSLT(
+            etree.parse(os.path.join(STYLESHEETS_DIR, name + '.xsl'))
+        )
+
+    def extract(self, node, authors=list):
+        """Return the values of every field found in the selector `node`.
+
+        The authors are gathered in the list returned by `authors`.
+        """
+        result = self.transform(node.root, **self.params)
+        fields = OrderedDict()
+        for field in result.getroot():
+            name = field.get('name')
+            if name not in fields:
+                fields[name] = authors() if name == 'authors' else []
+            fields[name].append(_to_python(field))
+        return fields
+
+    def load(self, record, node):
+        """Add the fields found in `node` to the loader `record`.
+
+        Returns the extracted fields.
+        """
+        fields = self.extract(node, authors=record.new_authors)
+        for name, values in fields.items():
+            record.add_value(name, values)
+        return fields
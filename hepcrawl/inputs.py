@@ -17,6 +17,7 @@ from w3lib.html import (
 )
 
 import lxml.etree
+import lxml.html
 from lxml.html import clean
 
 from .mappings import (
@@ -24,7 +25,10 @@ from .mappings import (
     LANGUAGES
 )
 from .utils import (
+    AFFILIATION_CACHE_SIZE,
+    NAME_CACHE_SIZE,
     collapse_initials,
+    memoize,
     split_fullname,
 )
 
@@ -45,11 +49,26 @@ def fix_title_capitalization(title):
     return " ".join(final)
 
 
+SUBSCRIPTS = (
+    ("<sub>", re.compile("<sub>(.*?)</sub>"), r"$_{\1}$"),
+    ("<inf>", re.compile("<inf>(.*?)</inf>"), r"$_{\1}$"),
+    ("<sup>", re.compile("<sup>(.*?)</sup>"), r"$^{\1}$"),
+)
+
+# Text with none of these is left as it is by the HTML cleaning.
+MARKUP_CHARACTERS = re.compile(u'[<>&\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+CLEANER = clean.Cleaner(safe_attrs_only=True, remove_unknown_tags=False)
+
+# Elements whose text is serialized without escaping, e.g. ``<style>``.
+RAW_TEXT_TAGS = ('script', 'style')
+
+
 def convert_html_subscripts_to_latex(text):
     """Convert some HTML tags to latex equivalents."""
-    text = re.sub("<sub>(.*?)</sub>", r"$_{\1}$", text)
-    text = re.sub("<inf>(.*?)</inf>", r"$_{\1}$", text)
-    text = re.sub("<sup>(.*?)</sup>", r"$^{\1}$", text)
+    for start_tag, tag_re, latex in SUBSCRIPTS:
+        if start_tag in text:
+            text = tag_re.sub(latex, text)
     return text
 
 
@@ -89,25 +108,40 @@ def parse_thesis_supervisors(value):
     }
 
 
+@memoize(NAME_CACHE_SIZE)
+def _title_full_name(surname, given_names):
+    return u'{0}, {1}'.format(
+        surname,
+        collapse_initials(given_names),
+    ).title()
+
+
 def add_author_full_name(value):
     """Add `full_name` combination value for an author, if required."""
     if "full_name" not in value:
-        value['full_name'] = u'{0}, {1}'.format(
-            value['surname'],
-            collapse_initials(value['given_names']),
-        ).title()
+        value['full_name'] = _title_full_name(value['surname'], value['given_names'])
     return value
 
 
+@memoize(AFFILIATION_CACHE_SIZE)
+def clean_affiliation(affiliation):
+    """Clean an affiliation string.
+
+    Memoized, so an affiliation shared by many authors is cleaned once and
+    they all get the same string.
+    """
+    # Remove tag AND content of any prefix like <label><sup>1</sup></label>
+    affiliation = remove_tags_with_content(affiliation, ('label',))
+    # Now remove all tags but KEEP content
+    affiliation = remove_tags(affiliation)
+    # Remove random whitespaces
+    return clean_whitespace_characters(affiliation)
+
+
 def clean_tags_from_affiliations(value):
     """Clean the affiliaton string for an author."""
     for affiliation in value.get('affiliations', []):
-        # Remove tag AND content of any prefix like <label><sup>1</sup></label>
-        affiliation['value'] = remove_tags_with_content(affiliation['value'], ('label',))
-        # Now remove all tags but KEEP content
-        affiliation['value'] = remove_tags(affiliation['value'])
-        # Remove random whitespaces
-        affiliation['value'] = clean_whitespace_characters(affiliation['value'])
+        affiliation['value'] = clean_affiliation(affiliation['value'])
     return value
 
 
@@ -138,8 +172,45 @@ def remove_attributes_from_tags(text):
     """Removes attributes from e.g. MathML tags"""
     if text:
         try:
-            cleaner = clean.Cleaner(safe_attrs_only=True, remove_unknown_tags=False)
-            text = cleaner.clean_html(text)
+            text = CLEANER.clean_html(text)
         except lxml.etree.ParserError:
             return text
     return text
+
+
+def sanitize_markup(keep=(), fix_capitalization=False):
+    """Clean a title or an abstract in one go.
+
+    Does what the chain of ``clean_whitespace_characters``,
+    ``convert_html_subscripts_to_latex``, ``fix_title_capitalization`` (if
+    `fix_capitalization`), ``remove_attributes_from_tags``,
+    ``selective_remove_tags(keep=keep)`` and ``unicode.strip`` does, but the
+    markup is parsed only once and the tags are removed from the tree.
+    Text without markup is not parsed at all.
+    """
+    keep = set(tag.lower() for tag in keep)
+
+    def _sanitize_markup(text):
+        text = convert_html_subscripts_to_latex(clean_whitespace_characters(text))
+        if fix_capitalization:
+            text = fix_title_capitalization(text)
+        if not text or not MARKUP_CHARACTERS.search(text):
+            return text.strip()
+
+        try:
+            root = lxml.html.fromstring(text)
+        except lxml.etree.ParserError:
+            return remove_tags(text, keep=keep).strip()
+        CLEANER(root)
+        if next(root.iter(*RAW_TEXT_TAGS), None) is not None:
+            # their text would be escaped once out of them, as the chain does not
+            return remove_tags(lxml.html.tostring(root, encoding='unicode'), keep=keep).strip()
+
+        # the tags are removed from a container, so that the root goes too
+        container = lxml.html.Element('div')
+        container.append(root)
+        for element in list(container.iterdescendants()):
+            if element.tag.lower() not in keep:
+                element.drop_tag()
+        return lxml.html.tostring(container, encoding='unicode')[len('<div>'):-len('</div>')].strip()
+    return _sanitize_markup
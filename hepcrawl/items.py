@@ -13,7 +13,15 @@ See documentation about items in:
 http://doc.scrapy.org/en/latest/topics/items.html
 """
 
+from collections import MutableMapping
+from operator import attrgetter
+from pprint import pformat
+
 import scrapy
+from scrapy.item import BaseItem
+
+from .authors import expand_authors
+from .exporters import pack_record, unpack_record
 
 
 class HEPRecord(scrapy.Item):
@@ -52,7 +60,7 @@ class HEPRecord(scrapy.Item):
         }]
     """
 
-    authors = scrapy.Field()
+    authors = scrapy.Field(serializer=expand_authors)
     """Special author format which will transform the incoming raw data to
     correct formats. For example, by handling initials and full name etc.
 
@@ -68,6 +76,10 @@ class HEPRecord(scrapy.Item):
                 value: "raw string", ..
             }]
         }, ..]
+
+    Records with many authors can hold them in a
+    :class:`hepcrawl.authors.AuthorTable` instead, which is turned back into
+    this list when the item is exported.
     """
     collaborations = scrapy.Field()
     """A list of the record collaborations, if any.
@@ -291,3 +303,149 @@ class HEPRecord(scrapy.Item):
     # store creation date in repo.scoap3.org
     record_creation_date = scrapy.Field()
     control_number = scrapy.Field()
+
+
+FIELD_NAMES = tuple(HEPRecord.fields)
+
+FIELD_BITS = dict((name, 1 << index) for index, name in enumerate(FIELD_NAMES))
+"""Bit of each field in the mask of the fields set in a ``CompactHEPRecord``."""
+
+
+# Names and getter of the fields of each mask seen, records of a spider
+# mostly have the same fields.
+_MASK_FIELDS = {}
+
+
+def _fields_of_mask(mask):
+    """Names of the fields of a mask, and a getter of their values."""
+    try:
+        return _MASK_FIELDS[mask]
+    except KeyError:
+        pass
+    names = tuple(name for name in FIELD_NAMES if FIELD_BITS[name] & mask)
+    if len(names) > 1:
+        getter = attrgetter(*names)
+    else:
+        # attrgetter of one name does not give a tuple
+        def getter(record, getters=[attrgetter(name) for name in names]):
+            return tuple(get(record) for get in getters)
+    if len(_MASK_FIELDS) >= 1024:
+        _MASK_FIELDS.clear()
+    _MASK_FIELDS[mask] = names, getter
+    return names, getter
+
+
+class CompactHEPRecord(MutableMapping, BaseItem):
+    """HEPRecord storing its values in slots instead of a dict.
+
+    It has the fields of :class:`HEPRecord` and can be used instead of it by
+    the loaders, the pipelines and the exporters. It can be pickled and
+    converted to and from dicts and MessagePack.
+
+    The fields which are set are kept as bits of an integer, so the keys and
+    values are read from the slots without looking up the missing fields.
+    """
+
+    __slots__ = FIELD_NAMES + ('_mask',)
+
+    fields = HEPRecord.fields
+
+    def __init__(self, *args, **kwargs):
+        object.__setattr__(self, '_mask', 0)
+        if args or kwargs:
+            values = dict(*args, **kwargs)
+            unknown = set(values).difference(self.fields)
+            if unknown:
+                raise KeyError("%s does not support field: %s" % (self.__class__.__name__, unknown.pop()))
+            mask = 0
+            for key, value in values.items():
+                object.__setattr__(self, key, value)
+                mask |= FIELD_BITS[key]
+            object.__setattr__(self, '_mask', mask)
+
+    def __getitem__(self, key, _bits=FIELD_BITS.get):
+        if _bits(key, 0) & self._mask:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELD_BITS:
+            raise KeyError("%s does not support field: %s" % (self.__class__.__name__, key))
+        object.__setattr__(self, key, value)
+        object.__setattr__(self, '_mask', self._mask | FIELD_BITS[key])
+
+    def __delitem__(self, key):
+        self[key]
+        object.__delattr__(self, key)
+        object.__setattr__(self, '_mask', self._mask & ~FIELD_BITS[key])
+
+    def __iter__(self):
+        return iter(_fields_of_mask(self._mask)[0])
+
+    def __len__(self):
+        return len(_fields_of_mask(self._mask)[0])
+
+    def __contains__(self, key):
+        return bool(FIELD_BITS.get(key, 0) & self._mask)
+
+    def get(self, key, default=None):
+        if FIELD_BITS.get(key, 0) & self._mask:
+            return getattr(self, key)
+        return default
+
+    def pop(self, key, *default):
+        bit = FIELD_BITS.get(key, 0)
+        if not bit & self._mask:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = getattr(self, key)
+        object.__delattr__(self, key)
+        object.__setattr__(self, '_mask', self._mask & ~bit)
+        return value
+
+    def keys(self):
+        return list(_fields_of_mask(self._mask)[0])
+
+    def values(self):
+        return list(_fields_of_mask(self._mask)[1](self))
+
+    def items(self):
+        names, getter = _fields_of_mask(self._mask)
+        return list(zip(names, getter(self)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Use item[%r] = %r to set field value" % (name, value))
+
+    __hash__ = BaseItem.__hash__
+
+    def __repr__(self):
+        return pformat(self.to_dict())
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def copy(self):
+        return self.__class__(self.to_dict())
+
+    def to_dict(self):
+        """Return the fields which are set as a dict."""
+        names, getter = _fields_of_mask(self._mask)
+        return dict(zip(names, getter(self)))
+
+    @classmethod
+    def from_dict(cls, values):
+        """Return a record with the fields of a dict or an item."""
+        return cls(values)
+
+    def to_msgpack(self):
+        """Return the record packed with MessagePack."""
+        return pack_record(self.to_dict())
+
+    @classmethod
+    def from_msgpack(cls, data):
+        """Return the record packed in ``data`` by ``to_msgpack``."""
+        return cls(unpack_record(data))
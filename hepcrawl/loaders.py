@@ -13,33 +13,99 @@
 See documentation in: http://doc.scrapy.org/en/latest/topics/items.html
 """
 
+from lxml import etree
 from scrapy.loader import ItemLoader
 from scrapy.loader.processors import Join, MapCompose, TakeFirst
+from scrapy.utils.misc import arg_to_iter
+from scrapy.utils.python import flatten, get_func_args
 from scrapy.utils.url import canonicalize_url
 
 from .inputs import (
-    fix_title_capitalization,
     selective_remove_tags,
     convert_html_subscripts_to_latex,
     parse_authors,
     clean_tags_from_affiliations,
     clean_collaborations,
     clean_whitespace_characters,
-    remove_attributes_from_tags,
+    sanitize_markup,
     translate_language,
     parse_thesis_supervisors,
 )
 
 from .outputs import (
+    CompactAuthors,
     FreeKeywords,
     ClassificationNumbers,
     ListToValueDict,
 )
 
+from .authors import AuthorTable
+
 from .mappings import MATHML_ELEMENTS
 
 from .dateutils import format_date
 
+from .utils import normalize_journal_title
+
+from .xpaths import select
+
+
+def _takes_loader_context(function):
+    return 'loader_context' in get_func_args(function)
+
+
+def _compile_map_compose(functions):
+    """Return ``MapCompose(*functions)`` as a plain function of the values."""
+    def process(values):
+        values = arg_to_iter(values)
+        for function in functions:
+            next_values = []
+            for value in values:
+                next_values += arg_to_iter(function(value))
+            values = next_values
+        return values
+    return process
+
+
+def _compile_processor(processor):
+    """Return `processor` as a plain function of the values.
+
+    Returns None for the processors that need the loader context.
+    """
+    if isinstance(processor, MapCompose):
+        if processor.default_loader_context or any(
+            _takes_loader_context(function) for function in processor.functions
+        ):
+            return None
+        return _compile_map_compose(tuple(processor.functions))
+    if _takes_loader_context(processor):
+        return None
+    return processor
+
+
+class AuthorCollector(object):
+    """Gather the authors of a record in an ``AuthorTable`` while parsing.
+
+    Every author appended goes through the ``authors_in`` processor of the
+    loader right away and is stored in the table, so the parser does not
+    keep one dict per author. Adding the collector to the loader adds the
+    table as it is.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.table = AuthorTable()
+
+    def append(self, author):
+        for value in self.loader._process_input_value('authors', author):
+            self.table.append(value)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(self.table)
+
 
 class HEPLoader(ItemLoader):
     """Input/Output processors for a HEP record.
@@ -67,20 +133,34 @@ class HEPLoader(ItemLoader):
 
     ListToValueDict is used to generate the appropriate nested dictionary
     structures required by the HEP data model.
+
+    Compiled processors
+    ~~~~~~~~~~~~~~~~~~~
+
+    The processors of a field are looked up and compiled to plain functions
+    the first time the field is used, instead of on every value. Processors
+    taking a `loader_context` are run by scrapy as usual.
+
+    Authors
+    ~~~~~~~
+
+    With ``min_authors`` in the loader context (see
+    ``COMPACT_AUTHORS_MIN_COUNT``), the parsers gather the authors in the
+    collector returned by `new_authors`, and records with at least that many
+    authors keep them in an ``AuthorTable``.
     """
+    _compiled = {}
+
     source_out = TakeFirst()
 
     authors_in = MapCompose(
         parse_authors,
         clean_tags_from_affiliations,
     )
+    authors_out = CompactAuthors()
 
     abstract_in = MapCompose(
-        clean_whitespace_characters,
-        convert_html_subscripts_to_latex,
-        remove_attributes_from_tags,
-        selective_remove_tags(keep=MATHML_ELEMENTS),
-        unicode.strip,
+        sanitize_markup(keep=MATHML_ELEMENTS),
     )
 
     abstract_out = TakeFirst()
@@ -93,26 +173,19 @@ class HEPLoader(ItemLoader):
     collections_out = ListToValueDict(key="primary")
 
     title_in = MapCompose(
-        clean_whitespace_characters,
-        convert_html_subscripts_to_latex,
-        fix_title_capitalization,
-        remove_attributes_from_tags,
-        selective_remove_tags(keep=MATHML_ELEMENTS),
-        unicode.strip,
+        sanitize_markup(keep=MATHML_ELEMENTS, fix_capitalization=True),
     )
 
     subtitle_in = MapCompose(
-        clean_whitespace_characters,
-        convert_html_subscripts_to_latex,
-        fix_title_capitalization,
-        remove_attributes_from_tags,
-        selective_remove_tags(keep=MATHML_ELEMENTS),
-        unicode.strip,
+        sanitize_markup(keep=MATHML_ELEMENTS, fix_capitalization=True),
     )
 
     subtitle_out = TakeFirst()
     title_out = Join()
 
+    journal_title_in = MapCompose(
+        normalize_journal_title,
+    )
     journal_title_out = TakeFirst()
     journal_year_out = TakeFirst()
     journal_artid_out = TakeFirst()
@@ -167,5 +240,61 @@ class HEPLoader(ItemLoader):
     record_creation_date_out = TakeFirst()
 
     control_field_out = TakeFirst()
+
+    def new_authors(self):
+        """Return a new list to gather the authors of the record in.
+
+        It is an ``AuthorCollector`` when the loader context has a
+        ``min_authors``.
+        """
+        if not self.context.get('min_authors'):
+            return []
+        return AuthorCollector(self)
+
+    def _add_value(self, field_name, value):
+        if not isinstance(value, AuthorCollector):
+            return super(HEPLoader, self)._add_value(field_name, value)
+        if field_name in self._values:
+            self._values[field_name] += value.table
+        elif value.table:
+            self._values[field_name] = value.table
+
+    def _compiled_processors(self, field_name):
+        """Return the compiled input and output processors of a field."""
+        key = (self.__class__, self.item.__class__, field_name)
+        try:
+            return self._compiled[key]
+        except KeyError:
+            processors = self._compiled[key] = (
+                _compile_processor(self.get_input_processor(field_name)),
+                _compile_processor(self.get_output_processor(field_name)),
+            )
+            return processors
+
+    def _process_input_value(self, field_name, value):
+        process = self._compiled_processors(field_name)[0]
+        if process is None:
+            return super(HEPLoader, self)._process_input_value(field_name, value)
+        return process(value)
+
+    def get_output_value(self, field_name):
+        process = self._compiled_processors(field_name)[1]
+        if process is None:
+            return super(HEPLoader, self).get_output_value(field_name)
+        try:
+            return process(self._values[field_name])
+        except Exception as e:
+            raise ValueError("Error with output processor: field=%r value=%r error='%s: %s'" % (
+                field_name, self._values[field_name], type(e).__name__, str(e)))
+
+    def _get_xpathvalues(self, xpaths, **kw):
+        """Also accept precompiled XPaths from :mod:`hepcrawl.xpaths`."""
+        self._check_selector_method()
+        return flatten(
+            select(self.selector, xpath).extract()
+            if isinstance(xpath, etree.XPath)
+            else self.selector.xpath(xpath).extract()
+            for xpath in arg_to_iter(xpaths)
+        )
 # FIXME: if possible everything with open access should get a FFT
 # FIXME: check that every record has collection HEP
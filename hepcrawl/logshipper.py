@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Shipping of the log records to Logstash without blocking the crawl."""
+
+from __future__ import absolute_import, print_function
+
+import logging
+import socket
+import threading
+import time
+from Queue import Empty, Full, Queue
+
+from logstash import formatter
+
+
+class QueueLogstashHandler(logging.Handler):
+    """Logging handler sending the records to Logstash over TCP.
+
+    ``emit`` only formats the record and puts it in a queue of at most
+    ``capacity`` events; a daemon thread, started with the first record,
+    connects to Logstash and sends the events by batches of up to
+    ``batch_size``. When the queue is full or Logstash cannot be reached
+    the events are dropped and counted in ``dropped``, the connection is
+    tried again after ``retry_interval`` seconds. Events are dropped both
+    by the logging threads and by the sender thread, so the count is
+    updated under a lock.
+    """
+
+    def __init__(self, host, port=5959, message_type='logstash', tags=None,
+                 fqdn=False, version=0, capacity=10000, batch_size=100,
+                 timeout=5, retry_interval=10):
+        super(QueueLogstashHandler, self).__init__()
+        if version == 1:
+            self.formatter = formatter.LogstashFormatterVersion1(message_type, tags, fqdn)
+        else:
+            self.formatter = formatter.LogstashFormatterVersion0(message_type, tags, fqdn)
+        self.address = (host, int(port))
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.queue = Queue(capacity)
+        self.sent = 0
+        self.dropped = 0
+        self.dropped_lock = threading.Lock()
+        self.sock = None
+        self.retry_time = 0
+        self.thread = None
+        self.thread_lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def emit(self, record):
+        try:
+            event = self.formatter.format(record) + b'\n'
+        except Exception:
+            self.handleError(record)
+            return
+        try:
+            self.queue.put_nowait(event)
+        except Full:
+            self._drop(1)
+            return
+        if self.thread is None:
+            self._start()
+
+    def _start(self):
+        with self.thread_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='logstash-sender')
+                self.thread.daemon = True
+                self.thread.start()
+
+    def _run(self):
+        while not (self.stopping.is_set() and self.queue.empty()):
+            try:
+                events = [self.queue.get(timeout=0.5)]
+            except Empty:
+                continue
+            while len(events) < self.batch_size:
+                try:
+                    events.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            self._send(events)
+
+    def _drop(self, count):
+        with self.dropped_lock:
+            self.dropped += count
+
+    def _send(self, events):
+        if self.sock is None:
+            if time.time() < self.retry_time:
+                self._drop(len(events))
+                return
+            try:
+                self.sock = socket.create_connection(self.address, self.timeout)
+            except socket.error:
+                self.retry_time = time.time() + self.retry_interval
+                self._drop(len(events))
+                return
+        try:
+            self.sock.sendall(b''.join(events))
+        except socket.error:
+            self.sock.close()
+            self.sock = None
+            self.retry_time = time.time() + self.retry_interval
+            self._drop(len(events))
+        else:
+            self.sent += len(events)
+
+    def close(self, timeout=None):
+        """Send the waiting events, for up to ``timeout`` seconds."""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(self.timeout if timeout is None else timeout)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        super(QueueLogstashHandler, self).close()
@@ -202,3 +202,20 @@ LICENSE_TEXTS = {  # TODO: more licenses here?
     'Creative Commons Attribution 4.0':
         'http://creativecommons.org/licenses/by/4.0/',
 }
+
+JOURNAL_TITLES = {
+    # Title used in the records: other names and abbreviations of the journal.
+    # Case, punctuation and a leading "The" are ignored when matching.
+    'Advances in High Energy Physics': ['AHEP', 'Adv. High Energy Phys.'],
+    'Chinese Physics C': ['CPC', 'Chinese Phys. C', 'Chin. Phys. C'],
+    'European Physical Journal C': ['EPJC', 'Eur. Phys. J. C'],
+    'Journal of Cosmology and Astroparticle Physics': ['JCAP', 'J. Cosmol. Astropart. Phys.'],
+    'Journal of High Energy Physics': ['JHEP', 'J. High Energy Phys.'],
+    'New Journal of Physics': ['NJP', 'New J. Phys.'],
+    'Nuclear Physics B': ['NUPHB', 'NPB', 'Nucl. Phys. B'],
+    'Physical Review C': ['PRC', 'Phys. Rev. C'],
+    'Physical Review D': ['PRD', 'Phys. Rev. D'],
+    'Physical Review Letters': ['PRL', 'Phys. Rev. Lett.'],
+    'Physics Letters B': ['PLB', 'Phys. Lett. B'],
+    'Progress of Theoretical and Experimental Physics': ['PTEP', 'Prog. Theor. Exp. Phys.'],
+}
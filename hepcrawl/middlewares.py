@@ -9,6 +9,13 @@
 
 """Define middlewares here."""
 
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, NotConfigured
+from scrapy.http import Request
+from scrapy.item import BaseItem
+
+from .dedup import HeldRecords
+
 
 class ErrorHandlingMiddleware(object):
 
@@ -33,3 +40,60 @@ class ErrorHandlingMiddleware(object):
             'exception': exception,
             'sender': request,
         })
+
+
+class DOIMergeMiddleware(object):
+
+    """Keep one record of each DOI by ``DEDUP_POLICY``.
+
+    With the ``latest`` or ``richest`` policy (see
+    :class:`hepcrawl.dedup.HeldRecords`), the records with a DOI yielded by
+    the spider are held until it has nothing else to do, and only the
+    record kept for each DOI then goes to the pipelines, so the other
+    copies are neither downloaded nor pushed. The held records stay in
+    memory until then.
+
+    With the ``first`` policy the middleware is disabled, and
+    :class:`hepcrawl.pipelines.DOIDeduplicationPipeline` drops the copies
+    after the first one as they come.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        policy = crawler.settings.get('DEDUP_POLICY')
+        if policy == 'first':
+            raise NotConfigured
+        middleware = cls(crawler, policy)
+        crawler.signals.connect(middleware.spider_idle, signal=signals.spider_idle)
+        return middleware
+
+    def __init__(self, crawler, policy):
+        self.crawler = crawler
+        self.held = HeldRecords(policy)
+
+    def process_spider_output(self, response, result, spider):
+        """Hold the records with a DOI, pass on everything else."""
+        released = response.request is not None and response.request.meta.get('dedup_release')
+        for element in result:
+            if released or not isinstance(element, (dict, BaseItem)) or not element.get('dois'):
+                yield element
+            elif self.held.add(element):
+                spider.logger.info("Duplicate record {0}, {1} policy".format(
+                    element['dois'][0].get('value'), self.held.policy,
+                ))
+
+    def spider_idle(self, spider):
+        """Schedule the release of the held records."""
+        if not self.held:
+            return
+        request = Request('data:,', callback=self.release, dont_filter=True, meta={'dedup_release': True})
+        self.crawler.engine.crawl(request, spider)
+        raise DontCloseSpider
+
+    def release(self, response):
+        """Return the held records, one for each DOI."""
+        records = self.held.pop_all()
+        self.crawler.spider.logger.info("Releasing {0} records, {1} duplicates left out".format(
+            len(records), self.held.duplicates,
+        ))
+        return records
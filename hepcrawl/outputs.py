@@ -9,6 +9,8 @@
 
 """Define output processors here."""
 
+from .authors import AuthorTable
+
 
 class FreeKeywords(object):
 
@@ -56,3 +58,29 @@ class ListToValueDict(object):
             {self.key: val}
             for val in values
         ]
+
+
+class CompactAuthors(object):
+
+    """Store the authors in an ``AuthorTable`` when there are many of them."""
+
+    def __init__(self, min_authors=0):
+        """Initialize with the number of authors from which to use a table.
+
+        Tables are never used with ``min_authors`` 0. The ``min_authors`` of
+        the loader context, if any, is used instead.
+        """
+        self.min_authors = min_authors
+
+    def __call__(self, values, loader_context=None):
+        """Return the authors as a table or as a list."""
+        min_authors = self.min_authors
+        if loader_context is not None:
+            min_authors = loader_context.get('min_authors', min_authors)
+        if not min_authors or len(values) < min_authors:
+            if isinstance(values, AuthorTable):
+                return values.to_list()
+            return values
+        if isinstance(values, AuthorTable):
+            return values
+        return AuthorTable.from_authors(values)
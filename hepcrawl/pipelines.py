@@ -15,14 +15,34 @@ See: http://doc.scrapy.org/en/latest/topics/item-pipeline.html
 
 import os
 import datetime
+import gzip
 import json
+import re
+from collections import deque
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
 import requests
 
-import logstash
 import logging
 import structlog
+from requests.adapters import HTTPAdapter
+from scrapy.exceptions import DropItem
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object
+from twisted.internet import defer, task, threads
+from twisted.python.threadpool import ThreadPool
+from urllib3.util.retry import Retry
 
+from .authors import expand_authors
+from .converter import InspireConverter
+from .dedup import DOIIndex
+from .exporters import pack_record
+from .logshipper import QueueLogstashHandler
 from .utils import get_temporary_file
+from .validation import RecordValidator, inspire_record
 
 
 LOGSTASH_HOST = os.environ.get("LOGSTASH_HOST", "localhost")
@@ -30,21 +50,38 @@ LOGSTASH_PORT = os.environ.get("LOGSTASH_PORT", 6060)
 LOGSTASH_VERSION = os.environ.get("LOGSTASH_VERSION", 1)
 LOGGER = logging.getLogger("python-logstash-logger")
 LOGGER.setLevel(logging.INFO)
+# the events are sent from a thread, logging never waits for Logstash
 LOGGER.addHandler(
-    logstash.TCPLogstashHandler(LOGSTASH_HOST, LOGSTASH_PORT, version=1)
+    QueueLogstashHandler(LOGSTASH_HOST, LOGSTASH_PORT, version=1)
 )
 
 
-def has_publication_info(item):
-    """If any publication info."""
-    return item.get('pubinfo_freetext') or item.get('journal_volume') or \
-        item.get('journal_title') or \
-        item.get('journal_year') or \
-        item.get('journal_issue') or \
-        item.get('journal_fpage') or \
-        item.get('journal_lpage') or \
-        item.get('journal_artid') or \
-        item.get('journal_doctype')
+def get_journal_title(item):
+    """Journal title of the item, before or after the INSPIRE conversion."""
+    journal = item.get('journal_title')
+    if not journal and item.get('publication_info'):
+        journal = item['publication_info'][0].get('journal_title')
+    return journal
+
+
+def get_first_value(item, key):
+    """Value of the first ``{'value': ..}`` entry of a field, e.g. a DOI."""
+    values = item.get(key)
+    if values:
+        return values[0].get('value')
+
+
+def record_dict(item):
+    """Return the item as a dict which can be serialized.
+
+    The authors stored in a :class:`hepcrawl.authors.AuthorTable` are
+    expanded to a list of dicts; the item itself is not changed.
+    """
+    # a CompactHEPRecord gives its fields faster than dict() reads them
+    record = item.to_dict() if hasattr(item, 'to_dict') else dict(item)
+    if 'authors' in record:
+        record['authors'] = expand_authors(record['authors'])
+    return record
 
 
 def filter_fields(item, keys):
@@ -53,12 +90,112 @@ def filter_fields(item, keys):
         item.pop(key, None)
 
 
+class DOIDeduplicationPipeline(object):
+    """Pipeline dropping the records whose DOI was already seen in the crawl.
+
+    The same article can come in several packages of a run, e.g. an issue
+    package and the article package, or a correction sent with the
+    original. The DOIs are kept in a :class:`hepcrawl.dedup.DOIIndex`, and
+    only the first record of a DOI is kept: the records are passed on as
+    they come, so a later copy could not replace one which is already
+    pushed. The other policies of ``DEDUP_POLICY`` are applied before, by
+    :class:`hepcrawl.middlewares.DOIMergeMiddleware`.
+
+    It has to come first in ``ITEM_PIPELINES``, before the files are
+    downloaded and the records pushed.
+    """
+
+    def __init__(self, bloom_capacity=0, bloom_error_rate=0.001):
+        self.index = DOIIndex(bloom_capacity, bloom_error_rate)
+        self.duplicates = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            bloom_capacity=settings.getint("DEDUP_BLOOM_CAPACITY"),
+            bloom_error_rate=settings.getfloat("DEDUP_BLOOM_ERROR_RATE"),
+        )
+
+    def close_spider(self, spider):
+        spider.logger.info("Dropped {0} duplicate records of {1} DOIs".format(
+            self.duplicates, len(self.index),
+        ))
+
+    def process_item(self, item, spider):
+        dois = [doi['value'] for doi in item.get('dois') or [] if doi.get('value')]
+        if not dois:
+            return item
+        new = [self.index.add(doi) for doi in dois]
+        if not all(new):
+            self.duplicates += 1
+            spider.logger.info("Duplicate record {0}, dropped".format(dois[0]))
+            raise DropItem("Duplicate DOI {0}".format(dois[0]))
+        return item
+
+
+class JsonLinesShard(object):
+    """Output file written under a temporary name until it is complete.
+
+    The encoded records, e.g. JSON lines, are written to ``path + '.part'``, which is renamed to ``path``
+    when the shard is closed, so complete shards can be read as soon as they
+    appear. With ``compress`` the file is gzipped.
+    """
+
+    def __init__(self, path, compress=False):
+        self.path = path
+        self.part_path = path + '.part'
+        self.count = 0
+        if compress:
+            self.file = gzip.open(self.part_path, 'wb')
+        else:
+            self.file = open(self.part_path, 'wb')
+
+    def write(self, lines):
+        """Write the encoded lines and flush them to the file."""
+        self.file.write(b''.join(lines))
+        self.file.flush()
+        self.count += len(lines)
+
+    def close(self):
+        self.file.close()
+        with open(self.part_path, 'rb') as part_file:
+            os.fsync(part_file.fileno())
+        os.rename(self.part_path, self.path)
+
+
 class JsonWriterPipeline(object):
-    """Pipeline for outputting items in JSON lines format."""
+    """Pipeline for outputting items in JSON lines format.
+
+    The records are encoded compactly, one per line, and buffered until
+    ``buffer_size`` bytes are waiting, and written every ``flush_interval``
+    seconds even when no more items come. The output can be gzipped and split in shards of
+    ``shard_size`` records and/or by journal, see :class:`JsonLinesShard`.
+    Without sharding, the records are written to ``output_uri``. The buffers
+    are locked, as ``process_item`` runs in its own thread in a
+    :class:`FanOutSink` while the flush loop runs in the reactor.
+    """
 
-    def __init__(self, output_uri=None):
+    extensions = ('.jsonl', '.json')
+    settings_prefix = 'JSON_OUTPUT'
+
+    def __init__(self, output_uri=None, compress=False, buffer_size=2 ** 20,
+                 flush_interval=5, shard_size=0, shard_by_journal=False):
         self.output_uri = output_uri
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.shard_size = shard_size
+        self.shard_by_journal = shard_by_journal
         self.count = 0
+        self.shards = {}
+        self.shard_numbers = {}
+        self.buffers = {}
+        self.buffered_bytes = 0
+        self.last_flush = time.time()
+        self.flush_loop = None
+        self.paths = []
+        self.lock = threading.RLock()
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -67,44 +204,641 @@ class JsonWriterPipeline(object):
         else:
             prefix = "hepcrawl"
 
+        def setting(name):
+            return cls.settings_prefix + '_' + name
+
+        settings = crawler.settings
+        compress = settings.getbool(setting("COMPRESS"))
         output_uri = get_temporary_file(
             prefix=prefix,
-            suffix=".json",
-            directory=crawler.settings.get("JSON_OUTPUT_DIR")
+            suffix=cls.extensions[0] + ('.gz' if compress else ''),
+            directory=settings.get(setting("DIR"))
         )
         return cls(
             output_uri=output_uri,
+            compress=compress,
+            buffer_size=settings.getint(setting("BUFFER_SIZE")),
+            flush_interval=settings.getfloat(setting("FLUSH_INTERVAL")),
+            shard_size=settings.getint(setting("SHARD_SIZE")),
+            shard_by_journal=settings.getbool(setting("SHARD_BY_JOURNAL")),
         )
 
+    @property
+    def sharded(self):
+        return bool(self.shard_size or self.shard_by_journal)
+
     def open_spider(self, spider):
-        self.file = open(self.output_uri, "wb")
-        self.file.write("[")
+        if self.sharded and os.path.exists(self.output_uri) and not os.path.getsize(self.output_uri):
+            # the placeholder of get_temporary_file, the shards have other names
+            os.remove(self.output_uri)
+        if self.flush_interval:
+            self.flush_loop = task.LoopingCall(self.flush)
+            self.flush_loop.start(self.flush_interval, now=False)
 
     def close_spider(self, spider):
-        self.file.write("]\n")
-        self.file.close()
+        if self.flush_loop is not None and self.flush_loop.running:
+            self.flush_loop.stop()
+        self.flush()
+        for key in list(self.shards):
+            self._close_shard(key)
         spider.logger.info("Wrote {0} records to {1}".format(
             self.count,
-            self.output_uri,
+            ', '.join(self.paths) or self.output_uri,
         ))
 
+    def _shard_key(self, item):
+        if not self.shard_by_journal:
+            return None
+        journal = get_journal_title(item) or 'unknown'
+        return re.sub(r'[^a-z0-9]+', '_', journal.lower()).strip('_')
+
+    def _shard_path(self, key):
+        if not self.sharded:
+            return self.output_uri
+        root, extension = self.output_uri, ''
+        for suffix in ('.gz',) + self.extensions:
+            if root.endswith(suffix):
+                root, extension = root[:-len(suffix)], suffix + extension
+        number = self.shard_numbers[key] = self.shard_numbers.get(key, 0) + 1
+        parts = [root] + ([key] if key is not None else []) + ['%05d' % number]
+        return '.'.join(parts) + extension
+
+    def _close_shard(self, key):
+        shard = self.shards.pop(key)
+        shard.close()
+        self.paths.append(shard.path)
+
+    def _write(self, key):
+        lines = self.buffers.pop(key, [])
+        if not lines:
+            return
+        self.buffered_bytes -= sum(len(line) for line in lines)
+        if key not in self.shards:
+            self.shards[key] = JsonLinesShard(self._shard_path(key), self.compress)
+        self.shards[key].write(lines)
+        if self.shard_size and self.shards[key].count >= self.shard_size:
+            self._close_shard(key)
+
+    def flush(self):
+        """Write all the buffered records."""
+        with self.lock:
+            for key in list(self.buffers):
+                self._write(key)
+            self.last_flush = time.time()
+
+    def encode(self, record):
+        """Return the record as it is written to the file."""
+        return json.dumps(record, separators=(',', ':')) + '\n'
+
     def process_item(self, item, spider):
-        line = ""
-        if self.count > 0:
-            line = "\n,"
-        line += json.dumps(dict(item), indent=4)
-        self.file.write(line)
+        line = self.encode(record_dict(item))
+
+        key = self._shard_key(item)
+        with self.lock:
+            lines = self.buffers.setdefault(key, [])
+            lines.append(line)
+            self.buffered_bytes += len(line)
+            self.count += 1
+
+            shard = self.shards.get(key)
+            if self.shard_size and len(lines) + (shard.count if shard else 0) >= self.shard_size:
+                self._write(key)
+            if self.buffered_bytes >= self.buffer_size or \
+                    time.time() - self.last_flush >= self.flush_interval:
+                self.flush()
+        return item
+
+
+class MsgpackWriterPipeline(JsonWriterPipeline):
+    """Pipeline for outputting items with MessagePack.
+
+    Works like :class:`JsonWriterPipeline`, with the ``MSGPACK_OUTPUT``
+    settings. The files can be read with :func:`hepcrawl.exporters.iter_msgpack`.
+    """
+
+    extensions = ('.msgpack',)
+    settings_prefix = 'MSGPACK_OUTPUT'
+
+    def encode(self, record):
+        return pack_record(record)
+
+
+class SqlitePipeline(object):
+    """Pipeline storing the items in a SQLite database.
+
+    Every record is a row of the ``records`` table with indexed columns for
+    lookups (DOI, arXiv id, journal, package and harvest date) and the whole
+    record packed with MessagePack in ``record``, see
+    :func:`hepcrawl.exporters.unpack_record`. The package is the
+    ``package_path`` of the spider or the folder of the first local file.
+
+    The database is in WAL mode and the rows are inserted with one
+    ``executemany`` per transaction of ``batch_size`` items. The
+    transactions run in a writer thread. Once ``max_pending`` batches are
+    waiting for it, the item completing a new batch is only passed on when
+    its batch is written, which holds the crawl back without blocking the
+    reactor.
+    """
+
+    columns = ('doi', 'arxiv_id', 'journal', 'package', 'harvest_date', 'spider', 'record')
+
+    def __init__(self, output_uri=None, batch_size=1000, max_pending=4):
+        self.output_uri = output_uri
+        self.batch_size = batch_size
+        self.connection = None
+        self.rows = []
+        self.pending = defer.DeferredSemaphore(max_pending)
+        self.writes = set()
+        self.pool = None
+        self.insert = 'INSERT INTO records ({0}) VALUES ({1})'.format(
+            ', '.join(self.columns),
+            ', '.join('?' * len(self.columns)),
+        )
+        self.count = 0
+        self.failed = 0
+        self.spider = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        output_uri = settings.get("SQLITE_OUTPUT_URI")
+        if not output_uri:
+            if crawler.spider is not None:
+                prefix = "{0}_".format(crawler.spider.name)
+            else:
+                prefix = "hepcrawl"
+            output_uri = get_temporary_file(
+                prefix=prefix,
+                suffix=".db",
+                directory=settings.get("SQLITE_OUTPUT_DIR")
+            )
+        return cls(
+            output_uri=output_uri,
+            batch_size=settings.getint("SQLITE_OUTPUT_BATCH_SIZE"),
+            max_pending=settings.getint("SQLITE_OUTPUT_MAX_PENDING"),
+        )
+
+    def open_spider(self, spider):
+        self.spider = spider
+        # only used by the writer thread once the table is there
+        self.connection = sqlite3.connect(self.output_uri, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # durable at each checkpoint, a crash loses at most the last batches
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                'id INTEGER PRIMARY KEY, doi TEXT, arxiv_id TEXT, '
+                'journal TEXT, package TEXT, harvest_date TEXT, '
+                'spider TEXT, record BLOB)'
+            )
+            for column in ('doi', 'arxiv_id', 'journal', 'package', 'harvest_date'):
+                self.connection.execute(
+                    'CREATE INDEX IF NOT EXISTS records_{0} '
+                    'ON records ({0})'.format(column)
+                )
+        # one thread, the transactions are written one after the other
+        self.pool = ThreadPool(1, 1, name='sqlite-writer')
+        self.pool.start()
+
+    def close_spider(self, spider):
+        self.flush()
+        finished = defer.DeferredList(list(self.writes))
+        return finished.addCallback(self._close, spider)
+
+    def _close(self, _, spider):
+        self.pool.stop()
+        self.pool = None
+        self.connection.close()
+        self.connection = None
+        spider.logger.info("Stored {0} records in {1}{2}".format(
+            self.count - self.failed, self.output_uri,
+            ', {0} could not be stored'.format(self.failed) if self.failed else '',
+        ))
+
+    def flush(self):
+        """Hand the waiting rows to the writer thread.
+
+        Returns a Deferred firing once they are written.
+        """
+        if not self.rows:
+            return defer.succeed(None)
+        rows, self.rows = self.rows, []
+        written = self.pending.run(self._start_write, rows)
+        self.writes.add(written)
+        return written.addBoth(self._written, written)
+
+    def _start_write(self, rows):
+        from twisted.internet import reactor
+
+        return threads.deferToThreadPool(reactor, self.pool, self._write, rows)
+
+    def _written(self, result, written):
+        self.writes.discard(written)
+        return result
+
+    def _write(self, rows):
+        try:
+            with self.connection:
+                self.connection.executemany(self.insert, rows)
+        except sqlite3.Error as err:
+            self.failed += len(rows)
+            self.spider.logger.error("Cannot store {0} records in {1}: {2}".format(
+                len(rows), self.output_uri, err,
+            ))
+
+    def _package(self, item, spider):
+        package = getattr(spider, 'package_path', None)
+        if not package and item.get('local_files'):
+            package = os.path.dirname(item['local_files'][0].get('path', ''))
+        return package or None
+
+    def process_item(self, item, spider):
+        record = record_dict(item)
+        harvest_date = record.get('acquisition_source', {}).get('date') or \
+            datetime.datetime.now().isoformat()
+
+        self.rows.append((
+            get_first_value(item, 'dois'),
+            get_first_value(item, 'arxiv_eprints'),
+            get_journal_title(item),
+            self._package(item, spider),
+            harvest_date,
+            spider.name,
+            sqlite3.Binary(pack_record(record)),
+        ))
         self.count += 1
+        if len(self.rows) < self.batch_size:
+            return item
+        if not self.pending.tokens:
+            # max_pending batches are waiting for the writer already
+            return self.flush().addCallback(lambda _: item)
+        self.flush()
         return item
 
 
+class ValidationPipeline(object):
+    """Pipeline validating the records against the INSPIRE schema.
+
+    A copy of each item is converted to the INSPIRE data model, as the push
+    pipelines do, its fields are mapped as INSPIRE stores them (see
+    :func:`hepcrawl.validation.inspire_record`) and it is validated against
+    ``schema`` (see :class:`hepcrawl.validation.RecordValidator`), so it
+    has to come before them in ``ITEM_PIPELINES``. The schema is loaded once. With
+    ``in_thread`` the records are validated in a thread of their own, which
+    keeps the crawl going while a record is validated; otherwise in the
+    crawl. ``sample_rate`` is the share of the records that are validated,
+    spread evenly over the crawl.
+
+    The invalid records are written with their errors, as
+    ``{"spider": .., "errors": [[path, message], ..], "record": ..}`` JSON
+    lines, to a quarantine file in ``quarantine_dir`` and, with
+    ``drop_invalid``, dropped; otherwise they go on to the next pipelines.
+    """
+
+    def __init__(self, schema='hep', strict=False, in_thread=False, sample_rate=1.0,
+                 drop_invalid=False, quarantine_dir=None):
+        self.schema = schema
+        self.strict = strict
+        self.in_thread = in_thread
+        self.sample_rate = sample_rate
+        self.drop_invalid = drop_invalid
+        self.quarantine_dir = quarantine_dir
+        self.converter = InspireConverter()
+        self.validator = None
+        self.pool = None
+        self.quarantine = None
+        self.count = 0
+        self.validated = 0
+        self.invalid = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            schema=settings.get("VALIDATION_SCHEMA"),
+            strict=settings.getbool("VALIDATION_STRICT"),
+            in_thread=settings.getbool("VALIDATION_IN_THREAD"),
+            sample_rate=settings.getfloat("VALIDATION_SAMPLE_RATE"),
+            drop_invalid=settings.getbool("VALIDATION_DROP_INVALID"),
+            quarantine_dir=settings.get("VALIDATION_QUARANTINE_DIR"),
+        )
+
+    def open_spider(self, spider):
+        self.validator = RecordValidator(self.schema, self.strict)
+        if self.in_thread:
+            # one thread, the validator is not thread-safe
+            self.pool = ThreadPool(1, 1, name='validation')
+            self.pool.start()
+
+    def close_spider(self, spider):
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+        if self.quarantine is not None:
+            self.quarantine.close()
+        spider.logger.info("Validated {0} of {1} records, {2} invalid{3}".format(
+            self.validated, self.count, self.invalid,
+            ' in ' + self.quarantine.path if self.quarantine else '',
+        ))
+
+    def _sampled(self):
+        # true for sample_rate of the records, e.g. every fourth for 0.25
+        return int(self.count * self.sample_rate) != int((self.count - 1) * self.sample_rate)
+
+    def process_item(self, item, spider):
+        self.count += 1
+        if not self._sampled():
+            return item
+        self.validated += 1
+
+        record = inspire_record(self.converter.convert(record_dict(item), source=spider.name))
+
+        if self.pool is None:
+            return self._check(self._errors(record), item, record, spider)
+        from twisted.internet import reactor
+
+        validated = threads.deferToThreadPool(reactor, self.pool, self._errors, record)
+        return validated.addCallback(self._check, item, record, spider)
+
+    def _errors(self, record):
+        try:
+            return self.validator.errors(record)
+        except Exception as err:
+            return [('/', 'Cannot validate the record: %s' % err)]
+
+    def _check(self, errors, item, record, spider):
+        if not errors:
+            return item
+        self.invalid += 1
+        if self.quarantine is None:
+            path = get_temporary_file(
+                prefix="{0}_invalid_".format(spider.name),
+                suffix=".jsonl",
+                directory=self.quarantine_dir,
+            )
+            self.quarantine = JsonLinesShard(path)
+        self.quarantine.write([json.dumps({
+            'spider': spider.name,
+            'errors': errors,
+            'record': record,
+        }) + '\n'])
+        spider.logger.warning("Invalid record {0}: {1}".format(
+            get_first_value(record, 'dois'),
+            '; '.join('{0}: {1}'.format(path, message) for path, message in errors),
+        ))
+        if self.drop_invalid:
+            raise DropItem("Invalid record: {0} errors".format(len(errors)))
+        return item
+
+
+class FanOutSink(object):
+    """Pipeline fed by :class:`FanOutPipeline` through its own queue.
+
+    The items are given to ``pipeline`` one at a time in the thread of the
+    sink, started with ``start``, and the next one when its ``process_item``
+    is done; ``capacity`` items can wait in the queue. A slow pipeline thus
+    only holds back its own queue. The ``process_item`` of the pipeline must
+    not use the reactor, as it does not run in the reactor thread; without a
+    thread, before ``start``, it is called in the reactor.
+    """
+
+    def __init__(self, pipeline, capacity=1000):
+        self.pipeline = pipeline
+        self.name = type(pipeline).__name__
+        self.capacity = capacity
+        self.queue = deque()
+        self.busy = False
+        self.processed = 0
+        self.failed = 0
+        self.waiters = []
+        self.drained = []
+        self.pool = None
+
+    def start(self):
+        self.pool = ThreadPool(1, 1, name='fanout-' + self.name)
+        self.pool.start()
+
+    def stop(self):
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+
+    @property
+    def full(self):
+        return len(self.queue) >= self.capacity
+
+    def lag(self):
+        """Seconds the oldest waiting item has been in the queue."""
+        if not self.queue:
+            return 0.0
+        return time.time() - self.queue[0][0]
+
+    def put(self, item, spider):
+        self.queue.append((time.time(), item, spider))
+        if not self.busy:
+            self._next()
+
+    def wait_for_room(self):
+        """Deferred fired when the queue is no longer full."""
+        waiter = defer.Deferred()
+        self.waiters.append(waiter)
+        return waiter
+
+    def wait_for_drain(self):
+        """Deferred fired when every queued item is processed."""
+        if not self.busy and not self.queue:
+            return defer.succeed(None)
+        drained = defer.Deferred()
+        self.drained.append(drained)
+        return drained
+
+    def _process(self, item, spider):
+        if self.pool is None:
+            return defer.maybeDeferred(self.pipeline.process_item, item, spider)
+        from twisted.internet import reactor
+        return threads.deferToThreadPool(reactor, self.pool, self.pipeline.process_item, item, spider)
+
+    def _next(self):
+        # a loop rather than callbacks, for the items processed at once
+        self.busy = True
+        while self.queue:
+            _, item, spider = self.queue.popleft()
+            while self.waiters and not self.full:
+                self.waiters.pop(0).callback(None)
+            processed = self._process(item, spider)
+            processed.addCallbacks(self._done, self._failed, errbackArgs=(spider,))
+            if not processed.called:
+                processed.addCallback(lambda _: self._next())
+                return
+        self.busy = False
+        drained, self.drained = self.drained, []
+        for waiter in drained:
+            waiter.callback(None)
+
+    def _done(self, result):
+        self.processed += 1
+
+    def _failed(self, failure, spider):
+        if not failure.check(DropItem):
+            self.failed += 1
+            spider.logger.error("Sink {0} failed: {1}".format(self.name, failure.getErrorMessage()))
+
+
+class FanOutPipeline(object):
+    """Pipeline giving each item to several pipelines side by side.
+
+    The pipelines of ``FANOUT_SINKS``, a ``{class path: order}`` dict like
+    ``ITEM_PIPELINES``, each get a shallow copy of every item through their
+    own queue of ``FANOUT_QUEUE_SIZE`` items and their own thread (see
+    :class:`FanOutSink`), so a slow one does not hold back the others. The
+    crawl only waits when a queue is full. Every ``FANOUT_LAG_INTERVAL``
+    seconds the queue length and lag of each sink are logged; the crawl ends
+    once all the queues are empty.
+
+    The push pipelines cannot be sinks: they send the feed of the crawl
+    once it is closed, and the items reaching the feed are not the ones
+    they convert.
+    """
+
+    def __init__(self, sinks, lag_interval=60):
+        self.sinks = sinks
+        self.lag_interval = lag_interval
+        self.lag_loop = None
+        self.spider = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        sinks = []
+        for path in build_component_list(settings.getdict("FANOUT_SINKS")):
+            pipeline_class = load_object(path)
+            if issubclass(pipeline_class, InspireAPIPushPipeline):
+                raise ValueError("{0} cannot be a fan-out sink, add it to ITEM_PIPELINES".format(path))
+            if hasattr(pipeline_class, 'from_crawler'):
+                pipeline = pipeline_class.from_crawler(crawler)
+            else:
+                pipeline = pipeline_class()
+            sinks.append(FanOutSink(pipeline, settings.getint("FANOUT_QUEUE_SIZE")))
+        return cls(sinks, lag_interval=settings.getfloat("FANOUT_LAG_INTERVAL"))
+
+    def open_spider(self, spider):
+        self.spider = spider
+        if self.lag_interval:
+            self.lag_loop = task.LoopingCall(self.report_lag)
+            self.lag_loop.start(self.lag_interval, now=False)
+        for sink in self.sinks:
+            sink.start()
+        return defer.DeferredList([
+            defer.maybeDeferred(sink.pipeline.open_spider, spider)
+            for sink in self.sinks if hasattr(sink.pipeline, 'open_spider')
+        ])
+
+    def close_spider(self, spider):
+        if self.lag_loop is not None and self.lag_loop.running:
+            self.lag_loop.stop()
+
+        def close(_):
+            for sink in self.sinks:
+                sink.stop()
+            return defer.DeferredList([
+                defer.maybeDeferred(sink.pipeline.close_spider, spider)
+                for sink in self.sinks if hasattr(sink.pipeline, 'close_spider')
+            ])
+
+        drained = defer.DeferredList([sink.wait_for_drain() for sink in self.sinks])
+        return drained.addCallback(close)
+
+    def lag(self):
+        """Queue length and lag in seconds of each sink."""
+        return dict((sink.name, (len(sink.queue), sink.lag())) for sink in self.sinks)
+
+    def report_lag(self):
+        for sink in self.sinks:
+            self.spider.logger.info("Sink {0}: {1} queued, {2:.1f}s behind, {3} processed, {4} failed".format(
+                sink.name, len(sink.queue), sink.lag(), sink.processed, sink.failed,
+            ))
+
+    def process_item(self, item, spider):
+        for sink in self.sinks:
+            sink.put(item.copy(), spider)
+        full = [sink.wait_for_room() for sink in self.sinks if sink.full]
+        if full:
+            return defer.DeferredList(full).addCallback(lambda _: item)
+        return item
+
+
+def api_session(pool_size=10, retries=3):
+    """HTTP session keeping up to ``pool_size`` connections alive.
+
+    Failed connections, and pushes answered by an unavailable server, are
+    retried ``retries`` times with a backoff.
+    """
+    retry = Retry(
+        total=retries,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        method_whitelist=frozenset(['POST']),
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def gzip_compress(data):
+    """Return ``data`` as a gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
 class InspireAPIPushPipeline(object):
-    """Push to INSPIRE API via tasks API."""
+    """Push to INSPIRE API via tasks API.
+
+    By default the results are pushed once the crawl is over. With
+    ``API_PIPELINE_BATCH_SIZE`` the converted records are pushed during the
+    crawl instead, in the ``results_data`` of the task, by batches of that
+    many records or of the records waiting for ``API_PIPELINE_BATCH_INTERVAL``
+    seconds. The batches are posted from the reactor thread pool over a
+    keep-alive session; when ``API_PIPELINE_MAX_IN_FLIGHT`` of them are
+    being sent, the crawl waits for one to finish. The final push then only
+    reports the errors.
+    """
 
     def __init__(self):
         self.count = 0
         self.dois = []
         self.logger = structlog.getLogger()
+        self.converter = InspireConverter()
+        self.session = None
+        self.timeout = 60
+        self.retries = 3
+        self.compress = False
+        self.batch_size = 0
+        self.batch = []
+        self.max_in_flight = 4
+        self.in_flight = []
+        self.failed_batches = []
+        self.flush_loop = None
+        self.spider = None
+
+    def open_spider(self, spider):
+        settings = spider.settings
+        self.timeout = settings.getfloat('API_PIPELINE_TIMEOUT', self.timeout)
+        self.retries = settings.getint('API_PIPELINE_RETRIES', self.retries)
+        self.compress = settings.getbool('API_PIPELINE_COMPRESS')
+        self.max_in_flight = settings.getint('API_PIPELINE_MAX_IN_FLIGHT', self.max_in_flight)
+        # shared by the threads posting at the same time
+        self.session = api_session(pool_size=self.max_in_flight, retries=self.retries)
+        if 'SCRAPY_JOB' not in os.environ or not self._api_url(spider):
+            return
+        self.batch_size = settings.getint('API_PIPELINE_BATCH_SIZE')
+        if self.batch_size:
+            self.spider = spider
+            self.flush_loop = task.LoopingCall(self.flush_batch)
+            self.flush_loop.start(settings.getfloat('API_PIPELINE_BATCH_INTERVAL'), now=False)
 
     def process_item(self, item, spider):
         """Convert internal format to INSPIRE data model."""
@@ -121,94 +855,71 @@ class InspireAPIPushPipeline(object):
         else:
             self.logger.error('Cannot find DOIs for the parsed articles.', name=spider.name)
 
-        if 'related_article_doi' in item:
-            item['dois'] += item.pop('related_article_doi', [])
-
-        source = item.pop('source', spider.name)
-
-        # parse imported records from repo.scoap3.org and manual input
-        cr_date = datetime.datetime.now().isoformat()
-        method = source
-        acquisition_source_method = source
-
-        item['acquisition_source'] = {
-            'source': source,
-            # NOTE: Keeps method same as source to conform with INSPIRE
-            # submissions which add `submissions` to this field.
-            'method': acquisition_source_method,
-            'date': cr_date,
-            'submission_number': os.environ.get('SCRAPY_JOB', ''),
-        }
-
-        if 'record_creation_date' not in item:
-            item['record_creation_date'] = datetime.datetime.now().isoformat()
-
-        item['titles'] = [{
-            'title': item.pop('title', ''),
-            'subtitle': item.pop('subtitle', ''),
-            'source': source,
-        }]
-
-        item['abstracts'] = [{
-            'value': item.pop('abstract', ''),
-            'source': source,
-        }]
-
-        publication_date = item.pop('date_published', '')
-        if publication_date:
-            # fixing broken date format
-            tmp_split = publication_date.split('-')
-            if(len(tmp_split) == 3):
-                pass
-            elif(len(tmp_split) == 2):
-                tmp_split.append("1")
-            else:
-                tmp_split.append("1").append("1")
-            tmp_date = datetime.date(int(tmp_split[0]),
-                                     int(tmp_split[1]),
-                                     int(tmp_split[2]))
-            publication_date = tmp_date.strftime('%Y-%m-%d')
-
-        item['imprints'] = [{
-                            'date': publication_date,
-                            'publisher': source,
-                            }]
-
-        item['copyright'] = [{
-            'holder': item.pop('copyright_holder', ''),
-            'year': item.pop('copyright_year', ''),
-            'statement': item.pop('copyright_statement', ''),
-            'material': item.pop('copyright_material', ''),
-        }]
-        if not item.get('publication_info'):
-            if has_publication_info(item):
-                item['publication_info'] = [{
-                    'journal_title': item.pop('journal_title', ''),
-                    'journal_volume': item.pop('journal_volume', ''),
-                    'year': int(item.pop('journal_year', 0)) or '',
-                    'journal_issue': item.pop('journal_issue', ''),
-                    'artid': item.pop('journal_artid', ''),
-                    'page_start': item.pop('journal_fpage', ''),
-                    'page_end': item.pop('journal_lpage', ''),
-                    'material': item.pop('journal_doctype', ''),
-                    'pubinfo_freetext': item.pop('pubinfo_freetext', ''),
-                }]
-
-        # Remove any fields
-        filter_fields(item, [
-            'journal_title',
-            'journal_volume',
-            'journal_year',
-            'journal_issue',
-            'journal_fpage',
-            'journal_lpage',
-            'journal_doctype',
-            'journal_artid',
-            'pubinfo_freetext',
-        ])
+        # the converted record goes on to the feed
+        item = self.converter.convert(record_dict(item), source=spider.name)
+
+        if self.batch_size:
+            return self._add_to_batch(item)
+        return item
 
+    def _add_to_batch(self, item):
+        self.batch.append(record_dict(item))
+        if len(self.batch) >= self.batch_size:
+            self.flush_batch()
+        if len(self.in_flight) >= self.max_in_flight:
+            # hold the item, and the crawl, until a batch is sent
+            sent = defer.DeferredList(list(self.in_flight), fireOnOneCallback=True)
+            return sent.addCallback(lambda _: item)
         return item
 
+    def flush_batch(self):
+        """Push the waiting records without blocking the crawl."""
+        if not self.batch:
+            return
+        records, self.batch = self.batch, []
+        payload = dict(
+            job_id=os.environ['SCRAPY_JOB'],
+            results_uri=os.environ.get('SCRAPY_FEED_URI', ''),
+            log_file=os.environ.get('SCRAPY_LOG_FILE', ''),
+            errors=[],
+            results_data=records,
+        )
+        dois = [get_first_value(record, 'dois') for record in records]
+
+        def pushed(response):
+            self.logger.info('Pushed batch.', name=self.spider.name, count=len(records))
+
+        def failed(failure):
+            self.failed_batches.append(dois)
+            self.logger.error('Cannot push batch.', name=self.spider.name, dois=dois, error=str(failure.value))
+
+        # registered before the post, which can end at once
+        sent = defer.Deferred()
+        self.in_flight.append(sent)
+        sent.addBoth(lambda result: self.in_flight.remove(sent))
+        posted = threads.deferToThread(self._post, self._api_url(self.spider), payload)
+        posted.addCallbacks(pushed, failed)
+        posted.chainDeferred(sent)
+
+    def _post(self, url, payload):
+        data = json.dumps({"kwargs": payload})
+        headers = {'Content-Type': 'application/json'}
+        if self.compress:
+            data = gzip_compress(data)
+            headers['Content-Encoding'] = 'gzip'
+        response = self.session.post(url, data=data, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def _api_url(self, spider):
+        task_endpoint = spider.settings['API_PIPELINE_TASK_ENDPOINT_MAPPING'].get(
+            spider.name, spider.settings['API_PIPELINE_TASK_ENDPOINT_DEFAULT']
+        )
+        return os.path.join(
+            spider.settings['API_PIPELINE_URL'],
+            task_endpoint
+        )
+
     def _prepare_payload(self, spider):
         """Return payload for push."""
         payload = dict(
@@ -238,61 +949,148 @@ class InspireAPIPushPipeline(object):
             spider.logger.error("Cannot cleanup errors.")
 
     def close_spider(self, spider):
-        """Post results to HTTP API."""
-        task_endpoint = spider.settings['API_PIPELINE_TASK_ENDPOINT_MAPPING'].get(
-            spider.name, spider.settings['API_PIPELINE_TASK_ENDPOINT_DEFAULT']
-        )
-        api_url = os.path.join(
-            spider.settings['API_PIPELINE_URL'],
-            task_endpoint
-        )
+        """Post results to HTTP API, from the reactor thread pool."""
+        if not self.batch_size:
+            return self._push_results(spider)
+        self.flush_loop.stop()
+        self.flush_batch()
+        pending = defer.DeferredList(list(self.in_flight))
+        return pending.addCallback(lambda _: self._push_results(spider))
+
+    def _push_results(self, spider):
+        api_url = self._api_url(spider)
         if api_url and 'SCRAPY_JOB' in os.environ:
-            requests.post(api_url, json={
-                "kwargs": self._prepare_payload(spider)
-            })
-            self.logger.info('Spider successfully send payload.', name=spider.name, dois=self.dois, count=self.count)
-        else:
-            self.logger.error('Spider cannot send payload.', name=spider.name, dois=self.dois, count=self.count)
+            payload = self._prepare_payload(spider)
+            if self.batch_size:
+                # the records were pushed already
+                payload['results_data'] = []
+                payload['errors'] += [
+                    ('Cannot push batch with DOIs %s' % ', '.join(map(str, dois)), 'pipeline')
+                    for dois in self.failed_batches
+                ]
+
+            def pushed(response):
+                self.logger.info('Spider successfully send payload.', name=spider.name, dois=self.dois, count=self.count)
+
+            def failed(failure):
+                failure.trap(requests.RequestException)
+                self.logger.error('Spider cannot send payload.', name=spider.name, error=str(failure.value), dois=self.dois, count=self.count)
+
+            def cleanup(result):
+                self._cleanup(spider)
+                return result
+
+            posted = threads.deferToThread(self._post, api_url, payload)
+            return posted.addCallbacks(pushed, failed).addBoth(cleanup)
+        self.logger.error('Spider cannot send payload.', name=spider.name, dois=self.dois, count=self.count)
         self._cleanup(spider)
 
 
 class InspireCeleryPushPipeline(InspireAPIPushPipeline):
-    """Push to INSPIRE API via Celery."""
+    """Push to INSPIRE API via Celery.
+
+    By default one task is sent once the crawl is over, for the whole feed.
+    With ``CELERY_PUSH_CHUNK_SIZE`` the converted records are written to JSON
+    lines chunk files of that many records instead, and a task is sent for
+    each chunk as soon as it is written, so the records are ingested while
+    the crawl goes on. The tasks are published with the same producer, and
+    a last task reports the errors of the crawl.
+    """
 
     def __init__(self):
         from celery import Celery
 
         super(InspireCeleryPushPipeline, self).__init__()
         self.celery = Celery()
+        self.producer = None
+        self.chunk_size = 0
+        self.chunk_dir = None
+        self.chunk_lines = []
+        self.chunks = []
 
     def open_spider(self, spider):
+        ignore_result = spider.settings.getbool('CELERY_PUSH_IGNORE_RESULT')
         self.celery.conf.update(dict(
             BROKER_URL=spider.settings['BROKER_URL'],
-            CELERY_RESULT_BACKEND=spider.settings['CELERY_RESULT_BACKEND'],
+            # the results of the tasks are not read
+            CELERY_RESULT_BACKEND=None if ignore_result else spider.settings['CELERY_RESULT_BACKEND'],
+            CELERY_IGNORE_RESULT=ignore_result,
             CELERY_ACCEPT_CONTENT=spider.settings['CELERY_ACCEPT_CONTENT'],
             CELERY_TIMEZONE=spider.settings['CELERY_TIMEZONE'],
             CELERY_DISABLE_RATE_LIMITS=spider.settings['CELERY_DISABLE_RATE_LIMITS'],
             CELERY_TASK_SERIALIZER='json',
             CELERY_RESULT_SERIALIZER='json',
         ))
+        if 'SCRAPY_JOB' in os.environ:
+            self.chunk_size = spider.settings.getint('CELERY_PUSH_CHUNK_SIZE')
+            self.chunk_dir = spider.settings.get('CELERY_PUSH_CHUNK_DIR') or self._feed_dir()
+
+    def _feed_dir(self):
+        feed_uri = os.environ.get('SCRAPY_FEED_URI', '')
+        if feed_uri.startswith('file://'):
+            return os.path.dirname(feed_uri[len('file://'):])
+        return tempfile.gettempdir()
+
+    def _send_task(self, spider, kwargs):
+        task_endpoint = spider.settings['API_PIPELINE_TASK_ENDPOINT_MAPPING'].get(
+            spider.name, spider.settings['API_PIPELINE_TASK_ENDPOINT_DEFAULT']
+        )
+        if self.producer is None:
+            self.producer = self.celery.amqp.producer_pool.acquire(block=True)
+        self.celery.send_task(
+            task_endpoint,
+            kwargs=kwargs,
+            producer=self.producer,
+            add_to_parent=False,
+        )
+
+    def process_item(self, item, spider):
+        item = super(InspireCeleryPushPipeline, self).process_item(item, spider)
+        if self.chunk_size:
+            self.chunk_lines.append(json.dumps(record_dict(item), separators=(',', ':')) + '\n')
+            if len(self.chunk_lines) >= self.chunk_size:
+                self.submit_chunk(spider)
+        return item
+
+    def submit_chunk(self, spider):
+        """Write the waiting records to a chunk file and send its task."""
+        if not self.chunk_lines:
+            return
+        path = os.path.join(self.chunk_dir, '{0}_{1}.{2:05d}.jsonl'.format(
+            spider.name, os.environ['SCRAPY_JOB'], len(self.chunks) + 1,
+        ))
+        chunk = JsonLinesShard(path)
+        chunk.write(self.chunk_lines)
+        chunk.close()
+        self.chunk_lines = []
+        self.chunks.append(path)
+        self._send_task(spider, dict(
+            job_id=os.environ['SCRAPY_JOB'],
+            results_uri='file://' + path,
+            log_file=os.environ.get('SCRAPY_LOG_FILE', ''),
+            errors=[],
+        ))
+        self.logger.info('Spider sent chunk.', name=spider.name, chunk=path, count=chunk.count)
 
     def close_spider(self, spider):
         """Post results to BROKER API."""
         if 'SCRAPY_JOB' in os.environ:
-            task_endpoint = spider.settings['API_PIPELINE_TASK_ENDPOINT_MAPPING'].get(
-                spider.name, spider.settings['API_PIPELINE_TASK_ENDPOINT_DEFAULT']
-            )
-            self.celery.send_task(
-                task_endpoint,
-                kwargs=self._prepare_payload(spider),
-            )
+            payload = self._prepare_payload(spider)
+            if self.chunk_size:
+                self.submit_chunk(spider)
+                # the records were sent in the chunks
+                payload['results_data'] = []
+            self._send_task(spider, payload)
             LOGGER.info('The spider successfully send payload.', extra=dict(
                 spider=spider.name, dois=self.dois, count=self.count
             ))
-            self.logger.info('Spider successfully send payload.', name=spider.name, dois=self.dois, count=self.count)
+            self.logger.info('Spider successfully send payload.', name=spider.name, dois=self.dois, count=self.count, chunks=len(self.chunks))
         else:
             LOGGER.error('The cannot send payload.', extra=dict(
                 spider=spider.name, dois=self.dois, count=self.count
             ))
             self.logger.error('Spider cannot send payload.', name=spider.name, dois=self.dois, count=self.count)
+        if self.producer is not None:
+            self.producer.release()
+            self.producer = None
         self._cleanup(spider)
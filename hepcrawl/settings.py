@@ -59,6 +59,7 @@ DUPEFILTER_CLASS = "scrapy.dupefilters.BaseDupeFilter"
 # Enable or disable spider middlewares
 # See http://scrapy.readthedocs.org/en/latest/topics/spider-middleware.html
 SPIDER_MIDDLEWARES = {
+    'hepcrawl.middlewares.DOIMergeMiddleware': 100,
     'hepcrawl.middlewares.ErrorHandlingMiddleware': 543,
 }
 
@@ -72,6 +73,7 @@ DOWNLOADER_MIDDLEWARES = {
 # See http://scrapy.readthedocs.org/en/latest/topics/extensions.html
 EXTENSIONS = {
     'hepcrawl.extensions.ErrorHandler': 555,
+    'hepcrawl.extensions.MemoizeStats': 556,
 }
 SENTRY_DSN = os.environ.get('APP_SENTRY_DSN')
 if SENTRY_DSN:
@@ -81,10 +83,84 @@ if SENTRY_DSN:
 # See http://scrapy.readthedocs.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
     # 'hepcrawl.pipelines.JsonWriterPipeline': 300,
+    # 'hepcrawl.pipelines.ValidationPipeline': 200,
+    # 'hepcrawl.pipelines.DOIDeduplicationPipeline': 0,
     'scrapy.pipelines.files.FilesPipeline': 1,
     'hepcrawl.pipelines.InspireCeleryPushPipeline': 300,
 }
 
+# JSON lines output of hepcrawl.pipelines.JsonWriterPipeline
+# ==========================================================
+# JSON_OUTPUT_DIR = '/tmp/'
+JSON_OUTPUT_COMPRESS = False
+# Records are written when this many bytes are waiting, and every this many
+# seconds
+JSON_OUTPUT_BUFFER_SIZE = 2 ** 20
+JSON_OUTPUT_FLUSH_INTERVAL = 5
+# Split the output in files of this many records (0 for a single file)
+JSON_OUTPUT_SHARD_SIZE = 0
+# Split the output in one file per journal
+JSON_OUTPUT_SHARD_BY_JOURNAL = False
+
+# MessagePack output of hepcrawl.pipelines.MsgpackWriterPipeline, same as
+# the JSON lines output
+# MSGPACK_OUTPUT_DIR = '/tmp/'
+MSGPACK_OUTPUT_COMPRESS = False
+MSGPACK_OUTPUT_BUFFER_SIZE = 2 ** 20
+MSGPACK_OUTPUT_FLUSH_INTERVAL = 5
+MSGPACK_OUTPUT_SHARD_SIZE = 0
+MSGPACK_OUTPUT_SHARD_BY_JOURNAL = False
+
+# SQLite database of hepcrawl.pipelines.SqlitePipeline, a new file in
+# SQLITE_OUTPUT_DIR unless SQLITE_OUTPUT_URI is set
+# SQLITE_OUTPUT_URI = '/data/hepcrawl.db'
+# SQLITE_OUTPUT_DIR = '/tmp/'
+SQLITE_OUTPUT_BATCH_SIZE = 1000
+# Batches waiting for the writer thread before the crawl waits for it
+SQLITE_OUTPUT_MAX_PENDING = 4
+
+# Validation of the records by hepcrawl.pipelines.ValidationPipeline,
+# to be put before the push pipeline, e.g. at 200
+VALIDATION_SCHEMA = 'hep'
+# Also report the fields which are not in the schema and the missing
+# required ones
+VALIDATION_STRICT = False
+# Validate the records in a thread instead of in the crawl
+VALIDATION_IN_THREAD = False
+# Share of the records which are validated
+VALIDATION_SAMPLE_RATE = 1.0
+# Drop the invalid records instead of only writing them to the quarantine
+VALIDATION_DROP_INVALID = False
+# VALIDATION_QUARANTINE_DIR = '/tmp/'
+
+# Pipelines fed side by side by hepcrawl.pipelines.FanOutPipeline, each in
+# its own thread, e.g.
+# {'hepcrawl.pipelines.JsonWriterPipeline': 100,
+#  'hepcrawl.pipelines.MsgpackWriterPipeline': 200}
+# The push pipelines stay in ITEM_PIPELINES
+FANOUT_SINKS = {}
+# Items waiting for each sink before the crawl waits
+FANOUT_QUEUE_SIZE = 1000
+# Seconds between the reports of the sink queues (0 for none)
+FANOUT_LAG_INTERVAL = 60
+
+# Records with a DOI already seen in the crawl: 'first' keeps the first
+# copy (hepcrawl.pipelines.DOIDeduplicationPipeline), 'latest' the one of
+# the latest package and 'richest' the one with the most local files
+# (hepcrawl.middlewares.DOIMergeMiddleware, which holds the records until
+# the spider is idle)
+DEDUP_POLICY = 'first'
+# Index of the DOIs of hepcrawl.pipelines.DOIDeduplicationPipeline
+# For large backfills, a Bloom filter of this many DOIs in front of the
+# index (0 for none); this share of the new DOIs is looked up in the index
+DEDUP_BLOOM_CAPACITY = 0
+DEDUP_BLOOM_ERROR_RATE = 0.001
+
+# MessagePack feed exporter, enabled with -s FEED_FORMAT=msgpack
+FEED_EXPORTERS = {
+    'msgpack': 'hepcrawl.exporters.MsgpackItemExporter',
+}
+
 # Files Pipeline settings
 # =======================
 FILES_STORE = os.environ.get(
@@ -99,6 +175,16 @@ FILES_RESULT_FIELD = 'files'
 API_PIPELINE_URL = "http://localhost:5555/api/task/async-apply"
 API_PIPELINE_TASK_ENDPOINT_DEFAULT = "inspire_crawler.tasks.submit_results"
 API_PIPELINE_TASK_ENDPOINT_MAPPING = {}   # e.g. {'my_spider': 'special.task'}
+API_PIPELINE_TIMEOUT = 60
+API_PIPELINE_RETRIES = 3
+# gzip the pushed JSON, the API has to accept Content-Encoding: gzip
+API_PIPELINE_COMPRESS = False
+# Push the records during the crawl in batches of this many records (0 to
+# push all the results at the end), or every this many seconds
+API_PIPELINE_BATCH_SIZE = 0
+API_PIPELINE_BATCH_INTERVAL = 30
+# Batches sent at the same time before the crawl waits
+API_PIPELINE_MAX_IN_FLIGHT = 4
 
 # Celery
 # ======
@@ -111,6 +197,13 @@ CELERY_RESULT_BACKEND = os.environ.get(
 CELERY_ACCEPT_CONTENT = ['json', 'msgpack', 'yaml']
 CELERY_TIMEZONE = 'Europe/Amsterdam'
 CELERY_DISABLE_RATE_LIMITS = True
+# Send the records in tasks of this many records while crawling, written to
+# files in CELERY_PUSH_CHUNK_DIR (by default next to the feed), or 0 to send
+# one task for the whole feed at the end
+CELERY_PUSH_CHUNK_SIZE = 0
+# CELERY_PUSH_CHUNK_DIR = '/data/chunks/'
+# Do not store the results of the sent tasks, they are not read
+CELERY_PUSH_IGNORE_RESULT = True
 
 # Jobs
 # ====
@@ -146,6 +239,15 @@ LAST_RUNS_PATH = os.environ.get(
     '/eos/project/s/scoap3repo/last_run'
 )
 
+# Read the front matter of JATS, Elsevier and Springer articles with the
+# XSLT stylesheets in hepcrawl/stylesheets instead of the Python extractors
+XSLT_EXTRACTION = False
+
+# Gather the authors in a hepcrawl.authors.AuthorTable while the records are
+# parsed, and keep the table until the record is serialized for records with
+# at least this many authors (0 disables it)
+COMPACT_AUTHORS_MIN_COUNT = 0
+
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See http://doc.scrapy.org/en/latest/topics/autothrottle.html
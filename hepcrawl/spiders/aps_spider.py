@@ -34,6 +34,15 @@ class APSSpider(Spider):
     """
     name = 'APS'
     aps_base_url = "http://harvest.aps.org/v2/journals/articles"
+    parser = APSParser()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(APSSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.parser = APSParser(
+            min_authors=crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT'),
+        )
+        return spider
 
     def __init__(self, url=None, from_date=None, until_date=None, date="published", journals=None,
                  sets=None, per_page=100, **kwargs):
@@ -132,5 +141,4 @@ class APSSpider(Spider):
 
     def parse(self, response):
         self.log('Parsing node...', logging.INFO)
-        parser = APSParser()
-        return parser.parse(response)
+        return self.parser.parse(response)
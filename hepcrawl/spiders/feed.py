@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Base spider for XML feeds parsed with the shared lxml parsers."""
+
+from __future__ import absolute_import, print_function
+
+from scrapy.exceptions import NotConfigured, NotSupported
+from scrapy.spiders import XMLFeedSpider as BaseXMLFeedSpider
+
+from ..utils import response_selector, xmliter
+
+
+class XMLFeedSpider(BaseXMLFeedSpider):
+    """XMLFeedSpider reading the response body without decoding it first.
+
+    The iterators are the ones of scrapy, but the nodes are parsed from the
+    bytes of the response with the parsers of ``hepcrawl.utils``.
+    """
+
+    def parse(self, response):
+        if not hasattr(self, 'parse_node'):
+            raise NotConfigured('You must define parse_node method in order to scrape this XML feed')
+
+        response = self.adapt_response(response)
+        if self.iterator == 'iternodes':
+            nodes = self._iternodes(response)
+        elif self.iterator in ('xml', 'html'):
+            selector = response_selector(response, type=self.iterator)
+            self._register_namespaces(selector)
+            nodes = selector.xpath('//%s' % self.itertag)
+        else:
+            raise NotSupported('Unsupported node iterator')
+
+        return self.parse_nodes(response, nodes)
+
+    def _iternodes(self, response):
+        for node in xmliter(response.body, self.itertag):
+            self._register_namespaces(node)
+            yield node
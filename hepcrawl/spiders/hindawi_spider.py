@@ -14,9 +14,9 @@ from __future__ import absolute_import, print_function
 import logging
 
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 
 from hepcrawl.extractors.hindawi_parser import HindawiParser
+from .feed import XMLFeedSpider
 
 
 class HindawiSpider(XMLFeedSpider):
@@ -56,6 +56,7 @@ class HindawiSpider(XMLFeedSpider):
     start_urls = []
     iterator = 'xml'
     itertag = 'marc:record'
+    parser = HindawiParser()
 
     namespaces = [
         ("OAI-PMH", "http://www.openarchives.org/OAI/2.0/"),
@@ -63,6 +64,14 @@ class HindawiSpider(XMLFeedSpider):
         ("mml", "http://www.w3.org/1998/Math/MathML"),
     ]
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(HindawiSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.parser = HindawiParser(
+            min_authors=crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT'),
+        )
+        return spider
+
     def __init__(self, source_file=None, *args, **kwargs):
         """Construct Hindawi spider."""
         super(HindawiSpider, self).__init__(*args, **kwargs)
@@ -75,5 +84,4 @@ class HindawiSpider(XMLFeedSpider):
 
     def parse_node(self, response, node):
         self.log('Parsing node...', logging.INFO)
-        parser = HindawiParser()
-        return parser.parse_node(response, node)
+        return self.parser.parse_node(response, node)
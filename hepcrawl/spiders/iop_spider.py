@@ -15,18 +15,16 @@ import datetime
 import logging
 import os
 import pysftp
-import re
 import tarfile
 import zipfile
 from tempfile import mkdtemp
 import paramiko
 from scrapy import Request
 from scrapy.spiders import Spider
-from scrapy.selector import Selector
-from scrapy.utils.python import re_rsearch
 
 from ..extractors.iop_parser import IOPParser
 from ..settings import IOP_DOWNLOAD_DIR, IOP_UNPACK_FOLDER
+from ..utils import xml_file_selector
 
 
 def uncompress(filename, target_folder):
@@ -49,38 +47,6 @@ def uncompress(filename, target_folder):
     return datasets
 
 
-def xmliter(text, nodename):
-    """Return a iterator of Selector's over all nodes of a XML document,
-       given the name of the node to iterate. Useful for parsing XML feeds.
-
-    obj can be:
-    - a Response object
-    - a unicode string
-    - a string encoded as utf-8
-    """
-
-    nodename_patt = re.escape(nodename)
-
-    HEADER_START_RE = re.compile(r'^(.*?)<\s*%s(?:\s|>)' % nodename_patt, re.S)
-    HEADER_END_RE = re.compile(r'<\s*/%s\s*>' % nodename_patt, re.S)
-
-    header_start = re.search(HEADER_START_RE, text)
-    header_start = header_start.group(1).strip() if header_start else ''
-    header_end = re_rsearch(HEADER_END_RE, text)
-    header_end = text[header_end[1]:].strip() if header_end else ''
-
-    r = re.compile(r'<%(np)s[\s>].*?</%(np)s>' %
-                   {'np': nodename_patt}, re.DOTALL)
-    for match in r.finditer(text):
-        nodetext = header_start + match.group() + header_end
-        tmp = Selector(text=nodetext, type='xml')
-        tmp.remove_namespaces()
-        l = tmp.xpath('//' + nodename)
-
-        if l:
-            yield l[0]
-
-
 class IOPSpider(Spider):
     """IOP SCOPA3 crawler.
 
@@ -110,9 +76,19 @@ class IOPSpider(Spider):
     name = 'IOP'
     start_urls = []
     itertag = ['article', 'simple-article']
+    parser = IOPParser()
 
     ERROR_CODES = range(400, 432)
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(IOPSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.parser = IOPParser(
+            use_xslt=crawler.settings.getbool('XSLT_EXTRACTION'),
+            min_authors=crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT'),
+        )
+        return spider
+
     def __init__(self, package_path=None, ftp_host=None, ftp_user=None,
                  ftp_dir='/', ftp_port=22, force=False, *args, **kwargs):
         """Construct Elsevier spider."""
@@ -226,26 +202,24 @@ class IOPSpider(Spider):
 
                 full_path = os.path.join(path, filename)
                 if filename.endswith('.xml'):
-                    with open(full_path, 'r') as file:
-                        dir_path = os.path.dirname(full_path)
-                        filename = os.path.basename(full_path).split('.')[0]
-                        pdf_url = os.path.join(
-                            dir_path, "%s.%s" % (filename, 'pdf'))
-
-                        class Meta:
-                            meta = {"package_path": package_path,
-                                    "xml_url": full_path,
-                                    "pdf_url": pdf_url, }
-                        selector = Selector(text=file.read(), type='xml')
-                        yield self.parse_node(Meta(), selector)
+                    dir_path = os.path.dirname(full_path)
+                    filename = os.path.basename(full_path).split('.')[0]
+                    pdf_url = os.path.join(
+                        dir_path, "%s.%s" % (filename, 'pdf'))
+
+                    class Meta:
+                        meta = {"package_path": package_path,
+                                "xml_url": full_path,
+                                "pdf_url": pdf_url, }
+                    selector = xml_file_selector(full_path)
+                    yield self.parse_node(Meta(), selector)
                 else:
                     print('File with invalid extension on FTP path=%s' %
                           full_path)
 
     def parse_node(self, meta_data, node):
         self.log('Parsing node...', logging.INFO)
-        parser = IOPParser()
-        return parser.parse_node(meta_data, node)
+        return self.parser.parse_node(meta_data, node)
 
     @staticmethod
     def create_directories():
@@ -17,10 +17,10 @@ import os
 import ftputil
 from ftputil.error import FTPOSError
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 from time import localtime, strftime
 
 from hepcrawl.extractors.oup_parser import OUPParser
+from .feed import XMLFeedSpider
 from ..utils import ftp_connection_info, unzip_files, ftp_session_factory
 
 from ..settings import OXFORD_DOWNLOAD_DIR
@@ -59,6 +59,16 @@ class OxfordUniversityPressSpider(XMLFeedSpider):
     start_urls = []
     iterator = 'html'  # this fixes a problem with parsing the record
     itertag = 'article'
+    parser = OUPParser()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(OxfordUniversityPressSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.parser = OUPParser(
+            use_xslt=crawler.settings.getbool('XSLT_EXTRACTION'),
+            min_authors=crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT'),
+        )
+        return spider
 
     def __init__(self, package_path=None, ftp_folder="hooks", ftp_host=None, ftp_netrc=None, *args, **kwargs):
         """Construct OUP spider."""
@@ -221,5 +231,4 @@ class OxfordUniversityPressSpider(XMLFeedSpider):
 
     def parse_node(self, response, node):
         self.log('Parsing node...', logging.INFO)
-        parser = OUPParser()
-        return parser.parse_node(response, node)
+        return self.parser.parse_node(response, node)
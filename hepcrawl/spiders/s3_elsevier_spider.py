@@ -15,7 +15,6 @@ import datetime
 import logging
 import os
 import pysftp
-import re
 import tarfile
 import zipfile
 
@@ -23,13 +22,12 @@ from hepcrawl.extractors.s3_elsevier_parser import S3ElsevierParser
 from ..settings import (
     ELSEVIER_SOURCE_DIR,
     ELSEVIER_DOWNLOAD_DIR,
-    ELSEVIER_UNPACK_FOLDER
+    ELSEVIER_UNPACK_FOLDER,
 )
+from ..utils import html_file_selector, xmliter
 
 from scrapy import Request
 from scrapy.spiders import Spider
-from scrapy.selector import Selector
-from scrapy.utils.python import re_rsearch
 from tempfile import mkdtemp
 
 
@@ -55,37 +53,6 @@ def uncompress(filename, target_folder):
     return datasets
 
 
-def xmliter(text, nodename):
-    """Return a iterator of Selector's over all nodes of a XML document,
-       given the name of the node to iterate. Useful for parsing XML feeds.
-
-    obj can be:
-    - a Response object
-    - a unicode string
-    - a string encoded as utf-8
-    """
-
-    nodename_patt = re.escape(nodename)
-
-    HEADER_START_RE = re.compile(r'^(.*?)<\s*%s(?:\s|>)' % nodename_patt, re.S)
-    HEADER_END_RE = re.compile(r'<\s*/%s\s*>' % nodename_patt, re.S)
-
-    header_start = re.search(HEADER_START_RE, text)
-    header_start = header_start.group(1).strip() if header_start else ''
-    header_end = re_rsearch(HEADER_END_RE, text)
-    header_end = text[header_end[1]:].strip() if header_end else ''
-
-    r = re.compile(r'<%(np)s[\s>].*?</%(np)s>' % {'np': nodename_patt}, re.DOTALL)
-    for match in r.finditer(text):
-        nodetext = header_start + match.group() + header_end
-        tmp = Selector(text=nodetext, type='xml')
-        tmp.remove_namespaces()
-        l = tmp.xpath('//' + nodename)
-
-        if l:
-            yield l[0]
-
-
 class S3ElsevierSpider(Spider):
     """Elsevier SCOPA3 crawler.
 
@@ -119,14 +86,19 @@ class S3ElsevierSpider(Spider):
     name = 'Elsevier'
     start_urls = []
     itertag = ['article', 'simple-article']
-
-    journal_mapping = {
-        'PLB': 'Physics Letters B',
-        'NUPHB': 'Nuclear Physics B'
-    }
+    parser = S3ElsevierParser()
 
     ERROR_CODES = range(400, 432)
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(S3ElsevierSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.parser = S3ElsevierParser(
+            use_xslt=crawler.settings.getbool('XSLT_EXTRACTION'),
+            min_authors=crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT'),
+        )
+        return spider
+
     def __init__(self, package_path=None, ftp_host='sftp', ftp_user='foo', ftp_password='pass',
                  ftp_dir='upload', ftp_port=22, force=False, *args, **kwargs):
         """Construct Elsevier spider."""
@@ -241,19 +213,18 @@ class S3ElsevierSpider(Spider):
         """
 
         self.log('Parsing dataset: %s' % f, logging.INFO)
-        with open(f, 'r') as dataset_file:
-            dataset = Selector(text=dataset_file.read())
-            journal_data = self.parse_journal_issue(dataset, target_folder, filename)
-            self.parse_journal_items(dataset, target_folder, filename, zip_filepath, journal_data)
-
-            for i in range(len(journal_data)):
-                for doi, data in journal_data[i]['articles'].items():
-                    self.log("Starting to parse file: '%s'" % data['files']['xml'], logging.INFO)
-                    with open(data['files']['xml'], 'r') as xml_file:
-                        xml_file_content = xml_file.read()
-                        for nodename in self.itertag:
-                            for selector in xmliter(xml_file_content, nodename):
-                                yield self.parse_node(journal_data[i], selector)
+        dataset = html_file_selector(f)
+        journal_data = self.parse_journal_issue(dataset, target_folder, filename)
+        self.parse_journal_items(dataset, target_folder, filename, zip_filepath, journal_data)
+
+        for i in range(len(journal_data)):
+            for doi, data in journal_data[i]['articles'].items():
+                self.log("Starting to parse file: '%s'" % data['files']['xml'], logging.INFO)
+                with open(data['files']['xml'], 'rb') as xml_file:
+                    xml_file_content = xml_file.read()
+                for nodename in self.itertag:
+                    for selector in xmliter(xml_file_content, nodename):
+                        yield self.parse_node(journal_data[i], selector)
 
     def parse_journal_issue(self, dataset, target_folder, filename):
         """Parse journal issue tags and files if there is any in the dataset.xml.
@@ -274,22 +245,20 @@ class S3ElsevierSpider(Spider):
             self.log('Parsing journal issue xml: %s' % issue_file, logging.INFO)
 
             articles = {}
-            with open(issue_file, 'r') as issue_file:
-                iss = Selector(text=issue_file.read())
-                iss.remove_namespaces()
-                for article in iss.xpath('//include-item'):
-                    doi = article.xpath('./doi/text()')[0].extract()
+            iss = html_file_selector(issue_file)
+            for article in iss.xpath('//include-item'):
+                doi = article.xpath('./doi/text()')[0].extract()
 
-                    first_page = None
-                    if article.xpath('./pages/first-page/text()'):
-                        first_page = article.xpath('./pages/first-page/text()')[0].extract()
+                first_page = None
+                if article.xpath('./pages/first-page/text()'):
+                    first_page = article.xpath('./pages/first-page/text()')[0].extract()
 
-                    last_page = None
-                    if article.xpath('./pages/last-page/text()'):
-                        last_page = article.xpath('./pages/last-page/text()')[0].extract()
+                last_page = None
+                if article.xpath('./pages/last-page/text()'):
+                    last_page = article.xpath('./pages/last-page/text()')[0].extract()
 
-                    articles[doi] = {'first-page': first_page,
-                                     'last-page': last_page}
+                articles[doi] = {'first-page': first_page,
+                                 'last-page': last_page}
 
             tmp['articles'] = articles
             data.append(tmp)
@@ -310,7 +279,6 @@ class S3ElsevierSpider(Spider):
                 publication_date = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
             journal = x_article.xpath('./journal-item-unique-ids/jid-aid/jid/text()')[0].extract()
-            journal = self.journal_mapping.get(journal, journal)
 
             # find the doi in journal data
             data_index = None
@@ -348,8 +316,7 @@ class S3ElsevierSpider(Spider):
 
     def parse_node(self, meta_data, node):
         self.log('Parsing node...', logging.INFO)
-        parser = S3ElsevierParser()
-        return parser.parse_node(meta_data, node)
+        return self.parser.parse_node(meta_data, node)
 
     @staticmethod
     def create_directories():
@@ -15,12 +15,16 @@ import logging
 import os
 
 from hepcrawl.extractors.s3_springer_parser import S3SpringerParser
+from .feed import XMLFeedSpider
 from ..utils import ftp_connection_info, unzip_files
-from ..settings import SPRINGER_DOWNLOAD_DIR, SPRINGER_UNPACK_FOLDER, SPRINGER_WORKING_DIR
+from ..settings import (
+    SPRINGER_DOWNLOAD_DIR,
+    SPRINGER_UNPACK_FOLDER,
+    SPRINGER_WORKING_DIR,
+)
 
 from tempfile import mkdtemp
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 import pysftp
 
 
@@ -58,9 +62,19 @@ class S3SpringerSpider(XMLFeedSpider):
     start_urls = []
     iterator = 'iternodes'
     itertag = 'Publisher'
+    parser = S3SpringerParser()
 
     ERROR_CODES = range(400, 432)
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(S3SpringerSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.parser = S3SpringerParser(
+            use_xslt=crawler.settings.getbool('XSLT_EXTRACTION'),
+            min_authors=crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT'),
+        )
+        return spider
+
     def __init__(self, package_path=None, ftp_folder="/data/in", ftp_host=None, ftp_netrc=None, force=False, *args, **kwargs):
         """Construct Elsevier spider."""
         super(S3SpringerSpider, self).__init__(*args, **kwargs)
@@ -161,5 +175,4 @@ class S3SpringerSpider(XMLFeedSpider):
 
     def parse_node(self, response, node):
         self.log('Parsing node...', logging.INFO)
-        parser = S3SpringerParser()
-        return parser.parse_node(response, node)
+        return self.parser.parse_node(response, node)
@@ -15,8 +15,8 @@ import logging
 import os
 
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 
+from .feed import XMLFeedSpider
 from ..items import HEPRecord
 from ..loaders import HEPLoader
 from ..utils import get_license
@@ -68,6 +68,13 @@ class Scoap3Spider(XMLFeedSpider):
         ("marc", "http://www.loc.gov/MARC21/slim"),
         ("mml", "http://www.w3.org/1998/Math/MathML"),
     ]
+    min_authors = 0
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(Scoap3Spider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.min_authors = crawler.settings.getint('COMPACT_AUTHORS_MIN_COUNT')
+        return spider
 
     def __init__(self, source_file=None, *args, **kwargs):
         """Construct Hindawi spider."""
@@ -92,12 +99,13 @@ class Scoap3Spider(XMLFeedSpider):
 
         return affiliations
 
-    def get_authors(self, node):
-        """Gets the authors."""
+    def get_authors(self, node, authors=None):
+        """Gets the authors, appended to `authors` if given."""
         authors_first = node.xpath("./datafield[@tag='100']")
         authors_others = node.xpath("./datafield[@tag='700']")
         authors_raw = authors_first + authors_others
-        authors = []
+        if authors is None:
+            authors = []
         for author in authors_raw:
             orcid = author.xpath("./subfield[@code='j']/text()").extract_first()
             if orcid:
@@ -151,32 +159,17 @@ class Scoap3Spider(XMLFeedSpider):
 
     @staticmethod
     def get_journal_title(node):
-        JOURNAL_FULL_NAMES = {
-            "PTEP": "Progress of Theoretical and Experimental Physics",
-            "New J. Phys.": "New Journal of Physics",
-            "JCAP": "Journal of Cosmology and Astroparticle Physics",
-            "EPJC": "European Physical Journal C",
-            "Chinese Phys. C": "Chinese Physics C",
-            "JHEP": "Journal of High Energy Physics",
-            "Physics letters B": "Physics Letters B",
-            "Phys. Rev. C": "Physical Review C",
-            "Phys. Rev. D": "Physical Review D",
-            "Phys. Rev. Lett.": "Physical Review Letters"
-        }
-        title = node.xpath("./datafield[@tag='773']/subfield[@code='p']/text()").extract_first()
-        for abreviation, full_name in JOURNAL_FULL_NAMES.items():
-            if title == abreviation:
-                title = full_name
-                break
-        return title
+        """Get the journal title, abbreviations are expanded by the loader."""
+        return node.xpath("./datafield[@tag='773']/subfield[@code='p']/text()").extract_first()
 
     def parse_node(self, response, node):
         """Iterate all the record nodes in the XML and build the HEPRecord."""
 
         node.remove_namespaces()
-        record = HEPLoader(item=HEPRecord(), selector=node, response=response)
+        record = HEPLoader(item=HEPRecord(), selector=node, response=response,
+                           min_authors=self.min_authors)
 
-        record.add_value('authors', self.get_authors(node))
+        record.add_value('authors', self.get_authors(node, record.new_authors()))
         record.add_xpath('abstract', "./datafield[@tag='520']/subfield[@code='a']")
         record.add_xpath('title',
                          "./datafield[@tag='245']/subfield[@code='a']/text()")
@@ -0,0 +1,120 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<!--
+    This file is part of hepcrawl.
+    Copyright (C) 2015, 2016 CERN.
+
+    hepcrawl is a free software; you can redistribute it and/or modify it
+    under the terms of the Revised BSD License; see LICENSE file for
+    more details.
+
+    Front matter of Elsevier CE articles as HEPRecord fields.
+    See hepcrawl.extractors.xslt for the format of the output.
+-->
+<xsl:stylesheet version="1.0"
+    xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+    xmlns:ja="http://www.elsevier.com/xml/ja/dtd"
+    xmlns:ce="http://www.elsevier.com/xml/common/dtd"
+    xmlns:sa="http://www.elsevier.com/xml/common/struct-aff/dtd"
+    xmlns:exsl="http://exslt.org/common"
+    xmlns:regexp="http://exslt.org/regular-expressions"
+    exclude-result-prefixes="ja ce sa exsl regexp">
+
+    <xsl:output method="xml" encoding="UTF-8"/>
+
+    <xsl:template match="/">
+        <record>
+            <xsl:apply-templates select="*"/>
+        </record>
+    </xsl:template>
+
+    <xsl:template match="*">
+        <xsl:variable name="head" select="ja:head | ja:simple-head"/>
+        <xsl:apply-templates select="$head/ce:title/text()" mode="field">
+            <xsl:with-param name="name" select="'title'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="$head/ce:subtitle/text()" mode="field">
+            <xsl:with-param name="name" select="'subtitle'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="$head/ce:author-group/ce:collaboration/ce:text/text()" mode="field">
+            <xsl:with-param name="name" select="'collaborations'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="//ja:item-info/ja:aid/text()" mode="field">
+            <xsl:with-param name="name" select="'journal_artid'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="ja:item-info/ce:copyright/text()" mode="field">
+            <xsl:with-param name="name" select="'copyright_holder'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="ja:item-info/ce:copyright/@year" mode="field">
+            <xsl:with-param name="name" select="'copyright_year'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="ja:item-info/ce:copyright/text()" mode="field">
+            <xsl:with-param name="name" select="'copyright_statement'"/>
+        </xsl:apply-templates>
+        <xsl:apply-templates select="//ce:author-group/ce:author" mode="author"/>
+    </xsl:template>
+
+    <xsl:template match="node() | @*" mode="field">
+        <xsl:param name="name"/>
+        <field name="{$name}"><xsl:value-of select="."/></field>
+    </xsl:template>
+
+    <xsl:template match="ce:author" mode="author">
+        <xsl:variable name="group" select=".."/>
+        <xsl:variable name="by_id">
+            <!-- Correspondence (cor1) and deceased (fn1) references are skipped. -->
+            <xsl:for-each select=".//@refid[contains(., 'aff')]">
+                <xsl:variable name="refid" select="string(.)"/>
+                <xsl:variable name="affiliation" select="//ce:affiliation[@id = $refid]"/>
+                <xsl:choose>
+                    <xsl:when test="$affiliation//sa:affiliation">
+                        <item>
+                            <value>
+                                <xsl:for-each select="$affiliation//*[self::sa:organization or self::sa:city or self::sa:country or self::sa:address-line]/text()">
+                                    <xsl:if test="position() != 1">, </xsl:if>
+                                    <xsl:value-of select="."/>
+                                </xsl:for-each>
+                            </value>
+                        </item>
+                    </xsl:when>
+                    <xsl:when test="$affiliation">
+                        <item>
+                            <value><xsl:value-of select="regexp:replace(($affiliation/ce:textfn/text())[1], '^(\d+ ?)', '', '')"/></value>
+                        </item>
+                    </xsl:when>
+                </xsl:choose>
+            </xsl:for-each>
+            <xsl:for-each select="$group//ce:affiliation[not(@*)]/ce:textfn/text()">
+                <item><value><xsl:value-of select="."/></value></item>
+            </xsl:for-each>
+        </xsl:variable>
+
+        <field name="authors">
+            <xsl:if test="ce:surname/text()">
+                <surname><xsl:value-of select="(ce:surname/text())[1]"/></surname>
+            </xsl:if>
+            <xsl:if test="ce:given-name/text()">
+                <given_names><xsl:value-of select="(ce:given-name/text())[1]"/></given_names>
+            </xsl:if>
+            <xsl:if test="string(@orcid)">
+                <orcid>ORCID:<xsl:value-of select="@orcid"/></orcid>
+            </xsl:if>
+            <xsl:choose>
+                <xsl:when test="exsl:node-set($by_id)/item">
+                    <affiliations type="list"><xsl:copy-of select="$by_id"/></affiliations>
+                </xsl:when>
+                <!-- Without cross references, all affiliations of the group apply. -->
+                <xsl:when test="$group//ce:affiliation/ce:textfn/text()">
+                    <affiliations type="list">
+                        <xsl:for-each select="$group//ce:affiliation/ce:textfn/text()">
+                            <item><value><xsl:value-of select="."/></value></item>
+                        </xsl:for-each>
+                    </affiliations>
+                </xsl:when>
+            </xsl:choose>
+            <xsl:if test="ce:e-address/text()">
+                <email><xsl:value-of select="(ce:e-address/text())[1]"/></email>
+            </xsl:if>
+        </field>
+    </xsl:template>
+
+</xsl:stylesheet>
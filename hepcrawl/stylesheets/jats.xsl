@@ -0,0 +1,114 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<!--
+    This file is part of hepcrawl.
+    Copyright (C) 2015, 2016 CERN.
+
+    hepcrawl is a free software; you can redistribute it and/or modify it
+    under the terms of the Revised BSD License; see LICENSE file for
+    more details.
+
+    Front matter of JATS articles (IOP, OUP) as HEPRecord fields.
+    See hepcrawl.extractors.xslt for the format of the output.
+-->
+<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+
+    <xsl:output method="xml" encoding="UTF-8"/>
+
+    <!-- 'iop' only takes the title from the title group. -->
+    <xsl:param name="publisher" select="''"/>
+
+    <xsl:template match="/">
+        <record>
+            <xsl:choose>
+                <xsl:when test="$publisher = 'iop'">
+                    <xsl:apply-templates select="//title-group/article-title/text()" mode="field">
+                        <xsl:with-param name="name" select="'title'"/>
+                    </xsl:apply-templates>
+                </xsl:when>
+                <xsl:otherwise>
+                    <xsl:apply-templates select="//article-title/text()" mode="field">
+                        <xsl:with-param name="name" select="'title'"/>
+                    </xsl:apply-templates>
+                </xsl:otherwise>
+            </xsl:choose>
+            <xsl:apply-templates select="//subtitle/text()" mode="field">
+                <xsl:with-param name="name" select="'subtitle'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//contrib/collab/text()" mode="field">
+                <xsl:with-param name="name" select="'collaborations'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//abbrev-journal-title/text() | //journal-title/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_title'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//issue/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_issue'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//volume/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_volume'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//elocation-id/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_artid'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//copyright-holder/text()" mode="field">
+                <xsl:with-param name="name" select="'copyright_holder'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//copyright-year/text()" mode="field">
+                <xsl:with-param name="name" select="'copyright_year'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//copyright-statement/text()" mode="field">
+                <xsl:with-param name="name" select="'copyright_statement'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//contrib[@contrib-type='author']" mode="author"/>
+        </record>
+    </xsl:template>
+
+    <xsl:template match="node() | @*" mode="field">
+        <xsl:param name="name"/>
+        <field name="{$name}"><xsl:value-of select="."/></field>
+    </xsl:template>
+
+    <xsl:template match="contrib" mode="author">
+        <field name="authors">
+            <surname><xsl:value-of select="(name/surname/text())[1]"/></surname>
+            <given_names><xsl:value-of select="(name/given-names/text())[1]"/></given_names>
+            <xsl:if test="string((email/text())[1])">
+                <email><xsl:value-of select="(email/text())[1]"/></email>
+            </xsl:if>
+            <affiliations type="list">
+                <xsl:apply-templates select="aff" mode="affiliation"/>
+                <xsl:for-each select="xref[@ref-type='aff']/@rid[string(.)]">
+                    <xsl:variable name="rid" select="string(.)"/>
+                    <xsl:apply-templates select="//aff[@id = $rid]" mode="affiliation"/>
+                </xsl:for-each>
+            </affiliations>
+        </field>
+    </xsl:template>
+
+    <!--
+        The text of an affiliation without its label. When nothing but
+        whitespace is left, the markup after the label is kept instead.
+    -->
+    <xsl:template match="aff" mode="affiliation">
+        <xsl:variable name="text">
+            <xsl:for-each select="node()">
+                <xsl:choose>
+                    <xsl:when test="self::label"/>
+                    <xsl:when test="self::text() and preceding-sibling::node()[1][self::label]"/>
+                    <xsl:when test="self::comment() or self::processing-instruction()"/>
+                    <xsl:otherwise><xsl:value-of select="."/></xsl:otherwise>
+                </xsl:choose>
+            </xsl:for-each>
+        </xsl:variable>
+        <item>
+            <xsl:choose>
+                <xsl:when test="normalize-space($text)">
+                    <value><xsl:value-of select="$text"/></value>
+                </xsl:when>
+                <xsl:otherwise>
+                    <value type="markup"><xsl:copy-of select="label[1]/following-sibling::node()"/></value>
+                </xsl:otherwise>
+            </xsl:choose>
+        </item>
+    </xsl:template>
+
+</xsl:stylesheet>
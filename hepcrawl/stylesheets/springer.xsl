@@ -0,0 +1,134 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<!--
+    This file is part of hepcrawl.
+    Copyright (C) 2015, 2016 CERN.
+
+    hepcrawl is a free software; you can redistribute it and/or modify it
+    under the terms of the Revised BSD License; see LICENSE file for
+    more details.
+
+    Front matter of Springer A++ articles as HEPRecord fields.
+    See hepcrawl.extractors.xslt for the format of the output.
+-->
+<xsl:stylesheet version="1.0"
+    xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+    xmlns:exsl="http://exslt.org/common"
+    xmlns:str="http://exslt.org/strings"
+    exclude-result-prefixes="exsl str">
+
+    <xsl:output method="xml" encoding="UTF-8"/>
+
+    <xsl:template match="/">
+        <record>
+            <xsl:apply-templates select="//InstitutionalAuthor/InstitutionalAuthorName/text()" mode="field">
+                <xsl:with-param name="name" select="'collaborations'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//IssueIDStart/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_issue'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//VolumeIDStart/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_volume'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//Article/@ID" mode="field">
+                <xsl:with-param name="name" select="'journal_artid'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//ArticleFirstPage/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_fpage'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//ArticleLastPage/text()" mode="field">
+                <xsl:with-param name="name" select="'journal_lpage'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//ArticleCopyright/CopyrightHolderName/text()" mode="field">
+                <xsl:with-param name="name" select="'copyright_holder'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//ArticleCopyright/CopyrightYear/text()" mode="field">
+                <xsl:with-param name="name" select="'copyright_year'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//ArticleCopyright/copyright-statement/text()" mode="field">
+                <xsl:with-param name="name" select="'copyright_statement'"/>
+            </xsl:apply-templates>
+            <xsl:apply-templates select="//Author" mode="author"/>
+        </record>
+    </xsl:template>
+
+    <xsl:template match="node() | @*" mode="field">
+        <xsl:param name="name"/>
+        <field name="{$name}"><xsl:value-of select="."/></field>
+    </xsl:template>
+
+    <xsl:template match="Author" mode="author">
+        <xsl:variable name="root" select="/"/>
+        <xsl:variable name="affiliations">
+            <xsl:for-each select="str:tokenize(@AffiliationIDS, ' &#9;&#10;&#13;')">
+                <xsl:variable name="id" select="string(.)"/>
+                <xsl:call-template name="affiliation">
+                    <xsl:with-param name="all" select="$root//Affiliation[@ID = $id]"/>
+                </xsl:call-template>
+            </xsl:for-each>
+        </xsl:variable>
+
+        <field name="authors">
+            <surname><xsl:value-of select="(AuthorName/FamilyName/text())[1]"/></surname>
+            <given_names><xsl:value-of select="(AuthorName/GivenName/text())[1]"/></given_names>
+            <xsl:if test="string((Contact/Email/text())[1])">
+                <email><xsl:value-of select="(Contact/Email/text())[1]"/></email>
+            </xsl:if>
+            <affiliations type="list">
+                <!-- The same affiliation is only given once. -->
+                <xsl:for-each select="exsl:node-set($affiliations)/item">
+                    <xsl:variable name="item" select="."/>
+                    <xsl:if test="not(preceding-sibling::item[
+                            string(value) = string($item/value)
+                            and string(organization) = string($item/organization)
+                            and string(organization/@null) = string($item/organization/@null)
+                            and string(country) = string($item/country)
+                            and string(country/@null) = string($item/country/@null)])">
+                        <xsl:copy-of select="."/>
+                    </xsl:if>
+                </xsl:for-each>
+            </affiliations>
+        </field>
+    </xsl:template>
+
+    <!-- All the affiliations with the same ID are read as one. -->
+    <xsl:template name="affiliation">
+        <xsl:param name="all"/>
+        <xsl:variable name="parts">
+            <part><xsl:value-of select="($all/OrgDivision/text())[1]"/></part>
+            <part><xsl:value-of select="($all/OrgName/text())[1]"/></part>
+            <part><xsl:value-of select="($all/OrgAddress/Street/text())[1]"/></part>
+            <part><xsl:value-of select="($all/OrgAddress/City/text())[1]"/></part>
+            <part><xsl:value-of select="($all/OrgAddress/State/text())[1]"/></part>
+            <part><xsl:value-of select="($all/OrgAddress/Postcode/text())[1]"/></part>
+            <part><xsl:value-of select="($all/OrgAddress/Country/text())[1]"/></part>
+        </xsl:variable>
+        <item>
+            <value>
+                <xsl:for-each select="exsl:node-set($parts)/part[string(.)]">
+                    <xsl:if test="position() != 1">, </xsl:if>
+                    <xsl:value-of select="."/>
+                </xsl:for-each>
+            </value>
+            <xsl:call-template name="optional">
+                <xsl:with-param name="name" select="'organization'"/>
+                <xsl:with-param name="nodes" select="$all/OrgName/text()"/>
+            </xsl:call-template>
+            <xsl:call-template name="optional">
+                <xsl:with-param name="name" select="'country'"/>
+                <xsl:with-param name="nodes" select="$all/OrgAddress/Country/text()"/>
+            </xsl:call-template>
+        </item>
+    </xsl:template>
+
+    <xsl:template name="optional">
+        <xsl:param name="name"/>
+        <xsl:param name="nodes"/>
+        <xsl:element name="{$name}">
+            <xsl:choose>
+                <xsl:when test="$nodes"><xsl:value-of select="$nodes[1]"/></xsl:when>
+                <xsl:otherwise><xsl:attribute name="null">true</xsl:attribute></xsl:otherwise>
+            </xsl:choose>
+        </xsl:element>
+    </xsl:template>
+
+</xsl:stylesheet>
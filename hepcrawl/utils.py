@@ -6,7 +6,10 @@
 # hepcrawl is a free software; you can redistribute it and/or modify it
 # under the terms of the Revised BSD License; see LICENSE file for
 # more details.
+import codecs
 import ftplib
+import io
+import json
 import os
 import re
 from operator import itemgetter
@@ -19,15 +22,136 @@ import pysftp
 
 import ftputil
 import requests
+import six
 from ftputil import session
+from lxml import etree, html
 
 from scrapy import Selector
+from scrapy.utils.python import re_rsearch
 
-from .mappings import LICENSES, LICENSE_TEXTS
+try:
+    from functools import lru_cache
+except ImportError:
+    from backports.functools_lru_cache import lru_cache
+
+from .mappings import JOURNAL_TITLES, LICENSES, LICENSE_TEXTS
 
 RE_FOR_THE = re.compile(r'\b(?:for|on behalf of|representing)\b', re.IGNORECASE)
 INST_PHRASES = ['for the development', ]
 
+# Distinct author names kept by the memoized name functions.
+NAME_CACHE_SIZE = 2 ** 14
+
+# Distinct affiliations kept by the memoized affiliation cleaning.
+AFFILIATION_CACHE_SIZE = 2 ** 12
+
+# Distinct raw dates kept by the memoized date formatting.
+DATE_CACHE_SIZE = 2 ** 12
+
+# Distinct raw journal titles kept by the memoized title normalization.
+JOURNAL_CACHE_SIZE = 2 ** 10
+
+# Distinct license urls and texts kept by the memoized license lookups.
+LICENSE_CACHE_SIZE = 2 ** 8
+
+# Functions decorated with `memoize`, see hepcrawl.extensions.MemoizeStats.
+MEMOIZED_FUNCTIONS = []
+
+
+# Local copies of the DTDs of the publisher files.
+XML_CATALOG = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'dtds',
+    'catalog.xml',
+)
+
+
+class CatalogResolver(etree.Resolver):
+    """Read the DTDs listed in an XML catalog from their local copies.
+
+    Only the ``public``, ``system`` and ``systemSuffix`` entries of the
+    catalog are supported. The DTDs are read once, when the resolver is
+    created. Any other DTD or external entity resolves to nothing.
+    """
+
+    def __init__(self, catalog=XML_CATALOG):
+        super(CatalogResolver, self).__init__()
+        self.public_ids = {}
+        self.system_ids = {}
+        self.system_suffixes = []
+        self.dtds = {}
+
+        directory = os.path.dirname(catalog)
+        with open(catalog, 'rb') as catalog_file:
+            root = etree.parse(catalog_file).getroot()
+        for entry in root.iterchildren(etree.Element):
+            local_name = etree.QName(entry).localname
+            path = os.path.join(directory, entry.get('uri', ''))
+            if local_name == 'public':
+                self.public_ids[entry.get('publicId')] = path
+            elif local_name == 'system':
+                self.system_ids[entry.get('systemId')] = path
+            elif local_name == 'systemSuffix':
+                self.system_suffixes.append((entry.get('systemIdSuffix'), path))
+            else:
+                continue
+            if path not in self.dtds:
+                with open(path, 'rb') as dtd_file:
+                    self.dtds[path] = dtd_file.read()
+
+    def local_path(self, url, pubid):
+        """Return the path of the local copy of a DTD or None."""
+        if pubid in self.public_ids:
+            return self.public_ids[pubid]
+        if url in self.system_ids:
+            return self.system_ids[url]
+        for suffix, path in self.system_suffixes:
+            if url and url.endswith(suffix):
+                return path
+        return None
+
+    def resolve(self, url, pubid, context):
+        path = self.local_path(url, pubid)
+        if path is None:
+            return self.resolve_string('', context)
+        return self.resolve_string(self.dtds[path], context, base_url=path)
+
+
+CATALOG_RESOLVER = CatalogResolver()
+
+
+def _xml_parser(**kwargs):
+    parser = etree.XMLParser(
+        recover=True,
+        huge_tree=True,
+        no_network=True,
+        **kwargs
+    )
+    parser.resolvers.add(CATALOG_RESOLVER)
+    return parser
+
+
+# Shared parsers for the publisher files. Entities declared in the document
+# or in the DTDs of the catalog are expanded, but nothing else outside of the
+# document is ever read. The DTDs are only loaded for the documents using
+# other entities than the predefined ones. lxml parsers must not be used by
+# two threads at once; the spiders only parse in the reactor thread.
+XML_PARSER = _xml_parser()
+_UTF8_XML_PARSER = _xml_parser(encoding='utf-8')
+XML_DTD_PARSER = _xml_parser(load_dtd=True)
+_UTF8_XML_DTD_PARSER = _xml_parser(load_dtd=True, encoding='utf-8')
+_ENTITY_REFERENCE = re.compile(br'&(?!(?:amp|lt|gt|quot|apos);)[A-Za-z_:]')
+
+# Bytes of an XML file read at a time when looking for entity references.
+ENTITY_SCAN_SIZE = 2 ** 16
+
+HTML_PARSER = html.HTMLParser(
+    recover=True,
+    huge_tree=True,
+    no_network=True,
+    encoding='utf-8',
+)
+
 ftp_session_factory = session.session_factory(
     base_class=ftplib.FTP,
     port=21,
@@ -113,6 +237,20 @@ def ftp_list_folders(server_folder, server, user, password):
         return ftp_list_folders_with_host(server_folder, host)
 
 
+def memoize(maxsize):
+    """Cache the results of a function of hashable arguments in an LRU cache.
+
+    Arguments of different types are cached separately, so ``str`` and
+    ``unicode`` results are not mixed up. The hits and misses are in
+    ``function.cache_info()``.
+    """
+    def decorator(function):
+        memoized = lru_cache(maxsize=maxsize, typed=True)(function)
+        MEMOIZED_FUNCTIONS.append(memoized)
+        return memoized
+    return decorator
+
+
 def get_first(iterable, default=None):
     """Get first item in iterable or default."""
     if iterable:
@@ -121,6 +259,7 @@ def get_first(iterable, default=None):
     return default
 
 
+@memoize(NAME_CACHE_SIZE)
 def collapse_initials(name):
     """Remove the space between initials, eg T. A. --> T.A."""
     if len(name.split(".")) > 1:
@@ -128,6 +267,7 @@ def collapse_initials(name):
     return name
 
 
+@memoize(NAME_CACHE_SIZE)
 def split_fullname(author, switch_name_order=False):
     """Split an author name to surname and given names.
 
@@ -197,6 +337,108 @@ def build_dict(seq, key):
     return dict((d[key], dict(d, index=i)) for (i, d) in enumerate(seq))
 
 
+class _JsonStream(object):
+    """Text of a JSON document decoded from a byte stream as it is read."""
+
+    def __init__(self, stream, encoding, chunk_size):
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.chunk_size = chunk_size
+        self.text = u''
+        self.done = False
+
+    def read_more(self):
+        """Decode the next chunk, return whether there was any."""
+        while not self.done:
+            chunk = self.stream.read(self.chunk_size)
+            self.done = not chunk
+            text = self.decoder.decode(chunk, final=self.done)
+            if text:
+                self.text += text
+                return True
+        return False
+
+    def consume(self, idx):
+        """Drop the text before ``idx``, return the new position of ``idx``."""
+        if idx >= self.chunk_size:
+            self.text = self.text[idx:]
+            return 0
+        return idx
+
+
+def iter_json_array(source, key, encoding='utf-8', chunk_size=2 ** 16):
+    """Yield the elements of the array stored under `key` one at a time.
+
+    `source` is the JSON document as bytes, text or a binary file object.
+    It is decoded by chunks of `chunk_size` bytes and only the top-level
+    object is scanned: values of other keys are decoded and dropped, and
+    every element of the `key` array is decoded on its own, so neither the
+    whole text nor the whole parsed tree is ever held in memory.
+    """
+    if isinstance(source, six.text_type):
+        source, encoding = source.encode('utf-8'), 'utf-8'
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    stream = _JsonStream(source, encoding, chunk_size)
+    decoder = json.JSONDecoder()
+    skip = json.decoder.WHITESPACE.match
+
+    def next_char(idx):
+        idx = skip(stream.text, idx).end()
+        while idx >= len(stream.text):
+            if not stream.read_more():
+                raise ValueError('Unexpected end of JSON document')
+            idx = skip(stream.text, idx).end()
+        return stream.text[idx], idx
+
+    def decode(idx):
+        # a value at the end of the text can be cut, e.g. a number
+        while True:
+            try:
+                value, end = decoder.raw_decode(stream.text, idx)
+            except ValueError:
+                if not stream.read_more():
+                    raise
+                continue
+            if end < len(stream.text) or not stream.read_more():
+                return value, end
+
+    def expect(char, idx, separator, closing):
+        if char == separator:
+            char, idx = next_char(idx + 1)
+            if char == closing:
+                raise ValueError('Unexpected "%s" at position %d' % (closing, idx))
+            return char, idx
+        if char != closing:
+            raise ValueError('Expected "%s" or "%s" at position %d' % (separator, closing, idx))
+        return char, idx
+
+    char, idx = next_char(0)
+    if char != '{':
+        raise ValueError('Expected a JSON object at position %d' % idx)
+    char, idx = next_char(idx + 1)
+    while char != '}':
+        name, idx = decode(idx)
+        char, idx = next_char(idx)
+        if char != ':':
+            raise ValueError('Expected ":" at position %d' % idx)
+        char, idx = next_char(idx + 1)
+
+        if name == key and char == '[':
+            char, idx = next_char(idx + 1)
+            while char != ']':
+                element, idx = decode(stream.consume(idx))
+                yield element
+                char, idx = next_char(idx)
+                char, idx = expect(char, idx, ',', ']')
+            idx += 1
+        else:
+            _, idx = decode(stream.consume(idx))
+
+        char, idx = next_char(idx)
+        char, idx = expect(char, idx, ',', '}')
+
+
 def get_mime_type(url):
     """Get mime type from url."""
     if not url:
@@ -236,9 +478,163 @@ def range_as_string(data):
     return ", ".join(ranges)
 
 
+def _root(root, parser):
+    if root is None:
+        # like parsel, an empty or broken document is an empty one
+        return etree.fromstring(b'<html/>', parser)
+    return root
+
+
+def _fromstring(text, parser):
+    if not text or text.isspace():
+        return _root(None, parser)
+    return _root(etree.fromstring(text, parser), parser)
+
+
+def parse_xml(text):
+    """Return the root element of the XML document in `text`.
+
+    Bytes are decoded as the document declares, text is read as UTF-8.
+    """
+    if isinstance(text, six.text_type):
+        text = text.encode('utf-8')
+        if _ENTITY_REFERENCE.search(text):
+            return _fromstring(text, _UTF8_XML_DTD_PARSER)
+        return _fromstring(text, _UTF8_XML_PARSER)
+    if _ENTITY_REFERENCE.search(text):
+        return _fromstring(text, XML_DTD_PARSER)
+    return _fromstring(text, XML_PARSER)
+
+
+def _parse_file(source, parser):
+    if not hasattr(source, 'read'):
+        # libxml2 would ask the resolvers for the file itself
+        with open(source, 'rb') as source_file:
+            return _parse_file(source_file, parser)
+    return _root(etree.parse(source, parser).getroot(), parser)
+
+
+def _references_entities(source_file):
+    """If the XML file refers to other entities than the predefined ones.
+
+    The file is read by chunks, then put back where it was.
+    """
+    start = source_file.tell()
+    tail = b''
+    try:
+        while True:
+            chunk = source_file.read(ENTITY_SCAN_SIZE)
+            text = tail + chunk
+            match = _ENTITY_REFERENCE.search(text)
+            # a match in the last bytes could be cut, e.g. "&am" of "&amp;"
+            if match and (not chunk or match.start() + 6 < len(text)):
+                return True
+            if not chunk:
+                return False
+            tail = text[-6:]
+    finally:
+        source_file.seek(start)
+
+
+def parse_xml_file(source):
+    """Return the root element of the XML file path or file object `source`.
+
+    The file is parsed as it is read, with the DTD parser only if it refers
+    to other entities than the predefined ones.
+    """
+    if not hasattr(source, 'read'):
+        with open(source, 'rb') as source_file:
+            return parse_xml_file(source_file)
+    try:
+        references_entities = _references_entities(source)
+    except (AttributeError, IOError):
+        # not seekable
+        return parse_xml(source.read())
+    parser = XML_DTD_PARSER if references_entities else XML_PARSER
+    try:
+        return _parse_file(source, parser)
+    except etree.XMLSyntaxError:
+        return _root(None, parser)
+
+
+def parse_html(text):
+    """Return the root element of the UTF-8 (or text) HTML document `text`."""
+    if isinstance(text, six.text_type):
+        text = text.encode('utf-8')
+    return _fromstring(text, HTML_PARSER)
+
+
+def parse_html_file(source):
+    """Return the root element of the UTF-8 HTML file path or file object `source`."""
+    return _parse_file(source, HTML_PARSER)
+
+
+def xml_selector(text):
+    """Get a scrapy selector for an XML string."""
+    return Selector(root=parse_xml(text), type='xml')
+
+
+def xml_file_selector(source):
+    """Get a scrapy selector for an XML file path or file object."""
+    return Selector(root=parse_xml_file(source), type='xml')
+
+
+def html_selector(text):
+    """Get a scrapy selector for an HTML string."""
+    return Selector(root=parse_html(text), type='html')
+
+
+def html_file_selector(source):
+    """Get a scrapy selector for an HTML file path or file object."""
+    return Selector(root=parse_html_file(source), type='html')
+
+
+def response_selector(response, type='xml'):
+    """Get a scrapy selector for the body of `response`.
+
+    XML is parsed as it was received. HTML is only decoded by scrapy if it is
+    not in UTF-8.
+    """
+    if type == 'xml':
+        return xml_selector(response.body)
+    if codecs.lookup(response.encoding).name == 'utf-8':
+        return html_selector(response.body)
+    return html_selector(response.text)
+
+
+def xmliter(text, nodename):
+    """Return a iterator of Selector's over all nodes of a XML document,
+       given the name of the node to iterate. Useful for parsing XML feeds.
+
+    `text` is best given as the bytes of the document, which are parsed
+    without decoding them first. Every node is parsed along with the part of
+    the document before the first and after the last node, so it keeps the
+    namespace declarations.
+    """
+
+    nodename_patt = re.escape(nodename)
+
+    HEADER_START_RE = re.compile(r'^(.*?)<\s*%s(?:\s|>)' % nodename_patt, re.S)
+    HEADER_END_RE = re.compile(r'<\s*/%s\s*>' % nodename_patt, re.S)
+
+    header_start = re.search(HEADER_START_RE, text)
+    header_start = header_start.group(1).strip() if header_start else text[:0]
+    header_end = re_rsearch(HEADER_END_RE, text)
+    header_end = text[header_end[1]:].strip() if header_end else text[:0]
+
+    r = re.compile(r'<%(np)s[\s>].*?</%(np)s>' % {'np': nodename_patt}, re.DOTALL)
+    for match in r.finditer(text):
+        nodetext = header_start + match.group() + header_end
+        tmp = xml_selector(nodetext)
+        l = tmp.xpath('//*[local-name()=$nodename]', nodename=nodename)
+
+        if l:
+            yield l[0]
+
+
 def get_node(text, namespaces=None):
     """Get a scrapy selector for the given text node."""
-    node = Selector(text=text, type="xml")
+    node = xml_selector(text)
     if namespaces:
         for ns in namespaces:
             node.register_namespace(ns[0], ns[1])
@@ -287,6 +683,33 @@ def get_journal_and_section(publication):
     return journal_title, section
 
 
+def journal_title_key(title):
+    """Return the title in lower case without punctuation and leading "the"."""
+    words = re.sub(r'[^\w\s]', ' ', title.lower(), flags=re.UNICODE).split()
+    if words and words[0] == 'the':
+        words = words[1:]
+    return ' '.join(words)
+
+
+JOURNAL_TITLE_KEYS = dict(
+    (journal_title_key(name), title)
+    for title, names in JOURNAL_TITLES.items()
+    for name in [title] + names
+)
+
+
+@memoize(JOURNAL_CACHE_SIZE)
+def normalize_journal_title(title):
+    """Return the title of the journal as used in the records.
+
+    Titles which are not in ``mappings.JOURNAL_TITLES`` are returned as they
+    are.
+    """
+    if not isinstance(title, six.string_types):
+        return title
+    return JOURNAL_TITLE_KEYS.get(journal_title_key(title), title)
+
+
 def get_license(license_url='', license_text=''):
     """Get the license dictionary from the url or the text of the license.
 
@@ -309,30 +732,61 @@ def get_license(license_url='', license_text=''):
     return license
 
 
+# Patterns replacing everything up to the license path of the urls in
+# ``mappings.LICENSES`` with the license name.
+LICENSE_URL_PATTERNS = [
+    (key, re.compile('(?i)^.*%s' % key), name)
+    for key, name in LICENSES.items()
+]
+LICENSE_VERSION = re.compile(r"[0-9]+\.[0-9]")
+
+LICENSE_TEXT_URLS = [
+    (text.lower(), url)
+    for text, url in LICENSE_TEXTS.items()
+]
+
+
+@memoize(LICENSE_CACHE_SIZE)
+def license_name(license_url):
+    """Return the license name of a license url, e.g. 'CC-BY-4.0'.
+
+    Anything after the version in the url is left out. The name is empty if
+    the url is not one of ``mappings.LICENSES``.
+    """
+    lower_url = license_url.lower()
+    for key, pattern, name in LICENSE_URL_PATTERNS:
+        if key in lower_url:
+            license_str = pattern.sub(name, license_url.strip('/'))
+            version = LICENSE_VERSION.match(license_str, len(name))
+            if version:
+                return name + version.group(0)
+            return license_str
+    return ''
+
+
+@memoize(LICENSE_CACHE_SIZE)
+def license_text_url(license_text):
+    """Return the url of the last of ``mappings.LICENSE_TEXTS`` containing the text."""
+    license_text = license_text.lower()
+    url = None
+    for text, text_url in LICENSE_TEXT_URLS:
+        if license_text in text:
+            url = text_url
+    return url
+
+
 def get_license_by_url(license_url):
     if not license_url:
         return []
 
-    license_str = ''
-    for key in LICENSES.keys():
-        if key in license_url.lower():
-            license_str = re.sub(
-                '(?i)^.*%s' % key,
-                LICENSES[key],
-                license_url.strip('/'),
-            )
-            break
-    return [{'license': license_str, 'url': license_url}]
+    return [{'license': license_name(license_url), 'url': license_url}]
 
 
 def get_license_by_text(license_text):
     if not license_text:
         return []
 
-    for key in LICENSE_TEXTS.keys():
-        if license_text.lower() in key.lower():
-            license = get_license_by_url(license_url=LICENSE_TEXTS[key])
-
-    return license
-
-LICENSE_PATTERN = re.compile(r"[0-9]+\.[0-9]")
+    url = license_text_url(license_text)
+    if url is None:
+        return []
+    return get_license_by_url(license_url=url)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Validation of the converted records against the INSPIRE schemas."""
+
+from __future__ import absolute_import, print_function
+
+import six
+from jsonschema import Draft4Validator, RefResolver, draft4_format_checker
+
+from .authors import expand_authors
+
+MATERIALS = {
+    'article': 'publication',
+    'addendum': 'addendum',
+    'corrigendum': 'erratum',
+    'erratum': 'erratum',
+    'editorial': 'editorial note',
+}
+"""INSPIRE ``material`` of the document types of the records."""
+
+_EMPTY = ('', [], {}, None)
+
+
+def _preload_refs(resolver, schema, seen):
+    """Resolve every ``$ref`` of ``schema``, so the resolver has them stored."""
+    if isinstance(schema, dict):
+        ref = schema.get('$ref')
+        if isinstance(ref, six.string_types):
+            url, resolved = resolver.resolve(ref)
+            if url not in seen:
+                seen.add(url)
+                with resolver.in_scope(url):
+                    _preload_refs(resolver, resolved, seen)
+        for value in schema.values():
+            _preload_refs(resolver, value, seen)
+    elif isinstance(schema, list):
+        for value in schema:
+            _preload_refs(resolver, value, seen)
+
+
+def _without_empty(value):
+    """Return `value` without its empty strings, lists and dicts."""
+    if isinstance(value, dict):
+        value = dict((key, _without_empty(item)) for key, item in value.items())
+        return dict((key, item) for key, item in value.items() if item not in _EMPTY)
+    if isinstance(value, list):
+        value = [_without_empty(item) for item in value]
+        return [item for item in value if item not in _EMPTY]
+    return value
+
+
+def _year(year):
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return None
+
+
+def _author(author):
+    """Return an author of a record as INSPIRE stores it."""
+    orcid = author.get('orcid') or ''
+    # e.g. ORCID:0000-0002-1825-0097 or https://orcid.org/0000-0002-1825-0097
+    orcid = orcid.replace(':', '/').rsplit('/', 1)[-1]
+    return {
+        'full_name': author.get('full_name'),
+        'raw_affiliations': [
+            {'value': affiliation.get('value')}
+            for affiliation in author.get('affiliations') or []
+        ],
+        'emails': [author.get('email')],
+        'ids': [{'schema': 'ORCID', 'value': orcid}] if orcid else [],
+    }
+
+
+def inspire_record(record):
+    """Return a converted record with its INSPIRE fields as INSPIRE stores them.
+
+    INSPIRE maps some fields of the harvested records itself: the authors
+    keep only their full name, affiliations, emails and ORCID, the
+    acquisition source gets the ``hepcrawl`` method and the harvest
+    ``datetime``, the years are integers, the document types are INSPIRE
+    materials and the values which were not found, e.g. empty strings, are
+    left out. The record itself is not changed.
+    """
+    record = dict(record)
+    if record.get('acquisition_source'):
+        acquisition_source = dict(record['acquisition_source'])
+        acquisition_source['method'] = 'hepcrawl'
+        acquisition_source['datetime'] = acquisition_source.pop('date', None)
+        record['acquisition_source'] = acquisition_source
+    if record.get('authors'):
+        record['authors'] = [_author(author) for author in expand_authors(record['authors'])]
+    if record.get('copyright'):
+        record['copyright'] = [
+            dict(copyright, year=_year(copyright.get('year')),
+                 material=MATERIALS.get(copyright.get('material')))
+            for copyright in record['copyright']
+        ]
+    if record.get('publication_info'):
+        record['publication_info'] = [
+            dict(publication_info, year=_year(publication_info.get('year')),
+                 material=MATERIALS.get(publication_info.get('material')))
+            for publication_info in record['publication_info']
+        ]
+    return _without_empty(record)
+
+
+def error_path(error):
+    """JSON pointer of the invalid value of a validation error."""
+    return '/' + '/'.join(six.text_type(part) for part in error.absolute_path)
+
+
+class RecordValidator(object):
+    """Validator of the records against a JSON schema.
+
+    The schema is loaded once with all the schemas it refers to, by default
+    from ``inspire-schemas``; ``schema`` can be the name of an INSPIRE schema
+    or a schema dict. Unless ``strict``, the fields which are not in the
+    schema and the missing required fields are not errors: the records of
+    hepcrawl have more fields than the INSPIRE ones, and only their INSPIRE
+    fields are checked.
+    """
+
+    def __init__(self, schema='hep', strict=False):
+        if isinstance(schema, six.string_types):
+            from inspire_schemas.utils import (
+                LocalRefResolver,
+                inspire_format_checker,
+                load_schema,
+            )
+
+            schema = load_schema(schema)
+            resolver = LocalRefResolver.from_schema(schema)
+            format_checker = inspire_format_checker
+        else:
+            resolver = RefResolver.from_schema(schema)
+            format_checker = draft4_format_checker
+        _preload_refs(resolver, schema, set())
+        if not strict:
+            schema = dict(schema)
+            schema.pop('additionalProperties', None)
+            schema.pop('required', None)
+        self.validator = Draft4Validator(
+            schema,
+            resolver=resolver,
+            format_checker=format_checker,
+        )
+
+    def errors(self, record):
+        """Return the errors of the record as ``(path, message)`` pairs."""
+        return sorted(
+            (error_path(error), error.message)
+            for error in self.validator.iter_errors(record)
+        )
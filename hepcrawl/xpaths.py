@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Registry of the precompiled XPath expressions used by the extractors.
+
+Every expression is compiled once, at import time, into an
+:class:`lxml.etree.XPath` object. Values that change per call (ids, types)
+are passed as XPath variables instead of being formatted into the string.
+
+Expressions are written against the original documents: names are qualified
+with the namespace map of their publisher, so the trees never have to be
+rewritten with ``remove_namespaces()`` before querying them.
+"""
+
+from __future__ import absolute_import, print_function
+
+from copy import deepcopy
+
+from lxml import etree
+from scrapy.utils.python import flatten
+from scrapy.selector import SelectorList
+
+
+def select(node, xpath, **variables):
+    """Evaluate a compiled XPath on a selector.
+
+    Works like ``node.xpath(expression, **variables)`` and returns a
+    :class:`SelectorList`, but without compiling the expression again.
+    """
+    if isinstance(node, SelectorList):
+        return node.__class__(flatten(
+            [select(sub_node, xpath, **variables) for sub_node in node]
+        ))
+
+    if getattr(node.root, 'xpath', None) is None:
+        return node.selectorlist_cls([])
+
+    result = xpath(node.root, **variables)
+    if type(result) is not list:
+        result = [result]
+
+    return node.selectorlist_cls([
+        node.__class__(root=value, _expr=xpath.path,
+                       namespaces=node.namespaces, type=node.type)
+        for value in result
+    ])
+
+
+def extract_without_namespaces(nodes):
+    """Serialize selected nodes as if their document had no namespaces.
+
+    Gives the same markup as ``extract()`` after ``remove_namespaces()``, but
+    only a copy of each selected element is rewritten, never the document.
+    Text and attribute results, and HTML documents, which have no namespaces,
+    are returned unchanged.
+    """
+    values = []
+    for node in nodes:
+        if node.type == 'html' or not isinstance(node.root, etree._Element):
+            values.append(node.extract())
+            continue
+
+        root = deepcopy(node.root)
+        for element in root.iter('*'):
+            if element.tag.startswith('{'):
+                element.tag = element.tag.split('}', 1)[1]
+            for name in element.attrib.keys():
+                if name.startswith('{'):
+                    element.attrib[name.split('}', 1)[1]] = element.attrib.pop(name)
+        etree.cleanup_namespaces(root)
+        values.append(node.__class__(root=root, type=node.type).extract())
+
+    return values
+
+
+class XPathRegistry(object):
+    """Named collection of compiled XPath expressions.
+
+    Names are namespaced by publisher, e.g. ``jats.doi`` or
+    ``elsevier.affiliation_by_id``.
+    """
+
+    def __init__(self):
+        self._xpaths = {}
+
+    def register(self, name, expression, namespaces=None):
+        """Compile an expression and store it under the given name."""
+        self._xpaths[name] = etree.XPath(
+            expression, namespaces=namespaces, smart_strings=False)
+
+    def update(self, prefix, expressions, namespaces=None):
+        """Register a dictionary of expressions under a common prefix.
+
+        `namespaces` maps the prefixes used in the expressions to URIs.
+        """
+        for name, expression in expressions.items():
+            self.register('{0}.{1}'.format(prefix, name), expression,
+                          namespaces=namespaces)
+
+    def __getitem__(self, name):
+        return self._xpaths[name]
+
+    def __contains__(self, name):
+        return name in self._xpaths
+
+    def select(self, node, name, **variables):
+        """Evaluate the expression registered as `name` on a selector."""
+        return select(node, self._xpaths[name], **variables)
+
+
+XLINK_NAMESPACE = 'http://www.w3.org/1999/xlink'
+
+JATS_NAMESPACES = {
+    'xlink': XLINK_NAMESPACE,
+}
+
+ELSEVIER_NAMESPACES = {
+    'ja': 'http://www.elsevier.com/xml/ja/dtd',
+    'ce': 'http://www.elsevier.com/xml/common/dtd',
+    'sa': 'http://www.elsevier.com/xml/common/struct-aff/dtd',
+}
+
+XPATHS = XPathRegistry()
+
+XPATHS.update('jats', {
+    'doi': "//article-id[@pub-id-type='doi']/text()",
+    'related_article_doi': "//related-article[@ext-link-type='doi']/@xlink:href",
+    'page_count': "//counts/page-count/@count",
+    'subtitle': "//subtitle/text()",
+    'collaborations': "//contrib/collab/text()",
+    'journal_title': "//abbrev-journal-title/text()|//journal-title/text()",
+    'journal_issue': "//issue/text()",
+    'journal_volume': "//volume/text()",
+    'journal_artid': "//elocation-id/text()",
+    'copyright_holder': "//copyright-holder/text()",
+    'copyright_year': "//copyright-year/text()",
+    'copyright_statement': "//copyright-statement/text()",
+    'date': ".//date[@date-type=$type]",
+    'date_day': ".//date[@date-type=$type]/day/text()",
+    'date_month': ".//date[@date-type=$type]/month/text()",
+    'date_year': ".//date[@date-type=$type]/year/text()",
+    'pub_date_by_type': ".//pub-date[@pub-type=$type]",
+    'pub_date_by_type_day': ".//pub-date[@pub-type=$type]/day/text()",
+    'pub_date_by_type_month': ".//pub-date[@pub-type=$type]/month/text()",
+    'pub_date_by_type_year': ".//pub-date[@pub-type=$type]/year/text()",
+    'pub_date': ".//pub-date",
+    'pub_date_day': ".//pub-date/day/text()",
+    'pub_date_month': ".//pub-date/month/text()",
+    'pub_date_year': ".//pub-date/year/text()",
+    'keyword_groups': ".//kwd-group",
+    'keyword_group_type': "@kwd-group-type",
+    'keyword_texts': "kwd/text()",
+    'keywords': "kwd",
+    'authors': ".//contrib[@contrib-type='author']",
+    'author_surname': "name/surname/text()",
+    'author_given_names': "name/given-names/text()",
+    'author_email': "email/text()",
+    'author_affiliations': "aff",
+    'author_affiliation_ids': "xref[@ref-type='aff']/@rid",
+    'affiliation_by_id': ".//aff[@id=$id]",
+}, namespaces=JATS_NAMESPACES)
+
+XPATHS.update('iop', {
+    'article_type': "//@article-type",
+    'abstract_nodes': "//abstract/p/child::node()",
+    'title': "//title-group/article-title/text()",
+    'arxiv_eprints': "//custom-meta-group/custom-meta/meta-value/text()",
+    'license_urls': "//permissions/license/@xlink:href",
+}, namespaces=JATS_NAMESPACES)
+
+XPATHS.update('oup', {
+    'article_type': "./@article-type",
+    'abstract': "//abstract[1]",
+    'title': "//article-title/text()",
+    'arxiv_eprints': "//article-id[@pub-id-type='arxiv']/text()",
+    'license_url': "//license/license-p/ext-link/text()",
+})
+
+XPATHS.update('elsevier', {
+    'article_type': "./@docsubtype",
+    'doi': "./ja:item-info/ce:doi/text()",
+    'related_article_doi': "//*[local-name()='related-article'][@ext-link-type='doi']/@*[local-name()='href']",
+    'abstract': "./*[self::ja:head | self::ja:simple-head]/ce:abstract[1]/ce:abstract-sec",
+    'title': "./*[self::ja:head | self::ja:simple-head]/ce:title/text()",
+    'subtitle': "./*[self::ja:head | self::ja:simple-head]/ce:subtitle/text()",
+    'collaborations': "./*[self::ja:head | self::ja:simple-head]/ce:author-group/ce:collaboration/ce:text/text()",
+    'journal_artid': "//ja:item-info/ja:aid/text()",
+    'copyright': "./ja:item-info/ce:copyright/text()",
+    'copyright_year': "./ja:item-info/ce:copyright/@year",
+    'author_groups': "//ce:author-group",
+    'authors': "./ce:author",
+    'author_surname': "./ce:surname/text()",
+    'author_given_name': "./ce:given-name/text()",
+    'author_email': "./ce:e-address/text()",
+    'author_orcid': "./@orcid",
+    'author_id': "./@author-id",
+    'author_refids': ".//@refid",
+    'affiliation_by_id': "//ce:affiliation[@id=$id]",
+    'nested_affiliations': ".//sa:affiliation",
+    'affiliation_parts': ".//*[self::sa:organization or self::sa:city or self::sa:country or self::sa:address-line]/text()",
+    'affiliation_text': "./ce:textfn/text()",
+    'group_affiliations': ".//ce:affiliation[not(@*)]/ce:textfn/text()",
+    'all_group_affiliations': ".//ce:affiliation/ce:textfn/text()",
+}, namespaces=ELSEVIER_NAMESPACES)
+
+XPATHS.update('springer', {
+    'article_type': "//Article/ArticleInfo/@ArticleType",
+    'doi': "//ArticleDOI/text()",
+    'first_page': "//ArticleFirstPage/text()",
+    'last_page': "//ArticleLastPage/text()",
+    'abstract': "//Article/ArticleHeader/Abstract/Para",
+    'title': "//ArticleTitle",
+    'collaborations': "//InstitutionalAuthor/InstitutionalAuthorName/text()",
+    'journal_title': "//JournalTitle/text()",
+    'journal_issue': "//IssueIDStart/text()",
+    'journal_volume': "//VolumeIDStart/text()",
+    'journal_artid': "//Article/@ID",
+    'online_year': "//ArticleInfo/*/OnlineDate/Year/text()",
+    'online_month': "//ArticleInfo/*/OnlineDate/Month/text()",
+    'online_day': "//ArticleInfo/*/OnlineDate/Day/text()",
+    'copyright_holder': "//ArticleCopyright/CopyrightHolderName/text()",
+    'copyright_year': "//ArticleCopyright/CopyrightYear/text()",
+    'copyright_statement': "//ArticleCopyright/copyright-statement/text()",
+    'license_type': "//License/@SubType",
+    'license_version': "//License/@Version",
+    'org_division': "./OrgDivision/text()",
+    'org_name': "./OrgName/text()",
+    'org_street': "./OrgAddress/Street/text()",
+    'org_city': "./OrgAddress/City/text()",
+    'org_state': "./OrgAddress/State/text()",
+    'org_postcode': "./OrgAddress/Postcode/text()",
+    'org_country': "./OrgAddress/Country/text()",
+    'affiliation_ids': "@AffiliationIDS",
+    'affiliation_by_id': "//Affiliation[@ID=$id]",
+    'authors': "//Author",
+    'author_family_name': "./AuthorName/FamilyName/text()",
+    'author_given_name': "./AuthorName/GivenName/text()",
+    'author_email': "./Contact/Email/text()",
+    'arxiv_eprints': "//ArticleExternalID[@Type='arXiv']/text()",
+})
+
+# MARCXML feeds do not agree on the namespace of the fields: they come in the
+# MARC namespace, in the namespace of the enclosing OAI-PMH response or in no
+# namespace at all, so fields are matched on their local name.
+XPATHS.update('marc', {
+    'doi': "./*[local-name()='datafield'][@tag='024'][*[local-name()='subfield'][@code='2'][contains(text(), 'DOI')]]/*[local-name()='subfield'][@code='a']/text()",
+    'abstract': "./*[local-name()='datafield'][@tag='520']/*[local-name()='subfield'][@code='a']",
+    'title': "./*[local-name()='datafield'][@tag='245']/*[local-name()='subfield'][@code='a']/text()",
+    'date_published': "./*[local-name()='datafield'][@tag='260']/*[local-name()='subfield'][@code='c']/text()",
+    'source': "./*[local-name()='datafield'][@tag='260']/*[local-name()='subfield'][@code='b']/text()",
+    'page_nr': "./*[local-name()='datafield'][@tag='300']/*[local-name()='subfield'][@code='a']/text()",
+    'journal_title': "./*[local-name()='datafield'][@tag='773']/*[local-name()='subfield'][@code='p']/text()",
+    'journal_volume': "./*[local-name()='datafield'][@tag='773']/*[local-name()='subfield'][@code='a']/text()",
+    'journal_year': "./*[local-name()='datafield'][@tag='773']/*[local-name()='subfield'][@code='y']/text()",
+    'journal_issue': "./*[local-name()='datafield'][@tag='773']/*[local-name()='subfield'][@code='n']/text()",
+    'journal_pages': "./*[local-name()='datafield'][@tag='773']/*[local-name()='subfield'][@code='c']/text()",
+    'copyright': "./*[local-name()='datafield'][@tag='542']/*[local-name()='subfield'][@code='f']/text()",
+    'license_url': "./*[local-name()='datafield'][@tag='540']/*[local-name()='subfield'][@code='u']/text()",
+    'license_text': "./*[local-name()='datafield'][@tag='540']/*[local-name()='subfield'][@code='a']/text()",
+    'first_authors': "./*[local-name()='datafield'][@tag='100']",
+    'other_authors': "./*[local-name()='datafield'][@tag='700']",
+    'author_name': "./*[local-name()='subfield'][@code='a']/text()",
+    'author_orcid': "./*[local-name()='subfield'][@code='j']/text()",
+    'author_affiliations': "./*[local-name()='subfield'][@code='u']/text()",
+    'arxiv_fields': "./*[local-name()='datafield'][@tag='037'][*[local-name()='subfield'][@code='9'][contains(text(), 'arXiv')]]",
+    'arxiv_value': "./*[local-name()='subfield'][@code='a']/text()",
+})
+
+XPATHS.update('nlm', {
+    'authors': "./AuthorList//Author",
+    'author_last_name': "./LastName/text()",
+    'author_first_name': "./FirstName/text()",
+    'author_middle_name': "./MiddleName/text()",
+    'author_affiliations': ".//Affiliation/text()",
+    'doi': ".//ArticleIdList/ArticleId[@IdType='doi']/text()",
+    'elocation_doi': ".//ELocationID[@EIdType='doi']/text()",
+    'pub_year': ".//Journal/PubDate/Year/text()",
+    'pub_month': ".//Journal/PubDate/Month/text()",
+    'pub_day': ".//Journal/PubDate/Day/text()",
+    'pub_status': ".//Journal/PubDate/@PubStatus",
+    'publication_type': ".//PublicationType/text()",
+    'first_page': ".//FirstPage/text()",
+    'last_page': ".//LastPage/text()",
+})
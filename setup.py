@@ -69,7 +69,7 @@ setup(
     tests_require=tests_require,
     extras_require=extras_require,
     package_data={
-        'hepcrawl': ['*.cfg'],
+        'hepcrawl': ['*.cfg', 'stylesheets/*.xsl', 'dtds/*.dtd', 'dtds/*.xml'],
     },
     classifiers=[
         'Intended Audience :: Developers',
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import pickle
+from io import BytesIO
+
+import pytest
+from scrapy.exporters import JsonLinesItemExporter
+
+from hepcrawl.authors import AuthorTable, expand_authors
+from hepcrawl.extractors.hindawi_parser import HindawiParser
+from hepcrawl.items import HEPRecord
+from hepcrawl.loaders import AuthorCollector, HEPLoader
+from hepcrawl.outputs import CompactAuthors
+from hepcrawl.spiders import hindawi_spider
+
+from .responses import fake_response_from_file, get_node
+
+
+class CompactLoader(HEPLoader):
+    """HEPLoader keeping every author list in a table."""
+
+    authors_out = CompactAuthors(min_authors=1)
+
+
+@pytest.fixture
+def authors():
+    return [
+        {
+            'surname': 'Doe',
+            'given_names': 'J.',
+            'full_name': 'Doe, J.',
+            'orcid': 'ORCID:0000-0002-1825-0097',
+            'affiliations': [{'value': 'CERN'}, {'value': 'DESY'}],
+        },
+        {
+            'surname': 'Roe',
+            'full_name': 'Roe',
+            'email': 'roe@example.com',
+            'affiliations': [{'value': 'DESY'}],
+        },
+        {
+            'surname': 'Poe',
+            'full_name': 'Poe',
+        },
+    ]
+
+
+def test_author_table(authors):
+    """Test that the table gives back the authors it was built from."""
+    table = AuthorTable.from_authors(authors)
+
+    assert table == authors
+    assert len(table) == 3
+    assert table[1] == authors[1]
+    assert table[-1] == authors[2]
+    assert table[:2] == authors[:2]
+    assert table.affiliations == [{'value': 'CERN'}, {'value': 'DESY'}]
+    assert table.affiliation_ids == [[0, 1], [1], None]
+    assert expand_authors(table) == authors
+    assert type(expand_authors(table)) is list
+
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_author_table_copies(authors):
+    """Test that changing the authors given by the table keeps it as it is."""
+    table = AuthorTable.from_authors(authors)
+    table[0]['affiliations'][1]['value'] = 'Fermilab'
+
+    assert table == authors
+
+
+def test_author_table_unhashable():
+    """Test that authors which cannot be put in a table are kept as a list."""
+    authors = [{'surname': 'Doe', 'affiliations': [{'value': ['CERN']}]}]
+
+    assert AuthorTable.from_authors(authors) is authors
+
+
+def test_author_table_pickle(authors):
+    """Test that tables can be sent to other processes."""
+    table = pickle.loads(pickle.dumps(AuthorTable.from_authors(authors), 2))
+
+    assert table == authors
+    table.append({'surname': 'Moe', 'affiliations': [{'value': 'CERN'}]})
+    assert table.affiliation_ids[-1] == [0]
+
+
+def test_compact_authors(authors):
+    """Test that tables are only used from the given number of authors."""
+    assert CompactAuthors()(authors) is authors
+    assert CompactAuthors(min_authors=4)(authors) is authors
+    assert isinstance(CompactAuthors(min_authors=3)(authors), AuthorTable)
+
+
+def test_export(authors):
+    """Test that the table is expanded when the record is exported."""
+    record = CompactLoader(item=HEPRecord())
+    record.add_value('authors', authors)
+    item = record.load_item()
+    assert isinstance(item['authors'], AuthorTable)
+
+    output = BytesIO()
+    exporter = JsonLinesItemExporter(output)
+    exporter.export_item(item)
+
+    assert json.loads(output.getvalue().decode('utf-8'))['authors'] == authors
+
+
+def test_author_collector():
+    """Test that the authors are processed as they are collected."""
+    record = HEPLoader(item=HEPRecord(), min_authors=2)
+    authors = record.new_authors()
+    authors.append({'surname': 'Doe', 'given_names': 'J. R.'})
+    authors.append({'raw_name': 'Roe, Richard', 'affiliations': [{'value': 'CERN'}]})
+
+    assert isinstance(authors, AuthorCollector)
+    assert isinstance(authors.table, AuthorTable)
+    assert authors.table.columns['full_name'] == ['Doe, J.R.', 'Roe, Richard']
+
+    record.add_value('authors', authors)
+    item = record.load_item()
+    assert item['authors'] is authors.table
+
+
+def test_author_collector_few_authors():
+    """Test that records with fewer authors than the minimum get a list."""
+    record = HEPLoader(item=HEPRecord(), min_authors=3)
+    authors = record.new_authors()
+    authors.append({'surname': 'Doe', 'given_names': 'J.'})
+    record.add_value('authors', authors)
+
+    assert record.load_item()['authors'] == [
+        {'surname': 'Doe', 'given_names': 'J.', 'full_name': 'Doe, J.'},
+    ]
+    assert type(record.load_item()['authors']) is list
+    assert HEPLoader(item=HEPRecord()).new_authors() == []
+
+
+def test_parser_min_authors():
+    """Test that parsers gathering the authors in a table give the same records."""
+    spider = hindawi_spider.HindawiSpider()
+    response = fake_response_from_file('hindawi/test_1.xml')
+    node = get_node(spider, '//marc:record', response)[0]
+
+    expected = HindawiParser().parse_node(response, node)
+    record = HindawiParser(min_authors=1).parse_node(response, node)
+
+    assert isinstance(record['authors'], AuthorTable)
+    assert record == expected
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pytest
+import scrapy
+
+from hepcrawl.converter import InspireConverter, publication_date
+from hepcrawl.items import CompactHEPRecord, HEPRecord
+
+
+@pytest.mark.parametrize('date, expected', [
+    ('2018-07-04', '2018-07-04'),
+    ('2018-7-4', '2018-07-04'),
+    ('2018-07', '2018-07-01'),
+    ('2018', '2018-01-01'),
+    ('2018-07-04T12:00:00', '2018-07-04'),
+    (' 2018-07-04 ', '2018-07-04'),
+    ('2018-02-30', ''),
+    ('2018-07-04-01', ''),
+    ('July 2018', ''),
+])
+def test_publication_date(date, expected):
+    assert publication_date(date) == expected
+
+
+def _record(**fields):
+    record = {
+        'title': 'A title',
+        'abstract': 'An abstract',
+        'dois': [{'value': '10.1016/j.nuclphysb.2018.07.004'}],
+        'date_published': '2018',
+        'journal_title': 'Nuclear Physics B',
+        'journal_volume': '934',
+        'journal_year': '2018',
+        'copyright_holder': 'The Authors',
+    }
+    record.update(fields)
+    return record
+
+
+def test_convert():
+    """Test converting a record with a short date and a related DOI."""
+    converter = InspireConverter(submission_number='job')
+    record = converter.convert(
+        HEPRecord(_record(related_article_doi=[{'value': '10.1016/j.nuclphysb.2018.07.005'}])),
+        source='Elsevier',
+        now='2020-01-01T00:00:00',
+    )
+
+    assert dict(record) == {
+        'dois': [{'value': '10.1016/j.nuclphysb.2018.07.004'}, {'value': '10.1016/j.nuclphysb.2018.07.005'}],
+        'acquisition_source': {
+            'source': 'Elsevier',
+            'method': 'Elsevier',
+            'date': '2020-01-01T00:00:00',
+            'submission_number': 'job',
+        },
+        'record_creation_date': '2020-01-01T00:00:00',
+        'titles': [{'title': 'A title', 'subtitle': '', 'source': 'Elsevier'}],
+        'abstracts': [{'value': 'An abstract', 'source': 'Elsevier'}],
+        'imprints': [{'date': '2018-01-01', 'publisher': 'Elsevier'}],
+        'copyright': [{'holder': 'The Authors', 'year': '', 'statement': '', 'material': ''}],
+        'publication_info': [{
+            'journal_title': 'Nuclear Physics B',
+            'journal_volume': '934',
+            'year': 2018,
+            'journal_issue': '',
+            'artid': '',
+            'page_start': '',
+            'page_end': '',
+            'material': '',
+            'pubinfo_freetext': '',
+        }],
+    }
+
+
+def test_convert_many():
+    """Test that a batch is converted like single records, at one time."""
+    converter = InspireConverter(source='APS', submission_number='')
+    records = converter.convert_many([
+        _record(),
+        _record(source='Hindawi', publication_info=[{'journal_title': 'AHEP'}]),
+        _record(date_published='2018-13-01'),
+    ])
+
+    assert [record['acquisition_source']['source'] for record in records] == ['APS', 'Hindawi', 'APS']
+    assert len(set(record['acquisition_source']['date'] for record in records)) == 1
+    assert records[1]['publication_info'] == [{'journal_title': 'AHEP'}]
+    assert 'journal_title' not in records[1]
+    assert records[2]['imprints'][0]['date'] == ''
+    assert records[0] == converter.convert(_record(), now=records[0]['record_creation_date'])
+
+
+class TitleRecord(scrapy.Item):
+    title = scrapy.Field()
+
+
+@pytest.mark.parametrize('item_class', [HEPRecord, CompactHEPRecord, TitleRecord])
+def test_convert_items(item_class):
+    """Test that any mapping is converted to a dict and left as it is."""
+    converter = InspireConverter(source='APS', submission_number='')
+    fields = _record() if item_class is not TitleRecord else {'title': 'A title'}
+    item = item_class(fields)
+
+    converted = converter.convert(item, now='2020-01-01T00:00:00')
+
+    assert type(converted) is dict
+    assert dict(item) == fields
+    assert converted == converter.convert(dict(fields), now='2020-01-01T00:00:00')
@@ -96,3 +96,19 @@ def test_date_strftime():
     date_object = dateutils.date.today()
     result = date_object.strftime("%a, %d %b %Y %H:%M:%S +0000")
     assert expected == result
+
+
+def test_candidate_formats():
+    """Test that dates are only tried with the formats of their shape."""
+    assert dateutils.date_shape('1 May 1992') == '0 aaa 0000'
+    assert dateutils.candidate_formats('0000-00-00') >= {'%Y-%m-%d'}
+    assert '%d-%m-%Y' not in dateutils.candidate_formats('0000-00-00')
+    assert dateutils.candidate_formats('0000-00-00a00:00:00a') == {'%Y-%m-%dT%H:%M:%SZ', '%x'}
+
+
+def test_format_dates(dates):
+    """Test formatting many dates at once."""
+    raw_dates = list(dates) + list(dates)
+
+    assert dateutils.format_dates(raw_dates) == [dates[raw_date][1] for raw_date in raw_dates]
+    assert dateutils.format_dates([]) == []
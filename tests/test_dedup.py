@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import mock
+import pytest
+from scrapy.exceptions import DontCloseSpider, DropItem, NotConfigured
+from scrapy.http import Request, Response
+from scrapy.utils.test import get_crawler
+
+from hepcrawl.dedup import BloomFilter, DOIIndex, HashSet, HeldRecords, doi_hash, normalize_doi
+from hepcrawl.middlewares import DOIMergeMiddleware
+from hepcrawl.pipelines import DOIDeduplicationPipeline
+from hepcrawl.spiders import aps_spider
+
+
+@pytest.mark.parametrize('doi', [
+    '10.1016/j.nuclphysb.2018.07.004',
+    '10.1016/J.NuclPhysB.2018.07.004',
+    ' doi:10.1016/j.nuclphysb.2018.07.004',
+    'https://doi.org/10.1016/j.nuclphysb.2018.07.004',
+    'http://dx.doi.org/10.1016/j.nuclphysb.2018.07.004',
+])
+def test_normalize_doi(doi):
+    assert normalize_doi(doi) == '10.1016/j.nuclphysb.2018.07.004'
+
+
+@pytest.mark.parametrize('bloom_capacity', [0, 1000])
+def test_doi_index(bloom_capacity):
+    index = DOIIndex(bloom_capacity=bloom_capacity)
+
+    assert index.add('10.1016/j.nuclphysb.2018.07.004')
+    assert index.add('10.1016/j.nuclphysb.2018.07.005')
+    assert not index.add('DOI:10.1016/J.NUCLPHYSB.2018.07.004')
+    assert '10.1016/j.nuclphysb.2018.07.005' in index
+    assert '10.1016/j.nuclphysb.2018.07.006' not in index
+    assert len(index) == 2
+
+
+def test_doi_index_bloom_false_positives():
+    """Test that the DOIs taken for seen ones by the filter are still new."""
+    index = DOIIndex(bloom_capacity=10, bloom_error_rate=0.5)
+    dois = ['10.1000/%d' % number for number in range(1000)]
+
+    assert all(index.add(doi) for doi in dois)
+    assert not any(index.add(doi) for doi in dois)
+    assert len(index) == 1000
+
+
+def test_bloom_filter():
+    """Test that the false positives stay around the error rate."""
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for number in range(10000):
+        bloom.add(doi_hash('10.1000/%d' % number))
+
+    assert all(doi_hash('10.1000/%d' % number) in bloom for number in range(10000))
+    false_positives = sum(doi_hash('10.2000/%d' % number) in bloom for number in range(10000))
+    assert false_positives < 200
+
+
+def test_hash_set():
+    """Test that the table keeps every hash as it grows."""
+    hashes = HashSet(size=4)
+    pairs = [doi_hash('10.1000/%d' % number) for number in range(1000)] + [(0, 0), (7, 0)]
+
+    assert all(hashes.add(pair) for pair in pairs)
+    assert not any(hashes.add(pair) for pair in pairs)
+    assert all(pair in hashes for pair in pairs)
+    assert doi_hash('10.2000/1') not in hashes
+    assert len(hashes) == len(pairs)
+    assert len(hashes.lows) == 2048
+
+
+def _record(doi, local_files=1):
+    return {
+        'dois': [{'value': doi}],
+        'local_files': [{'filetype': 'xml', 'path': '/%d.xml' % number} for number in range(local_files)],
+    }
+
+
+def test_deduplication_pipeline():
+    spider = aps_spider.APSSpider()
+    pipeline = DOIDeduplicationPipeline()
+    records = [
+        _record('10.1103/PhysRevD.98.012001'),
+        _record('https://doi.org/10.1103/physrevd.98.012001'),
+        _record('10.1103/PhysRevD.98.012001', local_files=3),
+        {'title': 'Without DOI'},
+    ]
+
+    result = []
+    for record in records:
+        try:
+            result.append(pipeline.process_item(record, spider) is record)
+        except DropItem:
+            result.append(False)
+
+    assert result == [True, False, False, True]
+    assert pipeline.duplicates == 2
+
+
+def _records():
+    return [
+        _record('10.1103/PhysRevD.98.012001'),
+        _record('https://doi.org/10.1103/physrevd.98.012001'),
+        _record('10.1103/PhysRevD.98.012001', local_files=3),
+        _record('10.1103/PhysRevD.98.012002'),
+    ]
+
+
+@pytest.mark.parametrize('policy, kept', [
+    ('latest', [2, 3]),
+    ('richest', [2, 3]),
+])
+def test_held_records(policy, kept):
+    records = _records()
+    if policy == 'latest':
+        records[2]['local_files'] = []
+    held = HeldRecords(policy)
+
+    assert [held.add(record) for record in records] == [False, True, True, False]
+    assert held.pop_all() == [records[index] for index in kept]
+    assert held.duplicates == 2
+    assert not held
+
+
+def test_held_records_richest_first():
+    """Test that the first record is kept when the copies are as rich."""
+    records = _records()[:2]
+    held = HeldRecords('richest')
+    for record in records:
+        held.add(record)
+
+    assert held.pop_all()[0] is records[0]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        HeldRecords('merge')
+
+
+def test_merge_middleware():
+    """Test that the records are held until the spider is idle."""
+    crawler = get_crawler(settings_dict={'DEDUP_POLICY': 'latest'})
+    crawler.spider = spider = aps_spider.APSSpider()
+    crawler.engine = mock.Mock()
+    middleware = DOIMergeMiddleware.from_crawler(crawler)
+    records = _records()
+    response = Response(str('file:///package.zip'), request=Request('file:///package.zip'))
+    request = Request('file:///next.zip')
+
+    output = list(middleware.process_spider_output(response, records + [request, {'title': 'No DOI'}], spider))
+    assert output == [request, {'title': 'No DOI'}]
+
+    with pytest.raises(DontCloseSpider):
+        middleware.spider_idle(spider)
+    release, _ = crawler.engine.crawl.call_args[0]
+    released = Response(str('data:,'), request=release)
+    output = list(middleware.process_spider_output(released, release.callback(released), spider))
+    assert output == [records[2], records[3]]
+
+    middleware.spider_idle(spider)
+    assert crawler.engine.crawl.call_count == 1
+
+
+def test_merge_middleware_first():
+    crawler = get_crawler(settings_dict={'DEDUP_POLICY': 'first'})
+    with pytest.raises(NotConfigured):
+        DOIMergeMiddleware.from_crawler(crawler)
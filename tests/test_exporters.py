@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import gzip
+from io import BytesIO
+
+from hepcrawl.authors import AuthorTable
+from hepcrawl.exporters import MsgpackItemExporter, iter_msgpack
+from hepcrawl.items import HEPRecord
+
+
+def _records():
+    return [
+        {'title': 'A title', 'dois': [{'value': '10.1016/j.nuclphysb.2018.07.004'}]},
+        {'title': 'Ein Titel über Teilchen', 'page_nr': [12]},
+    ]
+
+
+def test_export(tmpdir):
+    """Test that the exported items are read back in order."""
+    output = BytesIO()
+    exporter = MsgpackItemExporter(output)
+    exporter.start_exporting()
+    for record in _records():
+        exporter.export_item(HEPRecord(record))
+    exporter.finish_exporting()
+
+    output.seek(0)
+    assert list(iter_msgpack(output)) == _records()
+
+    path = tmpdir.join('records.msgpack')
+    path.write_binary(output.getvalue())
+    assert list(iter_msgpack(path.strpath)) == _records()
+
+
+def test_export_author_table():
+    """Test that the authors are exported as a list."""
+    authors = [{'surname': 'Doe', 'affiliations': [{'value': 'CERN'}]}]
+    output = BytesIO()
+    MsgpackItemExporter(output).export_item(HEPRecord(authors=AuthorTable.from_authors(authors)))
+
+    output.seek(0)
+    assert list(iter_msgpack(output)) == [{'authors': authors}]
+
+
+def test_read_gzip_and_truncated(tmpdir):
+    """Test reading gzipped files and files cut in the middle of a record."""
+    output = BytesIO()
+    exporter = MsgpackItemExporter(output)
+    for record in _records():
+        exporter.export_item(record)
+    data = output.getvalue()
+
+    path = tmpdir.join('records.msgpack.gz')
+    with gzip.open(path.strpath, 'wb') as gzip_file:
+        gzip_file.write(data)
+    assert list(iter_msgpack(path.strpath)) == _records()
+
+    path.write_binary(path.read_binary()[:-12])
+    assert list(iter_msgpack(path.strpath)) == _records()[:1]
+
+    assert list(iter_msgpack(BytesIO(data[:-3]))) == _records()[:1]
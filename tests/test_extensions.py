@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from scrapy.spiders import Spider
+from scrapy.utils.test import get_crawler
+
+from hepcrawl.extensions import MemoizeStats
+from hepcrawl.utils import collapse_initials
+
+
+def test_memoize_stats():
+    """Test that the cache hits of a spider end up in the stats."""
+    crawler = get_crawler(Spider)
+    spider = Spider('test')
+    extension = MemoizeStats.from_crawler(crawler)
+
+    extension.spider_opened(spider)
+    for name in ('Q. R. Test', 'Q. R. Test', 'Q. R. Test', 'S. Other'):
+        collapse_initials(name)
+    extension.spider_closed(spider, 'finished')
+
+    stats = crawler.stats.get_stats()
+    assert stats['memoize/collapse_initials/hits'] == 2
+    assert stats['memoize/collapse_initials/misses'] == 2
+    assert stats['memoize/collapse_initials/hit_rate'] == 0.5
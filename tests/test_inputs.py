@@ -9,9 +9,19 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import pytest
+
 from hepcrawl.inputs import (
+    clean_tags_from_affiliations,
+    clean_whitespace_characters,
+    convert_html_subscripts_to_latex,
+    fix_title_capitalization,
+    remove_attributes_from_tags,
+    sanitize_markup,
+    selective_remove_tags,
     translate_language,
 )
+from hepcrawl.mappings import MATHML_ELEMENTS
 
 
 def test_translate_language():
@@ -24,3 +34,45 @@ def test_translate_language():
     ]
     for inval, outval in test_lang:
         assert translate_language(inval) == outval
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '  A  title\nwith   spaces ',
+    'ALL CAPS TITLE ON QCD',
+    'A > B & C',
+    'x<sub>1</sub> y<sup>2</sup> z<inf>3</inf> <sup><sub>q</sub></sup>',
+    '<p class="x">one</p><p>two</p>',
+    'Mass <math xmlns="http://www.w3.org/1998/Math/MathML" display="inline"><mi mathvariant="normal">m</mi></math> tail',
+    '<!-- comment --> <script>x()</script>text <b onclick="x()">bold</b>',
+    '<style>a>b</style>Title',
+    '<p>x<style>a &amp; b</style> <i>y</i></p>',
+    '<html><head><title>T</title></head><body><p>body</p></body></html>',
+    'unclosed <i>tag &amp; entity',
+    'café &#945; &lt;not a tag&gt;',
+])
+@pytest.mark.parametrize('fix_capitalization', [False, True])
+def test_sanitize_markup(text, fix_capitalization):
+    """Test that the sanitizer gives what the chain of processors does."""
+    expected = convert_html_subscripts_to_latex(clean_whitespace_characters(text))
+    if fix_capitalization:
+        expected = fix_title_capitalization(expected)
+    expected = remove_attributes_from_tags(expected)
+    expected = selective_remove_tags(keep=MATHML_ELEMENTS)(expected).strip()
+
+    result = sanitize_markup(keep=MATHML_ELEMENTS, fix_capitalization=fix_capitalization)(text)
+
+    assert result == expected
+
+
+def test_clean_tags_from_affiliations():
+    """Test that authors with the same affiliation share the cleaned string."""
+    authors = [
+        {'affiliations': [{'value': '<label><sup>1</sup></label> CERN,\n <i>Geneva</i>'}]}
+        for i in range(2)
+    ]
+
+    first, second = [clean_tags_from_affiliations(author)['affiliations'][0]['value'] for author in authors]
+
+    assert first == 'CERN, Geneva'
+    assert first is second
@@ -26,7 +26,6 @@ def licenses_from_records(shared_datadir):
         parser = iop_parser.IOPParser()
         content=(shared_datadir / file).read_text()
         selector = Selector(text=content, type='xml')
-        selector.remove_namespaces()
         affiliations = parser._get_license(selector)
         assert affiliations
         parsed_affiliations[os.path.basename(file)] = affiliations
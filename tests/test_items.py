@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import pickle
+from io import BytesIO
+
+import pytest
+from scrapy.exporters import JsonLinesItemExporter
+
+from hepcrawl.authors import AuthorTable
+from hepcrawl.items import CompactHEPRecord, HEPRecord
+from hepcrawl.loaders import HEPLoader
+from hepcrawl.pipelines import InspireAPIPushPipeline
+
+
+class Spider(object):
+    name = 'test'
+
+
+def _load(item):
+    record = HEPLoader(item=item)
+    record.add_value('title', 'A title')
+    record.add_value('authors', [{'surname': 'Doe', 'given_names': 'J.', 'affiliations': [{'value': 'CERN'}]}])
+    record.add_value('dois', ['10.1016/j.nuclphysb.2018.07.004'])
+    record.add_value('date_published', '2018-07-04')
+    record.add_value('journal_title', 'Nuclear Physics B')
+    return record.load_item()
+
+
+def test_compact_record():
+    """Test that the compact record works like a dict of the fields."""
+    record = CompactHEPRecord(title='A title')
+    record['abstract'] = 'An abstract'
+
+    assert record == {'title': 'A title', 'abstract': 'An abstract'}
+    assert record == HEPRecord(title='A title', abstract='An abstract')
+    assert len(record) == 2
+    assert 'title' in record
+    assert 'subtitle' not in record
+    assert record.get('subtitle', '') == ''
+    assert record.pop('title') == 'A title'
+    assert record.pop('title', None) is None
+    assert record.to_dict() == {'abstract': 'An abstract'}
+    assert dict(record) == {'abstract': 'An abstract'}
+    assert list(record) == record.keys() == ['abstract']
+    assert record.items() == [('abstract', 'An abstract')]
+    assert record.values() == ['An abstract']
+    assert CompactHEPRecord.from_dict(record.copy()) == record
+
+    with pytest.raises(KeyError):
+        record['unknown'] = 'value'
+    with pytest.raises(KeyError):
+        CompactHEPRecord(unknown='value')
+    with pytest.raises(KeyError):
+        del record['title']
+    with pytest.raises(AttributeError):
+        record.title = 'A title'
+
+
+def test_compact_record_fields_order():
+    """Test that the fields come in the order of HEPRecord, whatever they were set in."""
+    values = {'title': 'A title', 'dois': [{'value': '10.1234/x'}], 'page_nr': ['4']}
+    record = CompactHEPRecord(values)
+    del record['page_nr']
+    record['abstract'] = 'An abstract'
+
+    expected = [field for field in HEPRecord.fields if field in ('title', 'dois', 'abstract')]
+    assert record.keys() == expected
+    assert [key for key, _ in record.items()] == expected
+    assert record.to_dict() == dict(HEPRecord(record))
+    assert len(record) == 3
+    assert 'page_nr' not in record
+
+
+def test_compact_record_loader_and_pipeline():
+    """Test that the compact record can be used instead of HEPRecord."""
+    record = _load(CompactHEPRecord())
+    expected = _load(HEPRecord())
+
+    assert record == expected
+
+    pipeline = InspireAPIPushPipeline()
+    record = pipeline.process_item(record, Spider())
+    expected = pipeline.process_item(expected, Spider())
+    record.pop('acquisition_source')
+    expected.pop('acquisition_source')
+    record.pop('record_creation_date')
+    expected.pop('record_creation_date')
+
+    assert record == expected
+
+
+def test_compact_record_serialization():
+    """Test sending the compact record to other processes."""
+    record = CompactHEPRecord(title='A title', authors=AuthorTable.from_authors([{'surname': 'Doe'}]))
+
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert pickle.loads(pickle.dumps(record, 2)) == record
+    assert CompactHEPRecord.from_msgpack(record.to_msgpack()) == {'title': 'A title', 'authors': [{'surname': 'Doe'}]}
+
+    output = BytesIO()
+    JsonLinesItemExporter(output).export_item(record)
+    assert json.loads(output.getvalue().decode('utf-8')) == {'title': 'A title', 'authors': [{'surname': 'Doe'}]}
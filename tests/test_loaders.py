@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pytest
+from scrapy.loader import ItemLoader
+from scrapy.loader.processors import Join, MapCompose
+
+from hepcrawl.items import HEPRecord
+from hepcrawl.loaders import HEPLoader
+
+
+class ScrapyHEPLoader(HEPLoader):
+    """HEPLoader running its processors the way scrapy does."""
+
+    _process_input_value = ItemLoader._process_input_value
+    get_output_value = ItemLoader.get_output_value
+
+
+class ContextLoader(HEPLoader):
+    """HEPLoader with a processor reading the loader context."""
+
+    title_in = MapCompose(lambda value, loader_context: loader_context['prefix'] + value)
+
+
+class JoinLoader(HEPLoader):
+    """HEPLoader joining the journal titles."""
+
+    journal_title_out = Join()
+
+
+def _load(loader_class):
+    record = loader_class(item=HEPRecord())
+    record.add_value('title', ['  A <sub>2</sub>  title <b class="x">b</b>', 'Second'])
+    record.add_value('abstract', ['', ' An <i>abstract</i>. '])
+    record.add_value('journal_title', ['', 'Nuclear Physics B'])
+    record.add_value('authors', [{'surname': 'Doe', 'given_names': 'J.', 'affiliations': [{'value': ' <b>CERN</b>'}]}])
+    record.add_value('dois', ['10.1016/j.nuclphysb.2018.07.004'])
+    record.add_value('collaborations', ['the ATLAS Collaboration'])
+    record.add_value('date_published', '2018-7-4')
+    record.add_value('journal_year', 2018)
+    record.add_value('free_keywords', ['Higgs <i>boson</i>'])
+    return record.load_item()
+
+
+def test_compiled_processors():
+    """Test that the compiled processors give what scrapy does."""
+    assert _load(HEPLoader) == _load(ScrapyHEPLoader)
+
+
+def test_loader_context():
+    """Test that processors taking the loader context still get it."""
+    record = ContextLoader(item=HEPRecord(), prefix='Re: ')
+    record.add_value('title', 'A title')
+
+    assert record.load_item()['title'] == 'Re: A title'
+
+
+def test_output_processor_error():
+    """Test that failing output processors are reported like in scrapy."""
+    record = JoinLoader(item=HEPRecord())
+    record.add_value('journal_title', [1])
+
+    with pytest.raises(ValueError) as excinfo:
+        record.load_item()
+
+    assert 'Error with output processor' in str(excinfo.value)
+    assert 'journal_title' in str(excinfo.value)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import logging
+import socket
+import threading
+import time
+
+import pytest
+
+from hepcrawl.logshipper import QueueLogstashHandler
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger('test-logshipper')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close(timeout=1)
+
+
+@pytest.fixture
+def server():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    yield server
+    server.close()
+
+
+def _receive(server, count):
+    connection, _ = server.accept()
+    connection.settimeout(5)
+    data = b''
+    while data.count(b'\n') < count:
+        data += connection.recv(65536)
+    connection.close()
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def test_send_events(logger, server):
+    """Test that the events are sent to Logstash from the thread."""
+    handler = QueueLogstashHandler(*server.getsockname(), version=1)
+    logger.addHandler(handler)
+    assert handler.thread is None
+
+    for number in range(3):
+        logger.info('Processing article.', extra={'number': number})
+
+    events = _receive(server, 3)
+    assert [event['message'] for event in events] == ['Processing article.'] * 3
+    assert [event['number'] for event in events] == [0, 1, 2]
+    handler.close(timeout=5)
+    assert handler.sent == 3
+    assert handler.dropped == 0
+
+
+def test_drop_events(logger, server):
+    """Test that the events are dropped when Logstash is not there."""
+    address = server.getsockname()
+    server.close()
+    handler = QueueLogstashHandler(*address, capacity=2, retry_interval=60)
+    logger.addHandler(handler)
+
+    start = time.time()
+    for _ in range(1000):
+        logger.info('Processing article.')
+    assert time.time() - start < 1
+
+    handler.close(timeout=5)
+    assert handler.sent == 0
+    assert handler.dropped == 1000
+
+
+def test_drop_events_threads(logger, server):
+    """Test that no dropped event is lost when several threads log."""
+    address = server.getsockname()
+    server.close()
+    handler = QueueLogstashHandler(*address, capacity=2, retry_interval=60)
+    logger.addHandler(handler)
+
+    def log():
+        for _ in range(500):
+            logger.info('Processing article.')
+
+    threads = [threading.Thread(target=log) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    handler.close(timeout=5)
+    assert handler.dropped == 2000
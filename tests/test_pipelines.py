@@ -9,10 +9,36 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import gzip
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import mock
 import pytest
+from scrapy.exceptions import DropItem
+from scrapy.settings import Settings
+from twisted.internet import defer, task
 
+from hepcrawl import settings as hepcrawl_settings
+from hepcrawl import pipelines
 from hepcrawl.spiders import aps_spider
-from hepcrawl.pipelines import InspireAPIPushPipeline, JsonWriterPipeline
+from hepcrawl.authors import AuthorTable
+from hepcrawl.exporters import iter_msgpack, unpack_record
+from hepcrawl.items import HEPRecord
+from hepcrawl.pipelines import (
+    FanOutPipeline,
+    FanOutSink,
+    InspireAPIPushPipeline,
+    InspireCeleryPushPipeline,
+    JsonWriterPipeline,
+    MsgpackWriterPipeline,
+    SqlitePipeline,
+    record_dict,
+)
 
 from .responses import fake_response_from_file
 
@@ -60,3 +86,435 @@ def test_json_output(tmpdir, json_spider_record):
     json_pipeline.close_spider(spider)
 
     assert tmpfile.read()
+
+    assert json.loads(tmpfile.read()) == json.loads(json.dumps(dict(json_record)))
+
+
+def test_json_output_buffer(tmpdir, json_spider_record):
+    """Test that the records are only written once the buffer is full."""
+    tmpfile = tmpdir.join("aps.jsonl")
+    spider, json_record = json_spider_record
+
+    json_pipeline = JsonWriterPipeline(output_uri=tmpfile.strpath, buffer_size=2 ** 20, flush_interval=60)
+    json_pipeline.open_spider(spider)
+    json_pipeline.process_item(json_record, spider)
+
+    assert not tmpdir.join("aps.jsonl.part").exists()
+
+    json_pipeline.buffer_size = 1
+    json_pipeline.process_item(json_record, spider)
+
+    assert len(tmpdir.join("aps.jsonl.part").readlines()) == 2
+    assert not tmpfile.exists()
+
+    json_pipeline.close_spider(spider)
+
+    assert len(tmpfile.readlines()) == 2
+    assert not tmpdir.join("aps.jsonl.part").exists()
+
+
+def test_json_output_flush_interval(tmpdir, monkeypatch, json_spider_record):
+    """Test that the buffered records are written when no more items come."""
+    tmpfile = tmpdir.join("aps.jsonl")
+    spider, json_record = json_spider_record
+    clock = task.Clock()
+
+    def looping_call(function, looping_call=task.LoopingCall):
+        loop = looping_call(function)
+        loop.clock = clock
+        return loop
+
+    monkeypatch.setattr(pipelines.task, 'LoopingCall', looping_call)
+
+    json_pipeline = JsonWriterPipeline(output_uri=tmpfile.strpath, flush_interval=5)
+    json_pipeline.open_spider(spider)
+    json_pipeline.process_item(json_record, spider)
+    clock.advance(4)
+
+    assert not tmpdir.join("aps.jsonl.part").exists()
+
+    clock.advance(1)
+
+    assert len(tmpdir.join("aps.jsonl.part").readlines()) == 1
+
+    json_pipeline.close_spider(spider)
+
+    assert not json_pipeline.flush_loop.running
+    assert len(tmpfile.readlines()) == 1
+
+
+def test_json_output_shards(tmpdir, json_spider_record):
+    """Test splitting the output by number of records and journal."""
+    spider, json_record = json_spider_record
+    other_record = json_record.copy()
+    other_record['journal_title'] = 'Physical Review D'
+    output_uri = tmpdir.join("aps.jsonl.gz").strpath
+
+    json_pipeline = JsonWriterPipeline(output_uri=output_uri, compress=True, buffer_size=0, shard_size=2, shard_by_journal=True)
+    json_pipeline.open_spider(spider)
+    for record in (json_record, other_record, json_record, json_record):
+        json_pipeline.process_item(record, spider)
+
+    assert tmpdir.join("aps.physical_review_e.00001.jsonl.gz").exists()
+    assert tmpdir.join("aps.physical_review_d.00001.jsonl.gz.part").exists()
+
+    json_pipeline.close_spider(spider)
+
+    assert sorted(path.basename for path in tmpdir.listdir()) == [
+        "aps.physical_review_d.00001.jsonl.gz",
+        "aps.physical_review_e.00001.jsonl.gz",
+        "aps.physical_review_e.00002.jsonl.gz",
+    ]
+    lines = gzip.open(tmpdir.join("aps.physical_review_e.00001.jsonl.gz").strpath).readlines()
+    assert [json.loads(line)['journal_title'] for line in lines] == ['Physical Review E'] * 2
+
+
+def test_msgpack_output(tmpdir, json_spider_record):
+    """Test writing results to a MessagePack file."""
+    spider, json_record = json_spider_record
+    output_uri = tmpdir.join("aps.msgpack").strpath
+
+    msgpack_pipeline = MsgpackWriterPipeline(output_uri=output_uri, shard_size=1)
+    msgpack_pipeline.open_spider(spider)
+    msgpack_pipeline.process_item(json_record, spider)
+    msgpack_pipeline.process_item(json_record, spider)
+    msgpack_pipeline.close_spider(spider)
+
+    assert sorted(path.basename for path in tmpdir.listdir()) == ["aps.00001.msgpack", "aps.00002.msgpack"]
+    records = list(iter_msgpack(tmpdir.join("aps.00001.msgpack").strpath))
+    assert records == [json.loads(json.dumps(dict(json_record)))]
+
+
+@pytest.fixture
+def writer_calls(monkeypatch):
+    """Run the SQLite transactions when the test says so."""
+    calls = []
+
+    def defer_to_thread_pool(reactor, pool, function, rows):
+        written = defer.Deferred()
+        calls.append(lambda: written.callback(function(rows)))
+        return written
+
+    monkeypatch.setattr(pipelines.threads, 'deferToThreadPool', defer_to_thread_pool)
+    return calls
+
+
+def test_sqlite_output(tmpdir, inspire_record, writer_calls):
+    """Test storing the records in batches in a SQLite database."""
+    spider = aps_spider.APSSpider()
+    output_uri = tmpdir.join("aps.db").strpath
+
+    sqlite_pipeline = SqlitePipeline(output_uri=output_uri, batch_size=2)
+    sqlite_pipeline.open_spider(spider)
+    for _ in range(3):
+        assert sqlite_pipeline.process_item(inspire_record, spider) is inspire_record
+    writer_calls.pop(0)()
+
+    connection = sqlite3.connect(output_uri)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("SELECT count(*) FROM records").fetchone()[0] == 2
+
+    closed = sqlite_pipeline.close_spider(spider)
+    writer_calls.pop(0)()
+    assert closed.called and sqlite_pipeline.connection is None
+
+    rows = connection.execute(
+        "SELECT doi, journal, harvest_date, spider, record FROM records WHERE doi = ?",
+        (inspire_record['dois'][0]['value'],)
+    ).fetchall()
+    assert len(rows) == 3
+    doi, journal, harvest_date, spider_name, record = rows[0]
+    assert journal == "Physical Review E"
+    assert harvest_date == inspire_record['acquisition_source']['date']
+    assert spider_name == "APS"
+    assert unpack_record(bytes(record)) == json.loads(json.dumps(dict(inspire_record)))
+    assert "records_doi" in [
+        row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    ]
+
+
+def test_sqlite_output_backpressure(tmpdir, inspire_record, writer_calls):
+    """Test that items wait for the writer without blocking once it is behind."""
+    spider = aps_spider.APSSpider()
+    sqlite_pipeline = SqlitePipeline(output_uri=tmpdir.join("aps.db").strpath, batch_size=1, max_pending=1)
+    sqlite_pipeline.open_spider(spider)
+
+    assert sqlite_pipeline.process_item(inspire_record, spider) is inspire_record
+    results = []
+    sqlite_pipeline.process_item(inspire_record, spider).addCallback(results.append)
+    assert not results and len(writer_calls) == 1
+
+    # the first batch is written, the second one goes to the writer
+    writer_calls.pop(0)()
+    assert not results and len(writer_calls) == 1
+    writer_calls.pop(0)()
+    assert results == [inspire_record]
+
+    closed = sqlite_pipeline.close_spider(spider)
+    assert closed.called and not writer_calls
+
+
+@pytest.fixture
+def job_environ(monkeypatch):
+    monkeypatch.setattr(os, 'environ', dict(
+        os.environ,
+        SCRAPY_JOB='job',
+        SCRAPY_FEED_URI='file:///tmp/aps.jsonl',
+        SCRAPY_LOG_FILE='/tmp/aps.log',
+    ))
+
+
+@pytest.fixture
+def batch_pipeline(monkeypatch, job_environ):
+    """Pipeline pushing batches of two records, with the posts held."""
+    posts = []
+
+    def defer_to_thread(post, url, payload):
+        posts.append((url, payload, defer.Deferred()))
+        return posts[-1][2]
+
+    monkeypatch.setattr(pipelines.threads, 'deferToThread', defer_to_thread)
+
+    spider = aps_spider.APSSpider()
+    spider.state = {}
+    spider.settings = Settings()
+    spider.settings.setmodule(hepcrawl_settings)
+    spider.settings.set('API_PIPELINE_BATCH_SIZE', 2)
+    spider.settings.set('API_PIPELINE_MAX_IN_FLIGHT', 1)
+
+    pipeline = InspireAPIPushPipeline()
+    pipeline.open_spider(spider)
+    return spider, pipeline, posts
+
+
+def test_api_push_batches(batch_pipeline, json_spider_record):
+    """Test pushing the records in batches during the crawl."""
+    spider, pipeline, posts = batch_pipeline
+    _, record = json_spider_record
+
+    assert pipeline.process_item(record.copy(), spider)['dois']
+    assert posts == []
+
+    held = pipeline.process_item(record.copy(), spider)
+    assert isinstance(held, defer.Deferred)
+    url, payload, posted = posts[0]
+    assert url.endswith('inspire_crawler.tasks.submit_results')
+    assert payload['job_id'] == 'job'
+    assert [item['dois'] for item in payload['results_data']] == [record['dois']] * 2
+
+    items = []
+    held.addCallback(items.append)
+    posted.callback(None)
+    assert items[0]['dois'] == record['dois']
+    assert pipeline.in_flight == []
+
+    pipeline.process_item(record.copy(), spider)
+    closed = []
+    pipeline.close_spider(spider).addCallback(closed.append)
+    assert len(posts) == 2 and not closed
+
+    posts[1][2].errback(IOError('unavailable'))
+    assert not closed
+    url, payload, pushed = posts[2]
+    assert payload['results_data'] == []
+    assert payload['errors'] == [('Cannot push batch with DOIs %s' % record['dois'][0]['value'], 'pipeline')]
+
+    pushed.callback(None)
+    assert closed
+    assert pipeline.session is not None
+
+
+class FakeCelery(object):
+    """Celery app keeping the sent tasks."""
+
+    class amqp(object):
+        class producer_pool(object):
+            acquired = []
+
+            @classmethod
+            def acquire(cls, block):
+                cls.acquired.append(block)
+                return mock.Mock()
+
+    def __init__(self):
+        self.conf = {}
+        self.tasks = []
+
+    def send_task(self, name, kwargs, **options):
+        self.tasks.append((name, kwargs, options))
+
+
+def test_celery_push_chunks(tmpdir, job_environ, json_spider_record):
+    """Test sending a task for each chunk of records."""
+    _, record = json_spider_record
+    spider = aps_spider.APSSpider()
+    spider.state = {}
+    spider.settings = Settings()
+    spider.settings.setmodule(hepcrawl_settings)
+    spider.settings.set('CELERY_PUSH_CHUNK_SIZE', 2)
+    spider.settings.set('CELERY_PUSH_CHUNK_DIR', tmpdir.strpath)
+
+    pipeline = InspireCeleryPushPipeline()
+    pipeline.celery = FakeCelery()
+    pipeline.open_spider(spider)
+    assert pipeline.celery.conf['CELERY_RESULT_BACKEND'] is None
+
+    for _ in range(3):
+        pipeline.process_item(record.copy(), spider)
+
+    assert len(pipeline.celery.tasks) == 1
+    name, kwargs, options = pipeline.celery.tasks[0]
+    assert name == 'inspire_crawler.tasks.submit_results'
+    assert kwargs['results_uri'] == 'file://' + tmpdir.join('APS_job.00001.jsonl').strpath
+    assert len(tmpdir.join('APS_job.00001.jsonl').readlines()) == 2
+
+    pipeline.close_spider(spider)
+
+    assert [task[1]['results_uri'] for task in pipeline.celery.tasks] == [
+        'file://' + tmpdir.join('APS_job.00001.jsonl').strpath,
+        'file://' + tmpdir.join('APS_job.00002.jsonl').strpath,
+        'file:///tmp/aps.jsonl',
+    ]
+    assert pipeline.celery.tasks[-1][1]['results_data'] == []
+    assert len(set(id(task[2]['producer']) for task in pipeline.celery.tasks)) == 1
+    assert FakeCelery.amqp.producer_pool.acquired == [True]
+    pipeline.celery.tasks[-1][2]['producer'].release.assert_called_once_with()
+
+
+class ListSink(object):
+    """Pipeline keeping the items, or holding them with ``hold``."""
+
+    def __init__(self, hold=False):
+        self.hold = hold
+        self.items = []
+        self.held = []
+        self.closed = False
+
+    def process_item(self, item, spider):
+        self.items.append(item)
+        if self.hold:
+            self.held.append(defer.Deferred())
+            return self.held[-1]
+        return item
+
+    def close_spider(self, spider):
+        self.closed = True
+
+
+class SlowSink(ListSink):
+    """Synchronous pipeline keeping the items once released."""
+
+    def __init__(self):
+        super(SlowSink, self).__init__()
+        self.released = threading.Event()
+
+    def process_item(self, item, spider):
+        self.released.wait(5)
+        return super(SlowSink, self).process_item(item, spider)
+
+
+@pytest.fixture
+def sink_threads(monkeypatch):
+    """Run the sinks at once instead of in their threads."""
+    def defer_to_thread_pool(reactor, pool, function, *args):
+        return defer.maybeDeferred(function, *args)
+
+    monkeypatch.setattr(pipelines.threads, 'deferToThreadPool', defer_to_thread_pool)
+
+
+def test_fan_out(json_spider_record, sink_threads):
+    """Test that a slow sink only holds the crawl when its queue is full."""
+    spider, record = json_spider_record
+    fast, slow = ListSink(), ListSink(hold=True)
+    pipeline = FanOutPipeline([FanOutSink(fast), FanOutSink(slow, capacity=2)], lag_interval=0)
+    pipeline.open_spider(spider)
+
+    assert pipeline.process_item(record, spider) is record
+    assert pipeline.process_item(record, spider) is record
+    held = pipeline.process_item(record, spider)
+    assert isinstance(held, defer.Deferred)
+    assert len(fast.items) == 3
+    assert len(slow.items) == 1
+    assert fast.items[0] == record and fast.items[0] is not record
+    assert pipeline.lag()['ListSink'][0] == 2
+
+    items = []
+    held.addCallback(items.append)
+    slow.held[0].callback(None)
+    assert items == [record]
+
+    closed = []
+    pipeline.close_spider(spider).addCallback(closed.append)
+    assert not closed and not slow.closed
+    slow.held[1].callback(None)
+    slow.held[2].callback(None)
+    assert closed and fast.closed and slow.closed
+    assert len(slow.items) == 3
+
+
+def test_fan_out_slow_sink(json_spider_record):
+    """Test that a slow synchronous sink does not hold back the others."""
+    spider, record = json_spider_record
+    fast, slow = ListSink(), SlowSink()
+    pipeline = FanOutPipeline([FanOutSink(fast), FanOutSink(slow)], lag_interval=0)
+    pipeline.open_spider(spider)
+    try:
+        start = time.time()
+        assert pipeline.process_item(record, spider) is record
+        assert time.time() - start < 1
+
+        while not fast.items and time.time() - start < 5:
+            time.sleep(0.01)
+        assert fast.items == [record]
+        assert slow.items == []
+    finally:
+        slow.released.set()
+        for sink in pipeline.sinks:
+            sink.stop()
+    assert slow.items == [record]
+
+
+def test_fan_out_push_sink():
+    """Test that the push pipelines cannot be sinks."""
+    crawler = mock.Mock()
+    crawler.settings = Settings({
+        'FANOUT_SINKS': {'hepcrawl.pipelines.InspireCeleryPushPipeline': 100},
+    })
+    with pytest.raises(ValueError):
+        FanOutPipeline.from_crawler(crawler)
+
+
+def test_fan_out_errors(json_spider_record):
+    """Test that a failing sink does not stop its queue."""
+    spider, record = json_spider_record
+    sink = FanOutSink(ListSink(hold=True))
+    for _ in range(3):
+        sink.put(record, spider)
+    sink.pipeline.held[0].errback(IOError('unavailable'))
+    sink.pipeline.held[1].errback(DropItem('invalid'))
+    sink.pipeline.held[2].callback(None)
+
+    assert (sink.processed, sink.failed) == (1, 1)
+    assert not sink.busy
+
+
+def test_gzip_compress():
+    """Test compressing the pushed JSON."""
+    data = json.dumps({'kwargs': {'results_data': [{'title': 'A title'}] * 100}}).encode('utf-8')
+    compressed = pipelines.gzip_compress(data)
+
+    assert len(compressed) < len(data)
+    assert gzip.GzipFile(fileobj=io.BytesIO(compressed)).read() == data
+
+
+
+def test_record_dict():
+    """Test that the sinks get the authors of a table as a list."""
+    authors = [{'surname': 'Doe'}, {'surname': 'Roe'}]
+    item = HEPRecord(title='A title', authors=AuthorTable.from_authors(authors))
+
+    record = record_dict(item)
+
+    assert record == {'title': 'A title', 'authors': authors}
+    assert type(record['authors']) is list
+    assert isinstance(item['authors'], AuthorTable)
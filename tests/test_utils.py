@@ -9,6 +9,7 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import io
 import os
 
 import pytest
@@ -16,20 +17,29 @@ import responses
 import six
 
 from hepcrawl.utils import (
+    MEMOIZED_FUNCTIONS,
     build_dict,
     coll_cleanforthe,
     collapse_initials,
     ftp_connection_info,
     get_first,
+    get_license,
     get_journal_and_section,
     get_mime_type,
     get_nested,
     get_node,
     has_numbers,
+    html_file_selector,
+    iter_json_array,
+    memoize,
+    normalize_journal_title,
     parse_domain,
     range_as_string,
     split_fullname,
-    unzip_files)
+    unzip_files,
+    xml_file_selector,
+    xml_selector,
+    xmliter)
 
 
 @pytest.fixture
@@ -119,6 +129,42 @@ def test_build_dict(list_for_dict):
     assert dict_from_list['Bruce']['age'] == 9
 
 
+def test_iter_json_array():
+    """Test decoding the elements of a top-level array one by one."""
+    text = '{"meta": {"data": [0]}, "data" : [ {"id": 1}, {"id": [2, 3]} ], "total": 2}'
+    elements = iter_json_array(text, 'data')
+
+    assert next(elements) == {'id': 1}
+    assert list(elements) == [{'id': [2, 3]}]
+    assert list(iter_json_array('{"data": []}', 'data')) == []
+    assert list(iter_json_array('{"other": [1]}', 'data')) == []
+
+
+def test_iter_json_array_invalid():
+    """Test that malformed documents raise ValueError."""
+    with pytest.raises(ValueError):
+        list(iter_json_array('[1, 2]', 'data'))
+    with pytest.raises(ValueError):
+        list(iter_json_array('{"data": [1, 2', 'data'))
+    with pytest.raises(ValueError):
+        list(iter_json_array('{"data": [1 2]}', 'data'))
+    with pytest.raises(ValueError):
+        list(iter_json_array('{"data": [1, 2,]}', 'data'))
+    with pytest.raises(ValueError):
+        list(iter_json_array('{"other": 1 "data": [1]}', 'data'))
+
+
+def test_iter_json_array_chunks():
+    """Test decoding from bytes read by chunks smaller than the values."""
+    data = u'{"total": 12345, "data": [{"title": "\u00e9t\u00e9 été"}, 678, "λ"]}'.encode('utf-8')
+
+    elements = list(iter_json_array(data, 'data', chunk_size=3))
+
+    assert elements == [{'title': u'\xe9t\xe9 \xe9t\xe9'}, 678, u'\u03bb']
+    assert list(iter_json_array(io.BytesIO(data), 'data', chunk_size=1)) == elements
+    assert list(iter_json_array(data.decode('utf-8'), 'data')) == elements
+
+
 def test_split_fullname():
     """Test author fullname splitting."""
     author1 = 'Doe, John Magic'
@@ -219,6 +265,96 @@ def test_get_node():
     assert record == "This is the record."
 
 
+def test_xml_selector_reads_declared_encoding():
+    """Test parsing bytes in the encoding declared by the document."""
+    body = '<?xml version="1.0" encoding="ISO-8859-1"?><a>Universität</a>'.encode('iso-8859-1')
+
+    assert xml_selector(body).xpath('/a/text()').extract_first() == 'Universität'
+
+
+def test_xml_selector_does_not_read_external_entities(tmpdir):
+    """Test that only the entities declared in the document are expanded."""
+    secret = tmpdir.join('secret.txt')
+    secret.write('secret')
+    body = (
+        '<!DOCTYPE a [<!ENTITY int "internal"><!ENTITY ext SYSTEM "file://%s">]>'
+        '<a>&int; &ext;</a>' % secret
+    ).encode('utf-8')
+
+    assert xml_selector(body).xpath('/a/text()').extract_first().strip() == 'internal'
+
+
+def test_xml_selector_reads_catalog_entities(tmpdir):
+    """Test that the entities of the publisher DTDs are read from the catalog."""
+    body = (
+        '<!DOCTYPE article PUBLIC "-//NLM//DTD JATS (Z39.96) Journal Publishing DTD v1.1 20151215//EN"'
+        ' "JATS-journalpublishing1.dtd">'
+        '<article>&alpha; &rarr; &AMP;</article>'
+    )
+    dtd = tmpdir.join('other.dtd')
+    dtd.write('<!ENTITY alpha "secret">')
+    other = '<!DOCTYPE article SYSTEM "file://%s"><article>&alpha;</article>' % dtd
+
+    assert xml_selector(body.encode('utf-8')).xpath('/article/text()').extract_first() == '\u03b1 \u2192 &'
+    assert xml_selector(body).xpath('/article/text()').extract_first() == '\u03b1 \u2192 &'
+    assert xml_selector(other.encode('utf-8')).xpath('/article/text()').extract_first() is None
+
+
+def test_xml_selector_empty():
+    """Test that an empty document gives an empty selector."""
+    assert xml_selector(b'  ').xpath('//a') == []
+
+
+def test_file_selectors(tmpdir):
+    """Test parsing straight from the files."""
+    xml_file = tmpdir.join('article.xml')
+    xml_file.write('<article xmlns="http://example.com"><title>Title</title></article>')
+
+    selector = xml_file_selector(str(xml_file))
+    assert selector.xpath('//*[local-name()="title"]/text()').extract_first() == 'Title'
+
+    selector = html_file_selector(str(xml_file))
+    assert selector.xpath('//title/text()').extract_first() == 'Title'
+
+
+@pytest.mark.parametrize('scan_size', [4, 2 ** 16])
+def test_xml_file_selector_entities(tmpdir, monkeypatch, scan_size):
+    """Test that the entities of the catalog are found in files read by chunks."""
+    monkeypatch.setattr('hepcrawl.utils.ENTITY_SCAN_SIZE', scan_size)
+    xml_file = tmpdir.join('article.xml')
+    xml_file.write(
+        '<!DOCTYPE article PUBLIC "-//NLM//DTD JATS (Z39.96) Journal Publishing DTD v1.1 20151215//EN"'
+        ' "JATS-journalpublishing1.dtd">'
+        '<article>&amp; &alpha;</article>'
+    )
+    empty_file = tmpdir.join('empty.xml')
+    empty_file.write('')
+
+    selector = xml_file_selector(str(xml_file))
+    assert selector.xpath('/article/text()').extract_first() == '& \u03b1'
+
+    with io.open(str(xml_file), 'rb') as source_file:
+        source_file.seek(0)
+        assert xml_file_selector(source_file).xpath('/article/text()').extract_first() == '& \u03b1'
+
+    assert xml_file_selector(str(empty_file)).xpath('//article') == []
+
+
+def test_xmliter():
+    """Test iterating over the nodes of a document given as bytes."""
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns:ce="http://example.com/ce">'
+        '<article><ce:title>First</ce:title></article>'
+        '<article><ce:title>Second ü</ce:title></article>'
+        '</feed>'
+    ).encode('utf-8')
+
+    nodes = list(xmliter(body, 'article'))
+
+    assert [node.xpath('./*[local-name()="title"]/text()').extract_first() for node in nodes] == ['First', 'Second ü']
+
+
 def test_coll_cleanforthe():
     """Test author and collaboration getting."""
     forenames = "Jieci"
@@ -260,3 +396,59 @@ def test_get_journal_and_section_invalid():
 
     assert journal_title == ''
     assert section == ''
+
+
+@pytest.mark.parametrize('title,expected', [
+    ('PTEP', 'Progress of Theoretical and Experimental Physics'),
+    ('Phys. Rev. D', 'Physical Review D'),
+    ('Physics letters B', 'Physics Letters B'),
+    ('NUPHB', 'Nuclear Physics B'),
+    ('The European Physical Journal C', 'European Physical Journal C'),
+    ('  chinese phys c ', 'Chinese Physics C'),
+    ('Advances in Astronomy', 'Advances in Astronomy'),
+    ('', ''),
+])
+def test_normalize_journal_title(title, expected):
+    """Test looking up the journal titles in the registry."""
+    assert normalize_journal_title(title) == expected
+
+
+@pytest.mark.parametrize('license_url,license_text,expected', [
+    ('http://creativecommons.org/licenses/by/3.0/', '', [{'license': 'CC-BY-3.0', 'url': 'http://creativecommons.org/licenses/by/3.0/'}]),
+    ('https://creativecommons.org/licenses/by/4.0/legalcode', '', [{'license': 'CC-BY-4.0', 'url': 'https://creativecommons.org/licenses/by/4.0/legalcode'}]),
+    ('https://CreativeCommons.org/licenses/by-nc-sa/3.0', '', [{'license': 'CC-BY-NC-SA-3.0', 'url': 'https://CreativeCommons.org/licenses/by-nc-sa/3.0'}]),
+    ('http://arxiv.org/licenses/nonexclusive-distrib/1.0/', '', [{'license': 'arXiv-1.0', 'url': 'http://arxiv.org/licenses/nonexclusive-distrib/1.0/'}]),
+    ('http://example.com/license', '', [{'license': '', 'url': 'http://example.com/license'}]),
+    ('', 'Creative Commons Attribution 4.0', [{'license': 'CC-BY-4.0', 'url': 'http://creativecommons.org/licenses/by/4.0/'}]),
+    ('', 'All rights reserved', []),
+    ('', '', []),
+])
+def test_get_license(license_url, license_text, expected):
+    """Test resolving licenses from their url or their text."""
+    for i in range(2):
+        assert get_license(license_url=license_url, license_text=license_text) == expected
+
+
+def test_memoize():
+    """Test that memoized functions are only run for new arguments."""
+    calls = []
+
+    @memoize(2)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    assert [double('a'), double('a'), double(b'a'), double('b'), double('c'), double('a')] == ['aa', 'aa', b'aa', 'bb', 'cc', 'aa']
+    assert calls == ['a', b'a', 'b', 'c', 'a']
+    assert double.cache_info().hits == 1
+    assert double in MEMOIZED_FUNCTIONS
+    MEMOIZED_FUNCTIONS.remove(double)
+
+
+def test_memoized_names():
+    """Test that the memoized name functions give the same results again."""
+    for i in range(2):
+        assert split_fullname('Doe, John Magic') == ('Doe', 'John Magic')
+        assert collapse_initials('T. A. Doe') == 'T.A. Doe'
+
+    assert split_fullname.cache_info().hits
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import os
+
+import pytest
+from scrapy.http import TextResponse
+from scrapy.exceptions import DropItem
+from twisted.internet import defer
+
+from hepcrawl import pipelines
+from hepcrawl.items import HEPRecord
+from hepcrawl.pipelines import ValidationPipeline
+from hepcrawl.spiders import aps_spider
+from hepcrawl.converter import InspireConverter
+from hepcrawl.pipelines import record_dict
+from hepcrawl.validation import RecordValidator, inspire_record
+
+from .responses import fake_response_from_file
+
+
+TOO_SHORT = "%r is too short" % ''
+NO_TITLE = "%r is a required property" % 'title'
+
+SCHEMA = {
+    'definitions': {
+        'title': {
+            'type': 'object',
+            'required': ['title'],
+            'properties': {'title': {'type': 'string', 'minLength': 1}},
+        },
+    },
+    'type': 'object',
+    'additionalProperties': False,
+    'required': ['titles', 'document_type'],
+    'properties': {
+        'titles': {'type': 'array', 'items': {'$ref': '#/definitions/title'}},
+        'imprints': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {'date': {'type': 'string', 'pattern': '^[0-9]{4}'}},
+            },
+        },
+    },
+}
+
+
+def test_validator():
+    """Test that only the fields of the schema are checked."""
+    validator = RecordValidator(SCHEMA)
+
+    assert validator.errors({'titles': [{'title': 'A title'}], 'page_nr': [3]}) == []
+    assert validator.errors({'titles': [{'title': ''}], 'imprints': [{'date': 'July'}]}) == [
+        ('/imprints/0/date', "%r does not match %r" % ('July', '^[0-9]{4}')),
+        ('/titles/0/title', TOO_SHORT),
+    ]
+    assert [path for path, _ in RecordValidator(SCHEMA, strict=True).errors({'titles': [], 'page_nr': [3]})] == ['/', '/']
+
+
+@pytest.fixture
+def pipeline(tmpdir):
+    pipeline = ValidationPipeline(schema=SCHEMA, sample_rate=0.5, drop_invalid=True,
+                                  quarantine_dir=tmpdir.strpath)
+    pipeline.open_spider(aps_spider.APSSpider())
+    return pipeline
+
+
+def test_validation_pipeline(pipeline, tmpdir):
+    """Test quarantining the invalid records of the sample."""
+    spider = aps_spider.APSSpider()
+    valid = HEPRecord(title='A title', date_published='2018-07-04')
+    invalid = HEPRecord(title='', date_published='2018-07-04')
+
+    assert pipeline.process_item(invalid, spider) is invalid
+    assert pipeline.process_item(valid, spider) is valid
+    assert pipeline.process_item(invalid, spider) is invalid
+    with pytest.raises(DropItem):
+        pipeline.process_item(invalid, spider)
+    assert invalid['title'] == ''
+
+    pipeline.close_spider(spider)
+
+    assert (pipeline.count, pipeline.validated, pipeline.invalid) == (4, 2, 1)
+    quarantined = [json.loads(line) for line in open(pipeline.quarantine.path)]
+    assert len(quarantined) == 1
+    assert quarantined[0]['errors'] == [['/titles/0', NO_TITLE]]
+    assert 'title' not in quarantined[0]['record']['titles'][0]
+    assert [path.basename for path in tmpdir.listdir()] == [pipeline.quarantine.path.rsplit('/', 1)[1]]
+
+
+def test_validation_pipeline_thread(monkeypatch, tmpdir):
+    """Test validating in the thread, errors of the validator included."""
+    pool_calls = []
+
+    def defer_to_thread_pool(reactor, pool, function, record):
+        pool_calls.append(pool)
+        return defer.maybeDeferred(function, record)
+
+    monkeypatch.setattr(pipelines.threads, 'deferToThreadPool', defer_to_thread_pool)
+    spider = aps_spider.APSSpider()
+    pipeline = ValidationPipeline(schema=SCHEMA, in_thread=True, drop_invalid=True,
+                                  quarantine_dir=tmpdir.strpath)
+    pipeline.open_spider(spider)
+    valid = HEPRecord(title='A title', date_published='2018-07-04')
+
+    results = []
+    pipeline.process_item(valid, spider).addCallback(results.append)
+    monkeypatch.setattr(pipeline.validator, 'errors', lambda record: 1 / 0)
+    pipeline.process_item(valid, spider).addErrback(lambda failure: results.append(failure.value))
+    pool = pipeline.pool
+    pipeline.close_spider(spider)
+
+    assert pool_calls == [pool, pool]
+    assert not pool.started and pipeline.pool is None
+    assert results[0] is valid
+    assert isinstance(results[1], DropItem)
+    quarantined = [json.loads(line) for line in open(pipeline.quarantine.path)]
+    assert quarantined[0]['errors'][0][1].startswith('Cannot validate the record')
+
+
+def test_validation_pipeline_quarantine_only(tmpdir):
+    """Test that the invalid records go on by default."""
+    spider = aps_spider.APSSpider()
+    pipeline = ValidationPipeline(schema=SCHEMA, quarantine_dir=tmpdir.strpath)
+    pipeline.open_spider(spider)
+    invalid = HEPRecord(title='', date_published='2018-07-04')
+
+    assert pipeline.process_item(invalid, spider) is invalid
+    pipeline.close_spider(spider)
+    assert pipeline.invalid == 1
+
+
+def test_inspire_record():
+    """Test that the fields are mapped as INSPIRE stores them."""
+    record = InspireConverter(source='APS', submission_number='').convert({
+        'title': 'A title',
+        'authors': [{
+            'surname': 'Doe',
+            'given_names': 'J.',
+            'full_name': 'Doe, J.',
+            'raw_name': 'J. Doe',
+            'orcid': 'ORCID:0000-0002-1825-0097',
+            'affiliations': [{'value': 'CERN', 'organization': 'CERN'}],
+        }],
+        'journal_title': 'Physical Review E',
+        'journal_doctype': 'article',
+        'journal_year': '2015',
+        'copyright_year': '2015',
+    }, now='2020-01-01T00:00:00')
+
+    inspire = inspire_record(record)
+
+    assert inspire['acquisition_source'] == {
+        'source': 'APS',
+        'method': 'hepcrawl',
+        'datetime': '2020-01-01T00:00:00',
+    }
+    assert inspire['authors'] == [{
+        'full_name': 'Doe, J.',
+        'raw_affiliations': [{'value': 'CERN'}],
+        'ids': [{'schema': 'ORCID', 'value': '0000-0002-1825-0097'}],
+    }]
+    assert inspire['copyright'] == [{'year': 2015}]
+    assert inspire['publication_info'] == [{
+        'journal_title': 'Physical Review E',
+        'material': 'publication',
+        'year': 2015,
+    }]
+    assert record['acquisition_source']['method'] == 'APS'
+
+
+def _hep_schema():
+    """Return the ``hep`` schema of the installed inspire-schemas."""
+    inspire_schemas = pytest.importorskip('inspire_schemas')
+    schemas_dir = os.path.join(os.path.dirname(inspire_schemas.__file__), 'records')
+    with open(os.path.join(schemas_dir, 'hep.json')) as schema_file:
+        schema = json.load(schema_file)
+    # the references to the other schemas are relative to this one
+    schema['id'] = 'file://' + os.path.join(schemas_dir, 'hep.json')
+    return schema
+
+
+def test_validate_aps_records():
+    """Test that the records of a real APS response are valid INSPIRE records."""
+    spider = aps_spider.APSSpider()
+    response = fake_response_from_file('aps/aps_single_response.json', response_type=TextResponse)
+    items = [item for item in spider.parse(response) if isinstance(item, HEPRecord)]
+    validator = RecordValidator(_hep_schema())
+    converter = InspireConverter(submission_number='1')
+
+    assert items
+    for item in items:
+        record = inspire_record(converter.convert(record_dict(item), source=spider.name))
+        assert validator.errors(record) == []
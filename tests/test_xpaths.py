@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pytest
+
+from scrapy.selector import Selector
+
+from hepcrawl.items import HEPRecord
+from hepcrawl.loaders import HEPLoader
+from hepcrawl.xpaths import XPATHS, XPathRegistry, extract_without_namespaces
+
+
+@pytest.fixture
+def node():
+    """Return a small JATS-like selector."""
+    body = """
+    <article>
+        <contrib contrib-type="author">
+            <name><surname>Doe</surname></name>
+            <xref ref-type="aff" rid="aff1"/>
+        </contrib>
+        <aff id="aff1">CERN</aff>
+        <aff id="aff2">DESY</aff>
+        <subtitle>A subtitle</subtitle>
+    </article>
+    """
+    return Selector(text=body, type='xml')
+
+
+def test_select_with_variables(node):
+    """Test that variables are bound at evaluation time."""
+    assert XPATHS.select(node, 'jats.affiliation_by_id', id='aff1').xpath('text()').extract() == ['CERN']
+    assert XPATHS.select(node, 'jats.affiliation_by_id', id='aff2').xpath('text()').extract() == ['DESY']
+    assert XPATHS.select(node, 'jats.affiliation_by_id', id="' or '1'='1") == []
+
+
+def test_select_on_selector_list(node):
+    """Test chaining compiled XPaths like Selector.xpath."""
+    authors = XPATHS.select(node, 'jats.authors')
+    assert XPATHS.select(authors, 'jats.author_surname').extract() == ['Doe']
+    assert XPATHS.select(authors, 'jats.author_affiliation_ids').extract() == ['aff1']
+
+
+def test_registry():
+    """Test registering and looking up expressions."""
+    registry = XPathRegistry()
+    registry.update('test', {'title': '//title/text()'})
+
+    assert 'test.title' in registry
+    assert 'test.missing' not in registry
+    assert registry['test.title'].path == '//title/text()'
+
+
+def test_loader_accepts_compiled_xpaths(node):
+    """Test add_xpath with both compiled and plain XPaths."""
+    record = HEPLoader(item=HEPRecord(), selector=node)
+    record.add_xpath('subtitle', XPATHS['jats.subtitle'])
+    record.add_xpath('collaborations', '//subtitle/text()')
+    item = record.load_item()
+
+    assert item['subtitle'] == 'A subtitle'
+    assert item['collaborations'] == [{'value': 'A subtitle'}]
+
+
+def test_namespaced_expressions():
+    """Test querying a document without removing its namespaces."""
+    body = """
+    <article xmlns="http://www.elsevier.com/xml/ja/dtd"
+             xmlns:ce="http://www.elsevier.com/xml/common/dtd"
+             xmlns:mml="http://www.w3.org/1998/Math/MathML">
+        <head>
+            <ce:title>A title</ce:title>
+            <ce:abstract><ce:abstract-sec id="as1">Mass <mml:math><mml:mi>m</mml:mi></mml:math></ce:abstract-sec></ce:abstract>
+        </head>
+    </article>
+    """
+    node = Selector(text=body, type='xml')
+
+    assert XPATHS.select(node, 'elsevier.title').extract() == ['A title']
+    assert extract_without_namespaces(XPATHS.select(node, 'elsevier.abstract')) == [
+        '<abstract-sec id="as1">Mass <math><mi>m</mi></math></abstract-sec>'
+    ]
+    assert extract_without_namespaces(XPATHS.select(node, 'elsevier.title')) == ['A title']
+    assert node.root.tag == '{http://www.elsevier.com/xml/ja/dtd}article'
+
+
+def test_marc_fields_in_any_namespace():
+    """Test that MARC fields are found whatever namespace they are in."""
+    field = '<datafield tag="245"><subfield code="a">A title</subfield></datafield>'
+    bodies = [
+        '<record xmlns="http://www.loc.gov/MARC21/slim">%s</record>' % field,
+        '<marc:record xmlns:marc="http://www.loc.gov/MARC21/slim" '
+        'xmlns="http://www.openarchives.org/OAI/2.0/">%s</marc:record>' % field,
+        '<record>%s</record>' % field,
+    ]
+    for body in bodies:
+        node = Selector(text=body, type='xml')
+        assert XPATHS.select(node, 'marc.title').extract() == ['A title']
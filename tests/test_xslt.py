@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2015, 2016 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Compare the XSLT stylesheets with the Python extractors."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import glob
+import io
+import shutil
+from importlib import import_module
+from os import path, makedirs
+
+import pytest
+from freezegun import freeze_time
+from mock import patch
+
+from scrapy.http import TextResponse
+from scrapy.selector import Selector
+from scrapy.utils.test import get_crawler
+
+from hepcrawl.extractors.iop_parser import IOPParser
+from hepcrawl.extractors.oup_parser import OUPParser
+from hepcrawl.extractors.s3_elsevier_parser import S3ElsevierParser
+from hepcrawl.extractors.s3_springer_parser import S3SpringerParser
+from hepcrawl.extractors.xslt import XSLTExtractor
+
+from .responses import fake_response_from_file
+
+TESTS_DIR = path.dirname(path.realpath(__file__))
+
+
+def _read(file_path):
+    with io.open(file_path, encoding='utf-8') as xml_file:
+        return xml_file.read()
+
+
+def test_extract():
+    """Test the conversion of the intermediate document."""
+    body = """
+    <article>
+        <title-group><article-title>A title</article-title></title-group>
+        <contrib contrib-type="author">
+            <name><surname>Doe</surname><given-names>J.</given-names></name>
+            <xref ref-type="aff" rid="aff1"/>
+            <xref ref-type="aff" rid="aff2"/>
+        </contrib>
+        <aff id="aff1"><label>1</label>CERN, <country>Switzerland</country></aff>
+        <aff id="aff2"><label>2</label>DESY</aff>
+    </article>
+    """
+    fields = XSLTExtractor('jats', publisher='iop').extract(Selector(text=body, type='xml'))
+
+    assert fields['title'] == ['A title']
+    assert fields['authors'] == [{
+        'surname': 'Doe',
+        'given_names': 'J.',
+        'affiliations': [{'value': 'Switzerland'}, {'value': 'DESY'}],
+    }]
+
+
+@pytest.mark.parametrize('file_path', sorted(
+    glob.glob(path.join(TESTS_DIR, 'test_iop_output', 'data', '*.xml')) +
+    glob.glob(path.join(TESTS_DIR, 'test_iop_license', 'data', '*.xml'))
+))
+def test_iop(file_path):
+    response = fake_response_from_file(file_path)
+    content = _read(file_path)
+
+    expected = IOPParser().parse_node(response, Selector(text=content, type='xml'))
+    result = IOPParser(use_xslt=True).parse_node(response, Selector(text=content, type='xml'))
+    compact = IOPParser(use_xslt=True, min_authors=1).parse_node(
+        response, Selector(text=content, type='xml'))
+
+    assert result == expected
+    assert compact == expected
+
+
+@pytest.mark.parametrize('file_path', sorted(
+    glob.glob(path.join(TESTS_DIR, 'test_oup_affiliation_parsing', 'data', '*.xml'))
+))
+def test_oup(file_path):
+    response = fake_response_from_file(file_path)
+    content = _read(file_path)
+
+    def parse(parser):
+        # the spider reads OUP articles as HTML
+        node = Selector(text=content, type='html').xpath('//article')[0]
+        return parser.parse_node(response, node)
+
+    assert parse(OUPParser(use_xslt=True)) == parse(OUPParser())
+
+
+def _elsevier_records(parser):
+    download_dir = '/tmp/elsevier_xslt_test_download_dir/'
+    unpack_dir = '/tmp/elsevier_xslt_test_unpack_dir/'
+    test_files = ('CERNR000000005008A.tar', 'CERNAB00000005657_stripped.tar', 'vtex00403986_a-2b_partial_simple.zip')
+
+    records = []
+    with patch('hepcrawl.settings.ELSEVIER_DOWNLOAD_DIR', download_dir),\
+         patch('hepcrawl.settings.ELSEVIER_UNPACK_FOLDER', unpack_dir), \
+         freeze_time("2019-03-27"):
+            from hepcrawl.spiders import s3_elsevier_spider
+
+            for test_file in test_files:
+                if not path.exists(unpack_dir):
+                    makedirs(unpack_dir)
+
+                fake_response = fake_response_from_file(
+                    path.join('s3_elsevier', test_file),
+                    response_type=TextResponse
+                )
+                fake_response.meta['local_filename'] = path.join(download_dir, test_file)
+
+                spider = s3_elsevier_spider.S3ElsevierSpider()
+                spider.parser = parser
+                for record in spider.handle_package(fake_response):
+                    # packages are unpacked to a new temporary directory
+                    record.pop('local_files', None)
+                    records.append(record)
+
+    shutil.rmtree(download_dir, ignore_errors=True)
+    shutil.rmtree(unpack_dir, ignore_errors=True)
+    return records
+
+
+def test_elsevier():
+    expected = _elsevier_records(S3ElsevierParser())
+
+    assert expected
+    assert _elsevier_records(S3ElsevierParser(use_xslt=True)) == expected
+
+
+def _springer_records(parser):
+    download_dir = '/tmp/springer_xslt_test_download_dir/'
+    unpack_dir = '/tmp/springer_xslt_test_unpack_dir/'
+    test_files = ('ftp_PUB_19-01-29_20-02-10_JHEP.zip', 'ftp_PUB_19-01-29_20-02-10_EPJC.zip',
+                  'ftp_PUB_19-02-06_16-01-13_EPJC_stripped.zip')
+
+    records = []
+    with patch('hepcrawl.settings.SPRINGER_DOWNLOAD_DIR', download_dir),\
+         patch('hepcrawl.settings.SPRINGER_UNPACK_FOLDER', unpack_dir):
+            from hepcrawl.spiders import s3_springer_spider
+
+            for test_file in test_files:
+                if not path.exists(unpack_dir):
+                    makedirs(unpack_dir)
+
+                test_file_path = path.join(TESTS_DIR, 'responses', 's3_springer', test_file)
+                fake_response = fake_response_from_file(
+                    test_file_path,
+                    response_type=TextResponse,
+                    url='http://example.com/' + test_file
+                )
+                fake_response.meta['ftp_local_filename'] = test_file_path
+
+                spider = s3_springer_spider.S3SpringerSpider()
+                spider.parser = parser
+                for req in spider.handle_package_sftp(fake_response):
+                    response = fake_response_from_file(req.meta['xml_url'].replace('file://', ''))
+                    for record in spider.parse(response):
+                        # packages are unpacked to a new temporary directory
+                        record.pop('local_files', None)
+                        records.append(record)
+
+    shutil.rmtree(download_dir, ignore_errors=True)
+    shutil.rmtree(unpack_dir, ignore_errors=True)
+    return records
+
+
+def test_springer():
+    expected = _springer_records(S3SpringerParser())
+
+    assert expected
+    assert _springer_records(S3SpringerParser(use_xslt=True)) == expected
+
+
+@pytest.mark.parametrize('module, spider_name', [
+    ('iop_spider', 'IOPSpider'),
+    ('oup_spider', 'OxfordUniversityPressSpider'),
+    ('s3_elsevier_spider', 'S3ElsevierSpider'),
+    ('s3_springer_spider', 'S3SpringerSpider'),
+])
+def test_xslt_extraction_setting(module, spider_name):
+    spider_class = getattr(import_module('hepcrawl.spiders.' + module), spider_name)
+
+    crawler = get_crawler(spider_class, {
+        'XSLT_EXTRACTION': 'true',
+        'COMPACT_AUTHORS_MIN_COUNT': '100',
+    })
+    spider = spider_class.from_crawler(crawler)
+    assert spider.parser.xslt is not None
+    assert spider.parser.min_authors == 100
+
+    crawler = get_crawler(spider_class, {'XSLT_EXTRACTION': False})
+    spider = spider_class.from_crawler(crawler)
+    assert spider.parser.xslt is None